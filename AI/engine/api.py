@@ -1,11 +1,17 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, Header, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from datetime import datetime
 import asyncio, json, os
-from .settings import API_KEY, LOGS, STATE
-from .trader import TRADER, WS_CLIENTS
+from .settings import API_KEY, LOGS
+from .trader import TRADER
+from .broadcast import HUB
+from .marketdata import MD
+from .tradestore import TRADES
+from .atomic import STATE_JOURNAL
+from .metrics import REGISTRY, CONTENT_TYPE
+from .profiler import PROFILER
 
 app = FastAPI(title="Aurora API", version="0.2")
 app.mount("/web", StaticFiles(directory=Path(__file__).resolve().parents[1]/"web", html=True), name="web")
@@ -19,26 +25,57 @@ def require_key(x_api_key: str | None = Header(default=None)):
 def health():
     return {"ok": True, "ts": datetime.utcnow().isoformat()+"Z"}
 
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/marketdata", dependencies=[Depends(require_key)])
+def marketdata():
+    return MD.latency()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await MD.aclose()
+
 @app.get("/state", dependencies=[Depends(require_key)])
 def state():
-    if STATE.exists():
-        return JSONResponse(json.loads(STATE.read_text()))
+    st = STATE_JOURNAL.state()
+    if st is not None:
+        return JSONResponse(st)
     return {"error":"no state"}
 
+@app.get("/state/durability", dependencies=[Depends(require_key)])
+def durability():
+    return STATE_JOURNAL.stats()
+
 @app.get("/trades", dependencies=[Depends(require_key)])
-def trades():
-    p = LOGS/'trade_log.csv'
-    return FileResponse(p) if p.exists() else JSONResponse({"rows":[]})
+def trades(n: int = 200):
+    return {"rows": TRADES.last(max(1, min(n, 5000)))}
 
 @app.websocket("/ws")
 async def ws(websocket: WebSocket):
     await websocket.accept()
-    WS_CLIENTS.add(websocket)
+    HUB.add(websocket)
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        WS_CLIENTS.discard(websocket)
+        pass
+    finally:
+        HUB.remove(websocket)
+
+@app.get("/ws/stats", dependencies=[Depends(require_key)])
+def ws_stats():
+    return HUB.metrics()
+
+@app.post("/profile", dependencies=[Depends(require_key)])
+def profile_start(seconds: float = 10.0, hz: float = 100.0, threads: str = "all"):
+    # samples the process running TRADER; collapsed stacks land in logs/profile-*.folded
+    return PROFILER.start(seconds, hz, threads)
+
+@app.get("/profile", dependencies=[Depends(require_key)])
+def profile_status():
+    return PROFILER.status()
 
 @app.post("/tick/start", dependencies=[Depends(require_key)])
 async def start():
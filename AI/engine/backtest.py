@@ -0,0 +1,149 @@
+import sys, time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .settings import SYMBOL
+from .trader import Trader
+from .voting import combine_arrays, THRESHOLD
+from .klines import KlineCache
+from .exchange import SimExchange
+
+FillRow = Tuple[int, str, float, float, float, str]  # (bar, side, qty, price, stake, note)
+
+class BacktestTrader(Trader):
+    """Trader with in-memory state and no file / websocket side effects."""
+    def __init__(self, strats=None, symbols=None, exchange=None, threshold: float = THRESHOLD):
+        self.bar = -1
+        self.fills: List[FillRow] = []
+        super().__init__(strats, symbols, exchange, threshold)
+
+    # the live trader's latency histograms would only measure the replay loop; call the bare functions
+    risk_ok = Trader.risk_ok.__wrapped__
+    apply_fill = Trader.apply_fill.__wrapped__
+
+    def save_state(self, fills=()): pass
+
+    def durable(self): pass
+
+    def log_fill(self, side, qty, price, stake, note, symbol=SYMBOL):
+        self.fills.append((self.bar, side, qty, price, stake, note))
+
+    def listening(self)->bool: return False
+
+    def push_ws(self, kind, payload): pass
+
+@dataclass
+class BacktestResult:
+    equity: np.ndarray
+    fills: List[FillRow]
+    halted_at: Optional[int]
+    elapsed: float
+    stopped_at: Optional[int] = None  # stop_when() ended the run early
+    drawdown: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else self.equity
+        self.drawdown = 1.0 - self.equity / np.where(peak > 0, peak, 1.0)
+
+    @property
+    def bars(self)->int: return len(self.equity)
+    @property
+    def max_drawdown(self)->float: return float(self.drawdown.max()) if self.bars else 0.0
+    @property
+    def final_equity(self)->float: return float(self.equity[-1]) if self.bars else 0.0
+    @property
+    def bars_per_sec(self)->float: return self.bars / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self)->dict:
+        return {"bars": self.bars, "fills": len(self.fills), "final_equity": round(self.final_equity, 6),
+                "max_drawdown": round(self.max_drawdown, 6), "halted_at": self.halted_at,
+                "stopped_at": self.stopped_at, "elapsed_sec": round(self.elapsed, 3), "bars_per_sec": round(self.bars_per_sec)}
+
+def _replay_votes(t: BacktestTrader, symbol: str, prices: np.ndarray, gate) -> Iterator[Tuple[float, int, float, float]]:
+    """Bar-by-bar votes for strategies without scores_batch(): what on_bar() does, minus the coroutine,
+    the per-strategy histograms and the vote matrix (only read by WS listeners, and a backtest has none).
+    Same arithmetic as VoteMatrix.combine_one, so decisions are identical. Bars the gate refuses
+    (halted) are not scored, as in on_bar()."""
+    scores = [s.score for s in t.strats[symbol]]; n = len(scores); th = t.votes.threshold
+    for price in prices.tolist():
+        if not gate(symbol, price):
+            yield price, None, 0.0, 0.0; continue
+        if not n:
+            yield price, 0, 0.0, 0.0; continue
+        num = den = cs = 0.0
+        for f in scores:
+            b, c = f(price)
+            w = c if c > 1e-6 else 1e-6
+            num += b*w; den += w; cs += c
+        score = num/den
+        yield price, (1 if score > th else (-1 if score < -th else 0)), score, min(cs/n, 1.0)
+
+def _vote_arrays(t: BacktestTrader, symbol: str, prices: np.ndarray):
+    # every strategy scores the whole series at once -> (strategies x bars) matrix -> one combine
+    strats = t.strats[symbol]
+    cols = [s.scores_batch(prices) for s in strats]
+    if not strats or any(c is None for c in cols): return None
+    return combine_arrays(np.vstack([b for b, _ in cols]), np.vstack([c for _, c in cols]), threshold=t.votes.threshold)
+
+def run_backtest(prices: Sequence[float], strats=None, symbol: str = SYMBOL, stop_on_halt: bool = True,
+                 vectorized: bool = True, threshold: float = THRESHOLD,
+                 stop_when: Optional[Callable[[int, float], bool]] = None, check_every: int = 1024,
+                 exchange: Optional[SimExchange] = None) -> BacktestResult:
+    """vectorized: decide from the batch vote matrix when every strategy has scores_batch();
+    otherwise (or when False) replay bars through on_bar. threshold is the |score| a vote
+    needs to buy or sell, on either path. stop_when(bar, equity) is polled every `check_every` bars and ends
+    the run early when it returns True (used by the sweep to prune bad configs). exchange: a
+    SimExchange to fill orders against (spread, depth, fees) instead of at the bar price."""
+    prices = np.ascontiguousarray(prices, dtype=float)
+    t = BacktestTrader(strats, [symbol], exchange, threshold)
+    eq = np.empty(len(prices), dtype=float)
+    mark, act, equity, st, fills = t._mark, t._act, t.equity, t.state, t.fills
+    halted_at = stopped_at = None
+    t0 = time.perf_counter()
+    votes = _vote_arrays(t, symbol, prices) if vectorized else None
+    if votes is not None:
+        bars = ((p, c, s, k) if mark(symbol, p) else (p, None, 0.0, 0.0)
+                for p, c, s, k in zip(prices.tolist(), *(v.tolist() for v in votes)))
+    else:
+        bars = _replay_votes(t, symbol, prices, mark)
+    for i, (price, code, score, conf) in enumerate(bars):
+        t.bar = i
+        if code is not None:
+            n = len(fills)
+            act(symbol, price, code, score, conf)
+            # risk_ok() already valued this bar; only a fill (fees, slippage) can move equity since
+            eq[i] = equity() if len(fills) != n else t.eq
+        else:
+            eq[i] = t.eq
+        if st.halted and halted_at is None:
+            halted_at = i
+            if stop_on_halt:
+                eq = eq[:i+1]; break
+        if stop_when is not None and i % check_every == check_every-1 and stop_when(i, eq[i]):
+            stopped_at = i; eq = eq[:i+1]; break
+    return BacktestResult(equity=eq, fills=t.fills, halted_at=halted_at, elapsed=time.perf_counter()-t0,
+                          stopped_at=stopped_at)
+
+def load_prices(path: Path) -> np.ndarray:
+    # .npy arrays, or text/CSV with the price in the last column (header rows are skipped)
+    if path.suffix == ".npy":
+        return np.load(path)
+    rows = [ln.rsplit(",", 1)[-1] for ln in path.read_text().splitlines() if ln.strip()]
+    return np.array([float(r) for r in rows if r.strip().replace(".", "", 1).isdigit()], dtype=float)
+
+def load_klines(symbol: str, interval: str = "1m", start=None, end=None) -> np.ndarray:
+    """Closes from the local kline cache (memory-mapped; no copy unless the range has holes)."""
+    return KlineCache(symbol, interval).closes(start, end)
+
+if __name__ == "__main__":
+    # a price file, or SYMBOL:INTERVAL to replay the local kline cache
+    # add "sim" to fill through the simulated exchange
+    arg = sys.argv[1]
+    ex = SimExchange() if "sim" in sys.argv[2:] else None
+    if not Path(arg).exists() and ":" in arg:
+        sym, iv = arg.split(":", 1)
+        res = run_backtest(load_klines(sym, iv), symbol=sym.upper(), exchange=ex)
+    else:
+        res = run_backtest(load_prices(Path(arg)), exchange=ex)
+    print(res.summary())
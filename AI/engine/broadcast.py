@@ -0,0 +1,84 @@
+import asyncio, json, time
+from datetime import datetime, timezone
+from typing import Any, Dict
+from .marketdata import LatencyStats
+from .metrics import PUSH, PUSH_CLIENTS
+
+_PUSH, _CLIENTS = PUSH.labels("ws"), PUSH_CLIENTS.labels("ws")
+
+class _Client:
+    __slots__ = ("ws", "q", "task", "skipped", "lagging")
+    def __init__(self, ws, size: int):
+        self.ws = ws; self.q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.task = None; self.skipped = 0; self.lagging = 0
+
+class Hub:
+    """WebSocket fan-out: serialise each event once, hand it to per-client bounded queues.
+
+    publish() never awaits. Each client has its own drain task, so a slow
+    socket only delays itself: when its queue is full the oldest frame is
+    skipped, and a client that keeps lagging (or a send that times out) is
+    disconnected.
+    """
+    def __init__(self, queue_size: int = 64, send_timeout: float = 2.0, max_lag: int = 256):
+        self.queue_size, self.send_timeout, self.max_lag = queue_size, send_timeout, max_lag
+        self.clients: Dict[Any, _Client] = {}
+        self.latency = LatencyStats(1024)  # publish -> send complete
+        self.published = 0; self.delivered = 0; self.skipped = 0; self.dropped_clients = 0
+
+    def __len__(self): return len(self.clients)
+
+    def add(self, ws):
+        c = _Client(ws, self.queue_size)
+        c.task = asyncio.create_task(self._drain(c))
+        self.clients[ws] = c
+        _CLIENTS.set(len(self.clients))
+
+    def remove(self, ws, dropped: bool = False):
+        c = self.clients.pop(ws, None)
+        if c is None: return
+        _CLIENTS.set(len(self.clients))
+        if c.task and c.task is not asyncio.current_task(): c.task.cancel()
+        if dropped:
+            self.dropped_clients += 1
+            asyncio.ensure_future(self._close(ws))
+
+    async def _close(self, ws):
+        try: await asyncio.wait_for(ws.close(code=1013), self.send_timeout)
+        except Exception: pass
+
+    def publish(self, kind: str, payload: dict):
+        if not self.clients: return
+        t0 = time.perf_counter()
+        text = json.dumps({"ts": datetime.now(timezone.utc).isoformat(), "kind": kind, "payload": payload},
+                          ensure_ascii=False, separators=(",", ":"))
+        frame = (time.perf_counter(), text)
+        self.published += 1
+        for ws, c in list(self.clients.items()):
+            if c.q.full():
+                c.q.get_nowait(); c.skipped += 1; c.lagging += 1; self.skipped += 1
+                if c.lagging > self.max_lag:
+                    self.remove(ws, dropped=True); continue
+            c.q.put_nowait(frame)
+        _PUSH.since(t0)
+
+    async def _drain(self, c: _Client):
+        try:
+            while True:
+                t0, text = await c.q.get()
+                await asyncio.wait_for(c.ws.send_text(text), self.send_timeout)
+                self.latency.observe(time.perf_counter() - t0)
+                self.delivered += 1
+                if c.q.empty(): c.lagging = 0
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.remove(c.ws, dropped=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"clients": len(self.clients), "published": self.published, "delivered": self.delivered,
+                "skipped_frames": self.skipped, "dropped_clients": self.dropped_clients,
+                "fanout_latency": self.latency.snapshot(),
+                "queued": {str(id(ws)): c.q.qsize() for ws, c in self.clients.items()}}
+
+HUB = Hub()
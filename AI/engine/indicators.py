@@ -1,9 +1,27 @@
 from collections import deque
-from typing import Dict, Deque
+from typing import Dict, Deque, Optional
+import numpy as np
+
+# ---- per-tick (streaming) ----
 class Rolling:
-    def __init__(self, n:int): self.n=n; self.buf:Deque[float]=deque(maxlen=n)
-    def push(self, x:float): self.buf.append(x)
-    def mean(self): return sum(self.buf)/len(self.buf) if self.buf else 0.0
+    """Running window sums, O(1) per push (re-based once per window to bound drift)."""
+    __slots__ = ("n", "buf", "ref", "s", "s2", "since")
+    def __init__(self, n:int): self.n=n; self.buf:Deque[float]=deque(maxlen=n); self.ref=0.0; self.s=0.0; self.s2=0.0; self.since=0
+    def push(self, x:float):
+        if len(self.buf)==self.n:
+            d=self.buf[0]-self.ref; self.s-=d; self.s2-=d*d
+        self.buf.append(x)
+        self.since+=1
+        if self.since>=self.n:
+            self.ref=x; self.since=0
+            self.s=sum(v-x for v in self.buf); self.s2=sum((v-x)*(v-x) for v in self.buf)
+        else:
+            d=x-self.ref; self.s+=d; self.s2+=d*d
+    def mean(self): return self.ref + self.s/len(self.buf) if self.buf else 0.0
+    def std(self):
+        if not self.buf: return 0.0
+        m=self.s/len(self.buf)
+        return max(self.s2/len(self.buf) - m*m, 0.0) ** 0.5
 def ema(prev, price, period):
     k=2/(period+1)
     return price if prev is None else (price*k + prev*(1-k))
@@ -18,3 +36,122 @@ def rsi(state:Dict[str,float], price:float, period:int=14):
     if al==0: return 100.0
     rs=ag/al
     return 100 - (100/(1+rs))
+
+class EMA:
+    """O(1) state object; same arithmetic as ema()."""
+    __slots__ = ("k", "v")
+    def __init__(self, period:int): self.k=2/(period+1); self.v:Optional[float]=None
+    def update(self, price:float) -> float:
+        self.v = price if self.v is None else (price*self.k + self.v*(1-self.k))
+        return self.v
+
+class RSI:
+    """O(1) state object; same arithmetic as rsi()."""
+    __slots__ = ("period", "avg_gain", "avg_loss", "last")
+    def __init__(self, period:int=14): self.period=period; self.avg_gain=0.0; self.avg_loss=0.0; self.last:Optional[float]=None
+    def update(self, price:float) -> float:
+        if self.last is None:
+            self.last=price; return 50.0
+        p=self.period
+        change=price - self.last; self.last=price
+        self.avg_gain=self.avg_gain*(p-1)/p + max(change,0.0)/p
+        self.avg_loss=self.avg_loss*(p-1)/p + max(-change,0.0)/p
+        if self.avg_loss==0: return 100.0
+        return 100 - (100/(1+self.avg_gain/self.avg_loss))
+
+class Momentum:
+    """Relative change over the last `window` prices; None until the window is full."""
+    __slots__ = ("window", "buf")
+    def __init__(self, window:int): self.window=window; self.buf:Deque[float]=deque(maxlen=window)
+    def update(self, price:float) -> Optional[float]:
+        self.buf.append(price)
+        if len(self.buf)<self.window: return None
+        return (self.buf[-1]-self.buf[0])/max(self.buf[0],1e-9)
+
+# ---- batch (whole price array, no per-bar Python loop) ----
+# Same recurrences as the streaming classes, evaluated in a different order, so results agree to
+# float rounding rather than bit for bit (tests/test_indicators.py holds them to these bounds):
+#   ema_batch            relative 1e-13 of the EMA (measured <= 3e-15 over 200k bars)
+#   rsi_batch            absolute 1e-11 on the 0..100 scale (measured <= 6e-14)
+#   rolling_mean_batch   relative 1e-13 of the price
+#   rolling_std_batch    variance within 1e-12 * price**2 (both sides compute E[x^2] - E[x]^2)
+#   momentum_slope_batch exact
+# Exact equality for EMA/RSI would need the sequential recurrence, i.e. a Python loop per bar.
+_BLOCK = 128
+
+def _linear_filter(x: np.ndarray, a: float, b: float, y_prev: float) -> np.ndarray:
+    """y[t] = a*y[t-1] + b*x[t], seeded with y[-1] = y_prev.
+
+    Each block of _BLOCK samples is one matmul against a lower-triangular
+    decay matrix; only the carry between blocks is sequential.
+    """
+    n = len(x)
+    if n == 0: return np.empty(0)
+    B = min(_BLOCK, n); nb = -(-n // B)
+    xb = np.zeros(nb*B); xb[:n] = x; xb = xb.reshape(nb, B)
+    i = np.arange(B)
+    lag = i[:, None] - i[None, :]
+    L = np.where(lag >= 0, b * np.power(a, np.maximum(lag, 0)), 0.0)
+    Z = xb @ L.T
+    decay = np.power(a, i + 1)
+    carry = np.empty(nb); c = y_prev; aB = decay[-1]
+    for j in range(nb):
+        carry[j] = c
+        c = Z[j, -1] + aB*c
+    return (Z + carry[:, None]*decay[None, :]).ravel()[:n]
+
+def ema_batch(prices, period:int) -> np.ndarray:
+    x = np.asarray(prices, dtype=float)
+    if len(x) == 0: return np.empty(0)
+    k = 2/(period+1)
+    return _linear_filter(x, 1-k, k, x[0])
+
+def rsi_batch(prices, period:int=14) -> np.ndarray:
+    x = np.asarray(prices, dtype=float)
+    out = np.full(len(x), 50.0)
+    if len(x) < 2: return out
+    ch = np.diff(x)
+    a, b = (period-1)/period, 1/period
+    ag = _linear_filter(np.maximum(ch, 0.0), a, b, 0.0)
+    al = _linear_filter(np.maximum(-ch, 0.0), a, b, 0.0)
+    rs = np.divide(ag, al, out=np.zeros_like(ag), where=al != 0)
+    out[1:] = np.where(al == 0, 100.0, 100 - 100/(1+rs))
+    return out
+
+_CHUNK = 1024
+
+def _rolling_moments(x: np.ndarray, n:int):
+    """Window mean and population variance per bar (partial windows at the start).
+
+    Sums are re-based on a local reference every _CHUNK bars so they never
+    drift far from the data they describe.
+    """
+    N = len(x); mean = np.empty(N); var = np.empty(N)
+    C = max(_CHUNK, n)
+    for lo in range(0, N, C):
+        hi = min(lo+C, N); s0 = max(0, lo-n+1); ref = x[lo]
+        d = x[s0:hi] - ref
+        c1 = np.concatenate(([0.0], np.cumsum(d))); c2 = np.concatenate(([0.0], np.cumsum(d*d)))
+        t = np.arange(lo, hi); w0 = np.maximum(t-n+1, 0)
+        cnt = t - w0 + 1
+        m = (c1[t-s0+1] - c1[w0-s0]) / cnt
+        mean[lo:hi] = ref + m
+        var[lo:hi] = np.maximum((c2[t-s0+1] - c2[w0-s0]) / cnt - m*m, 0.0)
+    return mean, var
+
+def rolling_mean_batch(prices, n:int) -> np.ndarray:
+    """Rolling.mean() after each push."""
+    return _rolling_moments(np.asarray(prices, dtype=float), n)[0]
+
+def rolling_std_batch(prices, n:int) -> np.ndarray:
+    """Rolling.std() (population) after each push."""
+    return np.sqrt(_rolling_moments(np.asarray(prices, dtype=float), n)[1])
+
+def momentum_slope_batch(prices, window:int) -> np.ndarray:
+    """Momentum.update() per bar; NaN while the window is warming."""
+    x = np.asarray(prices, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        first = x[:len(x)-window+1]
+        out[window-1:] = (x[window-1:] - first) / np.maximum(first, 1e-9)
+    return out
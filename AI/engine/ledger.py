@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+from .types import Position
+
+class Ledger:
+    """Open lots per symbol in FIFO deques, with running per-symbol aggregates.
+
+    qty and cost (sum of qty * entry over open lots) change by one term per
+    fill, so opening, closing or partially closing a lot is O(1) (closing a
+    lot other than the oldest, e.g. on its own stop, also walks its deque).
+    Exposure and equity at new marks are then O(symbols) instead of O(lots).
+    """
+    def __init__(self, lots: Iterable[Position] = ()):
+        self.lots: Dict[str, Deque[Position]] = {}
+        self.qty: Dict[str, float] = {}
+        self.cost: Dict[str, float] = {}
+        self.realized: Dict[str, float] = {}
+        self.realized_total = 0.0
+        self.n = 0
+        for p in lots: self.open(p)
+
+    def open(self, p: Position):
+        s = p.symbol
+        dq = self.lots.get(s)
+        if dq is None:
+            dq = self.lots[s] = deque(); self.qty[s] = self.cost[s] = 0.0; self.realized.setdefault(s, 0.0)
+        dq.append(p); self.n += 1
+        self.qty[s] += p.qty; self.cost[s] += p.qty * p.entry
+
+    def first(self, symbol: str) -> Optional[Position]:
+        dq = self.lots.get(symbol)
+        return dq[0] if dq else None
+
+    def count(self, symbol: str) -> int:
+        dq = self.lots.get(symbol)
+        return len(dq) if dq else 0
+
+    def close(self, p: Position, qty: float, price: float, fee: float = 0.0) -> float:
+        """Take `qty` off lot p at `price`; the whole lot when qty covers it. Returns the quantity closed."""
+        s = p.symbol; dq = self.lots[s]
+        if qty < p.qty * (1 - 1e-9):
+            # partial: the rest of the lot stays open with its share of the stake, so stake/qty
+            # (and the SL/TP levels derived from it) stays where it was
+            p.stake *= (p.qty - qty) / p.qty; p.qty -= qty
+        else:
+            qty = p.qty
+            if dq[0] is p: dq.popleft()
+            else: del dq[next(i for i, q in enumerate(dq) if q is p)]
+            self.n -= 1
+        pnl = qty * (price - p.entry) - fee
+        self.realized[s] += pnl; self.realized_total += pnl
+        if dq:
+            self.qty[s] -= qty; self.cost[s] -= qty * p.entry
+        else:
+            self.qty[s] = self.cost[s] = 0.0  # no drift left behind once the symbol is flat
+        return qty
+
+    def exposure(self, marks: Dict[str, float]) -> float:
+        # lots without a mark count at cost
+        return sum(q * marks[s] if s in marks else self.cost[s] for s, q in self.qty.items() if q)
+
+    def unrealized(self, marks: Dict[str, float]) -> float:
+        return sum(q * marks[s] - self.cost[s] for s, q in self.qty.items() if q and s in marks)
+
+    def positions(self) -> List[Position]:
+        return [p for dq in self.lots.values() for p in dq]
+
+    def __len__(self): return self.n
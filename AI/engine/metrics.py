@@ -0,0 +1,151 @@
+import sys, threading, time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Sequence, Tuple
+
+# seconds; covers sub-microsecond strategy updates up to multi-second network stalls
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra: parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    __slots__ = ("value",)
+    def __init__(self): self.value = 0
+    def inc(self, n=1): self.value += n
+
+class Gauge:
+    __slots__ = ("value",)
+    def __init__(self): self.value = 0.0
+    def set(self, v): self.value = v
+    def inc(self, n=1): self.value += n
+    def dec(self, n=1): self.value -= n
+
+class Histogram:
+    """Fixed buckets; observe() is a bisect plus three in-place updates, nothing is allocated per call."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0; self.count = 0
+    def observe(self, v: float):
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v; self.count += 1
+    def since(self, t0: float):
+        """observe(perf_counter() - t0): the usual way to time a block."""
+        v = time.perf_counter() - t0
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v; self.count += 1
+
+class Family:
+    """A named metric with optional labels. Resolve children once with labels() and keep them;
+    unlabelled families are used directly through their single child."""
+    def __init__(self, kind: str, name: str, help: str, labelnames: Tuple[str, ...], factory):
+        self.kind, self.name, self.help, self.labelnames, self._factory = kind, name, help, labelnames, factory
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        c = self.children.get(key)
+        if c is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                c = self.children.setdefault(key, self._factory())
+        return c
+
+    def render(self, out: List[str]):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for key, c in list(self.children.items()):
+            if self.kind == "histogram":
+                acc = 0
+                for le, n in zip(c.bounds + (float("inf"),), list(c.counts)):
+                    acc += n
+                    le_label = 'le="' + _fmt(le) + '"'
+                    out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le_label)} {acc}")
+                out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {c.sum!r}")
+                out.append(f"{self.name}_count{_labels(self.labelnames, key)} {c.count}")
+            else:
+                out.append(f"{self.name}{_labels(self.labelnames, key)} {c.value!r}")
+
+class Registry:
+    def __init__(self):
+        self.families: Dict[str, Family] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind, name, help, labelnames, factory):
+        with self._lock:
+            fam = self.families.get(name)
+            if fam is None:
+                fam = self.families[name] = Family(kind, name, help, tuple(labelnames), factory)
+            elif fam.kind != kind:
+                raise ValueError(f"{name} already registered as {fam.kind}")
+        return fam if labelnames else fam.labels()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        return self._register("counter", name, help, labelnames, Counter)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        return self._register("gauge", name, help, labelnames, Gauge)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        b = tuple(sorted(buckets))
+        return self._register("histogram", name, help, labelnames, lambda: Histogram(b))
+
+    def render(self) -> str:
+        out: List[str] = []
+        for fam in list(self.families.values()):
+            fam.render(out)
+        return "\n".join(out) + "\n"
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# hot-path instruments shared by both trees; modules resolve their children once at import
+PRICE_FETCH = REGISTRY.histogram("aurora_price_fetch_seconds", "Latency of a price fetch", ("kind",))
+PRICE_FETCH_ERRORS = REGISTRY.counter("aurora_price_fetch_errors_total", "Failed price fetches", ("kind",))
+STRATEGY = REGISTRY.histogram("aurora_strategy_on_price_seconds", "Strategy on_price latency", ("strategy",))
+COMBINE = REGISTRY.histogram("aurora_combine_votes_seconds", "combine_votes latency")
+RISK = REGISTRY.histogram("aurora_risk_check_seconds", "Risk check latency", ("check",))
+ORDER = REGISTRY.histogram("aurora_order_seconds", "Order placement / fill application latency", ("path",))
+FILLS = REGISTRY.counter("aurora_fills_total", "Fills applied", ("side",))
+PERSIST = REGISTRY.histogram("aurora_state_persist_seconds", "State persistence write latency", ("store",))
+PUSH = REGISTRY.histogram("aurora_push_seconds", "Time to fan one event out to subscribers", ("channel",))
+PUSH_CLIENTS = REGISTRY.gauge("aurora_push_clients", "Connected push subscribers", ("channel",))
+
+def timed(hist):
+    """Decorator: observe the wall time of every call (also when it raises) into `hist`."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            t0 = time.perf_counter()
+            try: return fn(*a, **kw)
+            finally: hist.since(t0)
+        return wrapper
+    return deco
+
+def bench(n: int = 1_000_000):
+    """Per-observation cost of the instruments, in ns."""
+    h = REGISTRY.histogram("aurora_bench_seconds", "bench"); c = REGISTRY.counter("aurora_bench_total", "bench")
+    pc = time.perf_counter
+    for name, fn in (("histogram.observe", lambda: h.observe(3e-5)),
+                     ("histogram.since", lambda: h.since(pc())),
+                     ("counter.inc", c.inc)):
+        t0 = pc()
+        for _ in range(n): fn()
+        print({"op": name, "ns_per_call": round((pc() - t0) / n * 1e9, 1)}, flush=True)
+    t0 = pc()
+    for _ in range(n): pass
+    print({"op": "empty loop", "ns_per_call": round((pc() - t0) / n * 1e9, 1)}, flush=True)
+    del REGISTRY.families["aurora_bench_seconds"], REGISTRY.families["aurora_bench_total"]
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:3]))
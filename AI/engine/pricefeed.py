@@ -1,22 +1,186 @@
-import asyncio, random, math
+import asyncio, logging, random, math, json, time
 from datetime import datetime, timezone
-from typing import AsyncIterator
-import httpx
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Union
 from .types import Bar
+from .marketdata import MD
+from .metrics import PRICE_FETCH, PRICE_FETCH_ERRORS
+from .schedule import TickScheduler
+from .settings import FEED_MODE, BINANCE_WS_BASE, FEED_KLINE_INTERVAL, FEED_BUFFER, FEED_PARTIAL, FEED_WS_RETRIES
+log = logging.getLogger("aurora.pricefeed")
+_FETCH_ONE, _FETCH_BATCH = PRICE_FETCH.labels("single"), PRICE_FETCH.labels("batch")
+_FETCH_ONE_ERR, _FETCH_BATCH_ERR = PRICE_FETCH_ERRORS.labels("single"), PRICE_FETCH_ERRORS.labels("batch")
 async def fetch_binance_price(symbol: str) -> float:
-    url=f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-    async with httpx.AsyncClient(timeout=5) as client:
-        r=await client.get(url)
-        r.raise_for_status()
-        return float(r.json()['price'])
-async def stream_prices(symbol: str, interval: float) -> AsyncIterator[Bar]:
-    price=None; drift=0.0
-    while True:
-        ts=datetime.utcnow().replace(tzinfo=timezone.utc)
+    t0=time.perf_counter()
+    try: d=await MD.aget_json("/api/v3/ticker/price", {"symbol": symbol})
+    except Exception: _FETCH_ONE_ERR.inc(); raise
+    _FETCH_ONE.since(t0)
+    return float(d['price'])
+async def fetch_binance_prices(symbols: Sequence[str]) -> Dict[str, float]:
+    """All symbols from one /ticker/price request."""
+    if len(symbols) == 1:
+        return {symbols[0]: await fetch_binance_price(symbols[0])}
+    t0=time.perf_counter()
+    try: rows=await MD.aget_json("/api/v3/ticker/price", {"symbols": json.dumps(list(symbols), separators=(",",":"))})
+    except Exception: _FETCH_BATCH_ERR.inc(); raise
+    _FETCH_BATCH.since(t0)
+    return {r['symbol']: float(r['price']) for r in rows}
+def _symbols(symbols: Union[str, Sequence[str]]) -> List[str]:
+    return [symbols] if isinstance(symbols, str) else list(symbols)
+def _cached_price(symbol: str) -> Optional[float]:
+    # newest close in the local kline cache; klines imports this module, hence the late import
+    from .klines import KlineCache
+    try: c=KlineCache(symbol, FEED_KLINE_INTERVAL).last(1)
+    except Exception: return None
+    return float(c[-1]) if len(c) else None
+async def stream_prices(symbols: Union[str, Sequence[str]], interval: float) -> AsyncIterator[Bar]:
+    """Polled bars. When the exchange is unreachable each symbol random-walks from its last
+    fetched price, or its newest cached close; a symbol with neither gets no bars until a fetch succeeds."""
+    symbols=_symbols(symbols)
+    prices: Dict[str, float]={}; drift=0.0
+    async for at in TickScheduler(interval, "poll"):
+        ts=datetime.fromtimestamp(at, tz=timezone.utc)
         try:
-            price = await fetch_binance_price(symbol)
+            prices.update(await fetch_binance_prices(symbols))
         except Exception:
-            price = (price or 50000.0) * math.exp(random.uniform(-0.002,0.002)) + drift
+            for s in symbols:
+                p = prices.get(s) or _cached_price(s)
+                if p: prices[s] = p * math.exp(random.uniform(-0.002,0.002)) + drift
             drift *= 0.95
-        yield Bar(ts=ts, symbol=symbol, price=float(price))
-        await asyncio.sleep(interval)
+        for s in symbols:
+            if s in prices: yield Bar(ts=ts, symbol=s, price=float(prices[s]))
+
+_UNIT_MS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000}
+def _interval_ms(interval: str) -> int:
+    return int(interval[:-1]) * _UNIT_MS[interval[-1]]
+
+def _ts(ms) -> datetime:
+    return datetime.fromtimestamp(int(ms)/1000, tz=timezone.utc)
+
+class KlineStream:
+    """Push feed: Binance kline websocket (one multiplexed stream for all symbols) -> bounded queue -> Bar iterator.
+
+    Only closed klines (x=true) become bars, stamped with their close time;
+    partial=True also yields the in-progress updates. A reader task reconnects
+    with jittered exponential backoff and, when kline open times jump by more
+    than one interval (missed messages or a reconnect), backfills the missing
+    closes over REST, 1000 klines per request until the gap is covered. After
+    `retries` connects in a row that fail or deliver nothing, it feeds the
+    queue from stream_prices() instead, synthetic fallback included, so a host
+    without exchange access keeps ticking on cached prices, and keeps probing
+    the socket every `probe` seconds (doubling up to `max_probe`); the first
+    message on a probe stops the polling. If the consumer falls behind, the
+    oldest queued bars are dropped so the backlog never exceeds `maxsize`.
+    """
+    def __init__(self, symbols: Union[str, Sequence[str]], interval: str = FEED_KLINE_INTERVAL, maxsize: int = FEED_BUFFER,
+                 base: str = BINANCE_WS_BASE, max_backoff: float = 30.0, partial: bool = FEED_PARTIAL,
+                 retries: int = FEED_WS_RETRIES, probe: float = 30.0, max_probe: float = 600.0):
+        self.symbols, self.interval = _symbols(symbols), interval
+        self.step = _interval_ms(interval)
+        self.partial, self.retries = partial, retries
+        streams = "/".join(f"{s.lower()}@kline_{interval}" for s in self.symbols)
+        self.url = f"{base.rstrip('/')}/stream?streams={streams}"
+        self.max_backoff = max_backoff
+        self.probe, self.max_probe = probe, max_probe
+        self.q: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize * len(self.symbols)))
+        self.last_open: Dict[str, int] = {}
+        self.closed: Dict[str, int] = {}  # open time of the last closed kline yielded, per symbol
+        self.stats: Dict[str, int] = {"received": 0, "dropped": 0, "reconnects": 0, "gaps": 0, "backfilled": 0, "backfill_errors": 0,
+                                      "polling": 0}
+
+    def _put(self, bar: Bar):
+        if self.q.full():
+            self.q.get_nowait(); self.stats["dropped"] += 1
+        self.q.put_nowait(bar)
+
+    async def _backfill(self, symbol: str, start_ms: int, end_ms: int):
+        # the REST endpoint returns at most 1000 klines per call: page until the gap is covered
+        while start_ms <= end_ms:
+            limit = min(1000, (end_ms - start_ms)//self.step + 1)
+            try:
+                rows = await MD.aget_json("/api/v3/klines", {"symbol": symbol, "interval": self.interval,
+                                                             "startTime": start_ms, "endTime": end_ms, "limit": limit})
+            except Exception as e:
+                self.stats["backfill_errors"] += 1
+                log.warning("backfill %s %d..%d failed, gap left open: %s", symbol, start_ms, end_ms, e); return
+            for k in rows:
+                self._put(Bar(ts=_ts(k[6]), symbol=symbol, price=float(k[4])))
+                self.stats["backfilled"] += 1
+            if len(rows) < limit: return  # nothing more on the exchange for this range
+            start_ms = int(rows[-1][0]) + self.step
+
+    async def _poll(self):
+        async for bar in stream_prices(self.symbols, self.step / 1000):
+            self._put(bar)
+
+    async def _on_message(self, raw):
+        d = json.loads(raw)
+        k = d.get("k") or d.get("data", {}).get("k")
+        if not k: return
+        self.stats["received"] += 1
+        if not (self.partial or k.get("x")): return
+        sym = k["s"]; t = int(k["t"])
+        last = self.last_open.get(sym)
+        final = bool(k.get("x"))
+        if last is not None and (t < last or (final and self.closed.get(sym) == t)):
+            return  # replayed after a reconnect; already seen
+        if last is not None and t > last + self.step:
+            self.stats["gaps"] += 1
+            await self._backfill(sym, last + self.step, t - 1)
+        self.last_open[sym] = t
+        if final: self.closed[sym] = t
+        ev = d.get("data", d)
+        self._put(Bar(ts=_ts(k["T"] if final else ev.get("E", k["T"])), symbol=sym, price=float(k["c"])))
+
+    async def _reader(self):
+        import websockets
+        delay = 0.5; failed = 0; probe = self.probe
+        poller: Optional[asyncio.Task] = None
+        try:
+            while True:
+                got = False
+                try:
+                    async with websockets.connect(self.url, ping_interval=20, ping_timeout=20) as ws:
+                        async for raw in ws:
+                            if poller is not None:  # the socket is back
+                                poller.cancel(); poller = None; self.stats["polling"] = 0; probe = self.probe
+                                # the polled bars covered the outage; do not backfill it again
+                                self.last_open.clear(); self.closed.clear()
+                                log.info("kline websocket is back; stopped polling")
+                            delay = 0.5; got = True
+                            await self._on_message(raw)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    pass
+                failed = 0 if got else failed + 1
+                if poller is None and self.retries and failed >= self.retries:
+                    self.stats["polling"] = 1; poller = asyncio.create_task(self._poll())
+                    log.warning("kline websocket failed %d times in a row; polling REST and probing every %gs", failed, probe)
+                self.stats["reconnects"] += 1
+                if poller is not None:
+                    await asyncio.sleep(probe * random.uniform(0.5, 1.0))
+                    probe = min(probe*2, self.max_probe)
+                else:
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                    delay = min(delay*2, self.max_backoff)
+        finally:
+            if poller is not None: poller.cancel()
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        task = asyncio.create_task(self._reader())
+        try:
+            while True:
+                yield await self.q.get()
+        finally:
+            task.cancel()
+
+def price_stream(symbols: Union[str, Sequence[str]], interval: float) -> AsyncIterator[Bar]:
+    """Bar source for Trader.run: batched REST polling every `interval` (the default) or, with
+    AURORA_FEED=ws, the kline websocket, which drops back to polling when it cannot connect."""
+    if FEED_MODE == "ws":
+        try:
+            import websockets  # noqa: F401
+            return KlineStream(symbols).__aiter__()
+        except ImportError:
+            pass
+    return stream_prices(symbols, interval)
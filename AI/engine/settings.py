@@ -6,8 +6,10 @@ LOGS=ROOT/'logs'
 MODELS=ROOT/'models'
 STATE=LOGS/'state.json'
 API_KEY=os.getenv('AURORA_API_KEY','dev-key')
-SYMBOL=os.getenv('AURORA_SYMBOL','BTCUSDT')
+SYMBOLS=[s.strip().upper() for s in os.getenv('AURORA_SYMBOLS', os.getenv('AURORA_SYMBOL','BTCUSDT')).split(',') if s.strip()]
+SYMBOL=os.getenv('AURORA_SYMBOL', SYMBOLS[0]).upper()  # default for callers that name no symbol
 INTERVAL_SEC=float(os.getenv('AURORA_TICK_SEC', '2'))
+TICK_FLUSH_SEC=float(os.getenv('AURORA_TICK_FLUSH_SEC','0.25'))  # how long a tick waits for the slowest symbol's bar
 STAKE_FRACTION=float(os.getenv('AURORA_STAKE_FRACTION','0.1'))
 MAX_PER_TRADE=float(os.getenv('AURORA_MAX_PER_TRADE','10'))
 RESERVE_FRACTION=float(os.getenv('AURORA_RESERVE_FRACTION','0.5'))
@@ -17,3 +19,35 @@ MAX_POSITIONS=int(os.getenv('AURORA_MAX_POSITIONS','5'))
 MAX_DD_PCT=float(os.getenv('AURORA_MAX_DD_PCT','0.15'))
 START_EQUITY=float(os.getenv('AURORA_START_EQUITY','100'))
 WS_TOPIC="aurora"
+BINANCE_BASE=os.getenv('AURORA_BINANCE_BASE','https://api.binance.com')
+HTTP_TIMEOUT=float(os.getenv('AURORA_HTTP_TIMEOUT','5'))
+HTTP_CONNECT_TIMEOUT=float(os.getenv('AURORA_HTTP_CONNECT_TIMEOUT','3'))
+HTTP_MAX_CONNECTIONS=int(os.getenv('AURORA_HTTP_MAX_CONNECTIONS','10'))
+HTTP_MAX_KEEPALIVE=int(os.getenv('AURORA_HTTP_MAX_KEEPALIVE','5'))
+HTTP_KEEPALIVE_EXPIRY=float(os.getenv('AURORA_HTTP_KEEPALIVE_EXPIRY','30'))
+FEED_MODE=os.getenv('AURORA_FEED','poll')  # poll | ws
+BINANCE_WS_BASE=os.getenv('AURORA_BINANCE_WS','wss://stream.binance.com:9443')
+FEED_KLINE_INTERVAL=os.getenv('AURORA_FEED_INTERVAL','1s')
+FEED_BUFFER=int(os.getenv('AURORA_FEED_BUFFER','256'))
+FEED_PARTIAL=os.getenv('AURORA_FEED_PARTIAL','0')!='0'  # also yield in-progress kline updates
+FEED_WS_RETRIES=int(os.getenv('AURORA_FEED_WS_RETRIES','5'))  # failed connects in a row before polling instead
+JOURNAL=LOGS/'state.journal'
+DURABILITY=os.getenv('AURORA_DURABILITY','group')  # sync | group | async
+DURABILITY_WINDOW=float(os.getenv('AURORA_DURABILITY_WINDOW','0.05'))
+KLINES_DIR=Path(os.getenv('AURORA_KLINES_DIR', str(ROOT/'data'/'klines')))
+WARMUP_BARS=int(os.getenv('AURORA_WARMUP_BARS','500'))
+AI_HISTORY=LOGS/'ai_history.bin'
+AI_HISTORY_LEN=int(os.getenv('AURORA_AI_HISTORY','500'))
+AI_CHECKPOINTS=MODELS/'ai_linear'
+AI_CHECKPOINT_KEEP=int(os.getenv('AURORA_AI_CHECKPOINT_KEEP','5'))
+AI_AUTOSAVE_SEC=float(os.getenv('AURORA_AI_AUTOSAVE_SEC','300'))
+EXECUTION=os.getenv('AURORA_EXECUTION','instant')  # 'sim' routes paper orders through engine.exchange
+SIM_MAKER_BPS=float(os.getenv('AURORA_SIM_MAKER_BPS','10'))  # Binance spot base tier
+SIM_TAKER_BPS=float(os.getenv('AURORA_SIM_TAKER_BPS','10'))
+SIM_SPREAD_BPS=float(os.getenv('AURORA_SIM_SPREAD_BPS','2'))
+SIM_LEVEL_BPS=float(os.getenv('AURORA_SIM_LEVEL_BPS','1'))
+SIM_LEVEL_NOTIONAL=float(os.getenv('AURORA_SIM_LEVEL_NOTIONAL','5000'))
+SIM_LEVELS=int(os.getenv('AURORA_SIM_LEVELS','20'))
+TICK_POLICY=os.getenv('AURORA_TICK_POLICY','skip')  # skip | coalesce | catchup, for ticks that overrun their period
+TICK_ALIGN=os.getenv('AURORA_TICK_ALIGN','1')!='0'
+SIM_STP=os.getenv('AURORA_SIM_STP','expire_maker')  # none | expire_maker | expire_taker | expire_both
@@ -0,0 +1,115 @@
+import argparse, itertools, json, os, random, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from .settings import LOGS, START_EQUITY
+from .backtest import run_backtest, load_prices
+from ..plugins.ema import EMAStrategy
+from ..plugins.rsi import RSIStrategy
+from ..plugins.momentum import MomentumStrategy
+
+# default search space around the hand-picked constants in trader.default_strats()
+SPACE: Dict[str, Sequence] = {
+    "ema_fast": (5, 8, 12, 16), "ema_slow": (21, 26, 34, 55),
+    "rsi_low": (20, 25, 30, 35), "rsi_high": (65, 70, 75, 80), "rsi_period": (7, 14, 21),
+    "mom_window": (6, 12, 24), "threshold": (0.1, 0.15, 0.2, 0.3),
+}
+
+def valid(cfg: Dict[str, Any]) -> bool:
+    return cfg["ema_fast"] < cfg["ema_slow"] and cfg["rsi_low"] < cfg["rsi_high"]
+
+def grid(space: Dict[str, Sequence] = SPACE) -> Iterator[Dict[str, Any]]:
+    keys = list(space)
+    for vals in itertools.product(*(space[k] for k in keys)):
+        cfg = dict(zip(keys, vals))
+        if valid(cfg): yield cfg
+
+def sample(n: int, space: Dict[str, Sequence] = SPACE, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed); seen = set(); out = []
+    for _ in range(n * 20):
+        cfg = {k: rng.choice(list(v)) for k, v in space.items()}
+        key = tuple(cfg.values())
+        if key in seen or not valid(cfg): continue
+        seen.add(key); out.append(cfg)
+        if len(out) == n: break
+    return out
+
+def strategies(cfg: Dict[str, Any]) -> list:
+    return [EMAStrategy(cfg["ema_fast"], cfg["ema_slow"]),
+            RSIStrategy(cfg["rsi_low"], cfg["rsi_high"], cfg["rsi_period"]),
+            MomentumStrategy(cfg["mom_window"])]
+
+# ---- worker side: the price array is attached once per process, never pickled per task ----
+_SHM: Optional[shared_memory.SharedMemory] = None
+_PRICES: Optional[np.ndarray] = None
+_PRUNE: Dict[str, float] = {}
+
+def _attach(name: str, n: int, prune_after: float, prune_below: float):
+    global _SHM, _PRICES, _PRUNE
+    _SHM = shared_memory.SharedMemory(name=name)
+    _PRICES = np.ndarray((n,), dtype=np.float64, buffer=_SHM.buf)
+    _PRUNE = {"after": prune_after, "below": prune_below}
+
+def evaluate(cfg: Dict[str, Any], prices: Optional[np.ndarray] = None, prune_after: Optional[float] = None,
+             prune_below: Optional[float] = None) -> Dict[str, Any]:
+    """One config -> report row. A run is pruned when, past `prune_after` of the bars,
+    equity sits below `prune_below` x start equity."""
+    prices = _PRICES if prices is None else prices
+    after = _PRUNE.get("after", 0.0) if prune_after is None else prune_after
+    below = _PRUNE.get("below", 0.0) if prune_below is None else prune_below
+    min_bar = int(len(prices) * after); floor = START_EQUITY * below
+    stop = (lambda i, eq: i >= min_bar and eq < floor) if below > 0 else None
+    res = run_backtest(prices, strats=strategies(cfg), stop_on_halt=True, threshold=cfg["threshold"], stop_when=stop)
+    return {"params": cfg, "pnl": round(res.final_equity - START_EQUITY, 6),
+            "pnl_pct": round((res.final_equity / START_EQUITY - 1) * 100, 3), "max_drawdown": round(res.max_drawdown, 6),
+            "trades": len(res.fills), "bars": res.bars, "halted_at": res.halted_at, "pruned": res.stopped_at is not None,
+            "elapsed_sec": round(res.elapsed, 3)}
+
+def _rank_key(r: Dict[str, Any]):
+    # completed runs first, then by PnL, then by shallower drawdown
+    return (r["pruned"] or r["halted_at"] is not None, -r["pnl"], r["max_drawdown"])
+
+def sweep(prices: np.ndarray, configs: Sequence[Dict[str, Any]], workers: Optional[int] = None,
+          prune_after: float = 0.25, prune_below: float = 0.9) -> List[Dict[str, Any]]:
+    """Evaluate configs on a process pool; prices are placed in shared memory once."""
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=shm.buf)[:] = prices
+        chunk = max(1, len(configs) // (workers * 8))
+        with ProcessPoolExecutor(workers, initializer=_attach,
+                                 initargs=(shm.name, len(prices), prune_after, prune_below)) as pool:
+            rows = list(pool.map(evaluate, configs, chunksize=chunk))
+    finally:
+        shm.close(); shm.unlink()
+    return sorted(rows, key=_rank_key)
+
+def report(rows: List[Dict[str, Any]], top: int = 20, path: Optional[Path] = None) -> Path:
+    path = path or LOGS/f"sweep-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rows, indent=1))
+    print(f"{'rank':>4} {'pnl':>10} {'pnl%':>8} {'maxDD':>8} {'trades':>6}  params")
+    for i, r in enumerate(rows[:top], 1):
+        flag = " pruned" if r["pruned"] else (" halted" if r["halted_at"] is not None else "")
+        print(f"{i:>4} {r['pnl']:>10.4f} {r['pnl_pct']:>8.2f} {r['max_drawdown']:>8.4f} {r['trades']:>6}  {r['params']}{flag}")
+    return path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Parameter sweep over historical prices")
+    ap.add_argument("prices", type=Path, help=".npy or CSV with the price in the last column")
+    ap.add_argument("--samples", type=int, default=0, help="random configs to try (0 = full grid)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--prune-after", type=float, default=0.25)
+    ap.add_argument("--prune-below", type=float, default=0.9)
+    ap.add_argument("--top", type=int, default=20)
+    a = ap.parse_args()
+    configs = sample(a.samples, seed=a.seed) if a.samples else list(grid())
+    t0 = time.perf_counter()
+    rows = sweep(load_prices(a.prices), configs, a.workers, a.prune_after, a.prune_below)
+    out = report(rows, a.top)
+    print({"configs": len(rows), "pruned": sum(r["pruned"] for r in rows), "elapsed_sec": round(time.perf_counter()-t0, 2),
+           "report": str(out)})
@@ -1,98 +1,251 @@
-import asyncio
+import asyncio, time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
-from .settings import SYMBOL, INTERVAL_SEC, LOGS, STATE, START_EQUITY, STAKE_FRACTION, MAX_PER_TRADE, RESERVE_FRACTION, SL_PCT, TP_PCT, MAX_POSITIONS, MAX_DD_PCT
-from .types import State, Position, StrategyVote, Decision
-from .pricefeed import stream_prices
-from .atomic import atomic_write_json, atomic_append_csv
-from .voting import combine_votes
+from typing import Dict, List, Optional
+from .settings import SYMBOL, SYMBOLS, INTERVAL_SEC, LOGS, START_EQUITY, STAKE_FRACTION, MAX_PER_TRADE, RESERVE_FRACTION, SL_PCT, TP_PCT, MAX_POSITIONS, MAX_DD_PCT, FEED_KLINE_INTERVAL, WARMUP_BARS, EXECUTION, TICK_FLUSH_SEC
+from .types import State, Position
+from .pricefeed import price_stream
+from .klines import KlineCache
+from .atomic import STATE_JOURNAL
+from .exchange import SIM, SimExchange
+from .triggers import TriggerBook, ABOVE, BELOW
+from .ledger import Ledger
+from .tradestore import TRADES
+from .broadcast import HUB
+from .voting import VoteMatrix, THRESHOLD, reason
+from .profiler import install_signal
+from .metrics import STRATEGY, COMBINE, RISK, ORDER, FILLS, timed
 from ..plugins.ema import EMAStrategy
 from ..plugins.rsi import RSIStrategy
 from ..plugins.momentum import MomentumStrategy
 
-WS_CLIENTS = set()  # populated by API via import
+
+_FILLS = {"BUY": FILLS.labels("BUY"), "SELL": FILLS.labels("SELL")}
 
 def now(): return datetime.utcnow().replace(tzinfo=timezone.utc)
 
+def default_strats(): return [EMAStrategy(8,21), RSIStrategy(30,70,14), MomentumStrategy(12)]
+
 class Trader:
-    def __init__(self):
+    def __init__(self, strats=None, symbols=None, exchange: Optional[SimExchange] = None, threshold: float = THRESHOLD):
+        # strats: None (defaults per symbol), a list for a single symbol, or {symbol: [strategies]}
+        self.symbols = list(symbols or (strats.keys() if isinstance(strats, dict) else SYMBOLS))
+        if strats is None: strats = {s: default_strats() for s in self.symbols}
+        elif not isinstance(strats, dict): strats = {self.symbols[0]: strats}
+        self.strats: Dict[str, list] = strats
+        # histogram children resolved once so on_bar only pays for the observation
+        self._h_strat = {sym: [STRATEGY.labels(getattr(s, "name", type(s).__name__)) for s in st] for sym, st in strats.items()}
+        self.votes = VoteMatrix(strats, threshold)
+        self.marks: Dict[str, float] = {}
+        # orders fill against this simulated book when set; otherwise instantly at the bar price
+        self.exchange = exchange
+        # resting SL/TP exits per open lot: id(position) -> (position, stop trigger, take-profit trigger)
+        self.triggers = TriggerBook()
+        self._protect: Dict[int, tuple] = {}
         self.state = State(equity=START_EQUITY, cash=START_EQUITY, positions=[], peak_equity=START_EQUITY, halted=False)
-        self.strats = [EMAStrategy(8,21), RSIStrategy(30,70,14), MomentumStrategy(12)]
-        LOGS.mkdir(parents=True, exist_ok=True)
-        atomic_write_json(STATE, self.state.model_dump())
+        # open lots live in the ledger; equity/peak are plain floats on the per-bar path and are
+        # copied into self.state (a pydantic model) only when it is persisted
+        self.ledger = Ledger()
+        self.eq = self.peak = START_EQUITY
 
-    async def push_ws(self, kind:str, payload:dict):
-        dead=[]
-        for ws in list(WS_CLIENTS):
-            try:
-                await ws.send_json({"ts": now().isoformat(), "kind": kind, "payload": payload})
-            except Exception:
-                dead.append(ws)
-        for d in dead: WS_CLIENTS.discard(d)
+    def sync_state(self)->State:
+        st=self.state
+        st.positions=self.ledger.positions(); st.equity=self.eq; st.peak_equity=self.peak
+        st.realized_pnl=self.ledger.realized_total
+        return st
+
+    # persistence / fan-out hooks; the backtester swaps these for in-memory no-ops
+    def save_state(self, fills=()):
+        # the fills and the state they produced go into one journal record
+        STATE_JOURNAL.commit(self.sync_state().model_dump(mode="json"), fills)
+
+    def durable(self):
+        STATE_JOURNAL.barrier()
+
+    def log_fill(self, side:str, qty:float, price:float, stake:float, note:str, symbol:str=SYMBOL):
+        TRADES.append(ts=now(), symbol=symbol, side=side, qty=qty, price=price, stake=stake, note=note, source="trader")
 
-    def equity(self, mark: float)->float:
-        return self.state.cash + sum(p.qty*mark for p in self.state.positions)
+    def listening(self)->bool:
+        return len(HUB)>0
 
-    def risk_ok(self, mark: float)->bool:
-        eq=self.equity(mark); self.state.equity=eq; self.state.peak_equity=max(self.state.peak_equity, eq)
-        if eq < START_EQUITY*(1-MAX_DD_PCT): self.state.halted=True
+    def push_ws(self, kind:str, payload:dict):
+        HUB.publish(kind, payload)  # queues only; never waits on a socket
+
+    def exposure(self)->float:
+        return self.ledger.exposure(self.marks)
+
+    def equity(self)->float:
+        return self.state.cash + self.ledger.exposure(self.marks)
+
+    def open_positions(self, symbol:str)->List[Position]:
+        return list(self.ledger.lots.get(symbol, ()))
+
+    @timed(RISK.labels("risk_ok"))
+    def risk_ok(self)->bool:
+        eq=self.eq=self.equity()
+        if eq>self.peak: self.peak=eq
+        if eq < START_EQUITY*(1-MAX_DD_PCT) and not self.state.halted:
+            self.state.halted=True
         return not self.state.halted
 
-    def sizing(self, mark: float)->float:
-        free=self.state.cash - max(0.0, self.equity(mark)*RESERVE_FRACTION - sum(p.qty*mark for p in self.state.positions))
+    def sizing(self)->float:
+        ex=self.exposure()
+        free=self.state.cash - max(0.0, (self.state.cash+ex)*RESERVE_FRACTION - ex)
         size=min(max(free*STAKE_FRACTION, 0.0), MAX_PER_TRADE)
         return max(size, 0.0)
 
-    def close_signals(self, mark:float)->List[Position]:
-        exits=[]
-        for p in self.state.positions:
-            pnl=(mark - p.entry)*p.qty
-            if pnl <= -SL_PCT*p.stake or pnl >= TP_PCT*p.stake:
-                exits.append(p)
-        return exits
+    def _arm(self, p:Position):
+        # pnl <= -SL_PCT*stake  <=>  mark <= entry - SL_PCT*stake/qty (and likewise for TP)
+        per=p.stake/p.qty
+        self._protect[id(p)]=(p, self.triggers.add(p.symbol, p.entry - SL_PCT*per, BELOW, id(p)),
+                              self.triggers.add(p.symbol, p.entry + TP_PCT*per, ABOVE, id(p)))
+
+    def _disarm(self, p:Position):
+        t=self._protect.pop(id(p), None)
+        if t: self.triggers.cancel(t[1]); self.triggers.cancel(t[2])
 
-    def apply_fill(self, side:str, qty:float, price:float, stake:float, note:str):
+    def close_signals(self, symbol:str, mark:float)->List[Position]:
+        # only lots whose stop or take-profit level the mark crossed; nothing else is visited
+        exits={}
+        for k in self.triggers.cross(symbol, mark):
+            t=self._protect.get(k)
+            if t: exits[k]=t[0]
+        return list(exits.values())
+
+    def execute(self, side:str, qty:float, price:float, symbol:str, stake:float=0.0):
+        """(qty, price, fee) actually filled; BUYs spend `stake` of quote currency on the exchange."""
+        ex=self.exchange
+        if ex is None: return qty, price, 0.0
+        o=ex.submit(symbol, side, qty, owner="trader", quote=stake if side=='BUY' else None)
+        return o.filled, o.avg_price, o.fee
+
+    def _fill(self, side:str, qty:float, price:float, stake:float, note:str, symbol:str, lot:Optional[Position]=None):
+        qty, price, fee=self.execute(side, qty, price, symbol, stake)
+        if qty<=0: return
+        self.apply_fill(side, qty, price, stake, note, symbol, fee, lot)
+        self.push_ws("fill", {"symbol":symbol,"side":side,"qty":qty,"price":price,"note":note})
+
+    @timed(ORDER.labels("apply_fill"))
+    def apply_fill(self, side:str, qty:float, price:float, stake:float, note:str, symbol:str=SYMBOL, fee:float=0.0,
+                   lot:Optional[Position]=None):
         if side=='BUY':
-            self.state.cash -= qty*price
-            self.state.positions.append(Position(symbol=SYMBOL, qty=qty, entry=price, stake=stake, ts=now()))
+            self.state.cash -= qty*price + fee
+            p=Position(symbol=symbol, qty=qty, entry=price, stake=stake, ts=now())
+            self.ledger.open(p); self._arm(p)
         else:
-            if not self.state.positions: return
-            p=self.state.positions.pop(0)
-            pnl=(price - p.entry)*p.qty
-            self.state.cash += p.qty*price
-        atomic_write_json(STATE, self.state.model_dump())
-        atomic_append_csv(Path(LOGS/'trade_log.csv'), [now().isoformat(), SYMBOL, side, qty, price, stake, note])
-
-    async def on_bar(self, ts, price: float):
-        eq=self.equity(price)
-        if not self.risk_ok(price):
-            await self.push_ws("halt", {"equity":eq}); return
-        votes=[s.on_price(price) for s in self.strats]  # type: List[StrategyVote]
-        decision=combine_votes(votes)                   # type: Decision
-        await self.push_ws("votes", {"price":price, "decision":decision.model_dump()})
-        for p in self.close_signals(price):
-            self.apply_fill('SELL', p.qty, price, p.stake, "SL/TP exit")
-            await self.push_ws("fill", {"side":"SELL","qty":p.qty,"price":price,"note":"SL/TP"})
-        if decision.action=='BUY' and len(self.state.positions)<MAX_POSITIONS:
-            stake=self.sizing(price)
+            # the given lot (a triggered exit), else FIFO within the symbol
+            p=lot if lot is not None else self.ledger.first(symbol)
+            if p is None: return
+            self._disarm(p); held=p.qty
+            qty=self.ledger.close(p, qty, price, fee)
+            if qty<held: self._arm(p)  # partial fill: the rest of the lot stays open, re-levelled
+            self.state.cash += qty*price - fee
+        _FILLS[side].inc()
+        self.save_state(({"ts":now().isoformat(),"symbol":symbol,"side":side,"qty":qty,"price":price,"stake":stake,"note":note},))
+        self.log_fill(side, qty, price, stake, note, symbol)
+
+    def _mark(self, symbol:str, price:float)->bool:
+        self.marks[symbol]=price
+        if self.exchange is not None: self.exchange.on_price(symbol, price)
+        return self._gate()
+
+    def _gate(self)->bool:
+        if not self.risk_ok():
+            self.push_ws("halt", {"equity":self.eq}); return False
+        return True
+
+    def _score(self, symbol:str, price:float):
+        # strategies write plain floats into the vote matrix column; no pydantic on this path
+        vm=self.votes; j=vm.col[symbol]; pc=time.perf_counter
+        for i,(s,h) in enumerate(zip(self.strats[symbol], self._h_strat[symbol])):
+            t0=pc(); b,c=s.score(price); h.since(t0)
+            vm.bias[i,j]=b; vm.conf[i,j]=c
+
+    def _act(self, symbol:str, price:float, code:int, score:float, conf:float):
+        if self.listening():
+            self.push_ws("votes", {"symbol":symbol, "price":price, "decision":self.votes.decision(symbol).model_dump()})
+        for p in self.close_signals(symbol, price):
+            self._fill('SELL', p.qty, price, p.stake, "SL/TP exit", symbol, p)
+        if code==1 and self.ledger.count(symbol)<MAX_POSITIONS:
+            stake=self.sizing()
             if stake>0:
-                qty=stake/price
-                self.apply_fill('BUY', qty, price, stake, decision.reason)
-                await self.push_ws("fill", {"side":"BUY","qty":qty,"price":price,"note":decision.reason})
-        elif decision.action=='SELL' and self.state.positions:
-            p=self.state.positions[0]
-            self.apply_fill('SELL', p.qty, price, p.stake, decision.reason)
-            await self.push_ws("fill", {"side":"SELL","qty":p.qty,"price":price,"note":decision.reason})
+                self._fill('BUY', stake/price, price, stake, reason(score, conf), symbol)
+        elif code==-1:
+            p=self.ledger.first(symbol)
+            if p is not None:
+                self._fill('SELL', p.qty, price, p.stake, reason(score, conf), symbol)
+
+    async def on_bar(self, ts, price: float, symbol: Optional[str] = None):
+        symbol=symbol or self.symbols[0]
+        if symbol not in self.strats: return
+        if not self._mark(symbol, price): return
+        self._score(symbol, price)
+        t0=time.perf_counter(); code, score, conf=self.votes.combine_one(symbol); COMBINE.since(t0)
+        self._act(symbol, price, code, score, conf)
+
+    async def on_tick(self, ts, prices: Dict[str, float]):
+        """One bar for several symbols: score them all, then decide every symbol in one vectorized step."""
+        prices={s:p for s,p in prices.items() if s in self.strats}
+        if not prices: return
+        self.marks.update(prices)
+        if self.exchange is not None:
+            for s,p in prices.items(): self.exchange.on_price(s, p)
+        if not self._gate(): return
+        for s,p in prices.items(): self._score(s, p)
+        vm=self.votes
+        t0=time.perf_counter(); vm.combine(); COMBINE.since(t0)
+        for s,p in prices.items():
+            j=vm.col[s]
+            self._act(s, p, int(vm.code[j]), float(vm.score[j]), float(vm.confidence[j]))
+
+    def warm_up(self, every:float=INTERVAL_SEC, n:int=WARMUP_BARS):
+        # replay cached closes through the strategies so indicators don't start cold; no orders.
+        # the cache holds FEED_KLINE_INTERVAL candles: sample one per trading interval (`every`
+        # seconds) so the warmed-up indicators have the periods they will see live
+        for sym, strats in self.strats.items():
+            cache=KlineCache(sym, FEED_KLINE_INTERVAL)
+            for p in cache.last(n, max(1, round(every*1000/cache.step))).tolist():
+                for s in strats: s.score(p)
 
     async def run(self):
-        async for bar in stream_prices(SYMBOL, INTERVAL_SEC):
-            await self.on_bar(bar.ts, bar.price)
+        # first journal record when trading starts, not on construction: importing this module
+        # (backtest, sweep) must leave the live journal alone
+        self.save_state()
+        self.warm_up()
+        # bars of one tick share a timestamp: hand them to on_tick together, but never hold
+        # the tick longer than TICK_FLUSH_SEC for a symbol that is late or missing
+        q: asyncio.Queue=asyncio.Queue()
+        async def pump():
+            try:
+                async for bar in price_stream(self.symbols, INTERVAL_SEC): q.put_nowait(bar)
+            finally:
+                q.put_nowait(None)
+        feed=asyncio.create_task(pump())
+        pending: Dict[str, float]={}; ts=None; due=0.0
+        try:
+            while True:
+                if pending:
+                    try: bar=await asyncio.wait_for(q.get(), max(0.0, due-time.monotonic()))
+                    except asyncio.TimeoutError: bar=False
+                else:
+                    bar=await q.get()
+                if pending and (not bar or bar.ts!=ts):
+                    await self.on_tick(ts, pending); self.durable(); pending={}
+                if bar is None: break
+                if bar is False: continue
+                if not pending: due=time.monotonic()+TICK_FLUSH_SEC
+                ts=bar.ts; pending[bar.symbol]=bar.price
+                if len(pending)==len(self.symbols):
+                    await self.on_tick(ts, pending); self.durable(); pending={}
+            await feed  # re-raise whatever ended the stream
+        finally:
+            feed.cancel()
 
-TRADER = Trader()
+TRADER = Trader(exchange=SIM if EXECUTION=="sim" else None)
 
 async def main():
     await TRADER.run()
 
 if __name__=="__main__":
+    install_signal()
     asyncio.run(main())
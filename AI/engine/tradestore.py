@@ -0,0 +1,229 @@
+import asyncio
+import atexit, csv, sqlite3, sys, threading, time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from .settings import LOGS
+
+TRADE_DB = LOGS/"trades.db"
+
+# union of the three legacy CSV schemas (executor, trading.Account, atomic_append_csv)
+COLS = ("ts", "symbol", "plugin", "side", "price", "qty", "cash_delta", "balance_after",
+        "pos_qty_after", "avg_price_after", "stake", "realized_pnl", "note", "source")
+_INSERT = f"INSERT INTO trades ({','.join(COLS)}) VALUES ({','.join('?'*len(COLS))})"
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS trades (id INTEGER PRIMARY KEY, ts REAL NOT NULL, symbol TEXT, plugin TEXT, side TEXT,
+  price REAL, qty REAL, cash_delta REAL, balance_after REAL, pos_qty_after REAL, avg_price_after REAL,
+  stake REAL, realized_pnl REAL, note TEXT, source TEXT);
+CREATE INDEX IF NOT EXISTS trades_ts ON trades(ts);
+CREATE INDEX IF NOT EXISTS trades_plugin_ts ON trades(plugin, ts);
+CREATE INDEX IF NOT EXISTS trades_symbol_ts ON trades(symbol, ts);
+"""
+
+def _epoch(ts) -> float:
+    if ts is None: return time.time()
+    if isinstance(ts, (int, float)): return float(ts)
+    if isinstance(ts, datetime): return ts.timestamp() if ts.tzinfo else ts.replace(tzinfo=timezone.utc).timestamp()
+    s = str(ts).strip()
+    try: return float(s)
+    except ValueError: pass
+    d = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    return (d if d.tzinfo else d.replace(tzinfo=timezone.utc)).timestamp()
+
+def _iso(ep: float) -> str:
+    return datetime.fromtimestamp(ep, tz=timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+def _num(v) -> Optional[float]:
+    try: return float(v)
+    except (TypeError, ValueError): return None
+
+class TradeStore:
+    """Append-optimised trade log in SQLite (WAL).
+
+    append() only buffers a tuple; a writer thread commits buffered rows with
+    one executemany per batch. Reads flush pending rows first and use the
+    primary key or the ts / (plugin, ts) / (symbol, ts) indexes, so none of
+    them scan the table.
+    """
+    def __init__(self, path: Path = TRADE_DB, batch: int = 512, flush_interval: float = 0.2):
+        self.path = path
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self._buf: List[tuple] = []
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self.appended = 0  # rows appended by this process; change marker for live views
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL"); db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            db.row_factory = sqlite3.Row
+            self._db = db
+        return self._db
+
+    # ---- write path ----
+    def append(self, *, symbol: str, side: str, price: float, qty: float, ts=None, plugin: Optional[str] = None,
+               source: str = "", **fields):
+        row = (_epoch(ts), symbol, plugin, side, float(price), float(qty),
+               fields.get("cash_delta"), fields.get("balance_after"), fields.get("pos_qty_after"),
+               fields.get("avg_price_after"), fields.get("stake"), fields.get("realized_pnl"),
+               fields.get("note"), source)
+        with self._lock:
+            self._buf.append(row)
+            self.appended += 1
+            n = len(self._buf)
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name="trade-writer", daemon=True)
+            self._writer.start()
+        if n == 1 or n >= self.batch:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(); self._wake.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _write_locked(self, rows: Iterable[tuple]):
+        db = self._conn()
+        db.execute("BEGIN")
+        try:
+            db.executemany(_INSERT, rows)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK"); raise
+
+    def _write(self, rows: Iterable[tuple]):
+        with self._db_lock:
+            self._write_locked(rows)
+
+    def flush(self):
+        # swap and commit under the db lock so batches land in append order
+        with self._db_lock:
+            with self._lock:
+                rows, self._buf = self._buf, []
+            if rows:
+                try:
+                    self._write_locked(rows)
+                except Exception:
+                    with self._lock: self._buf[:0] = rows
+                    raise
+
+    # ---- reads ----
+    def _query(self, sql: str, args=()) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._db_lock:
+            rows = self._conn().execute(sql, args).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r); d["ts"] = _iso(d["ts"]); out.append(d)
+        return out
+
+    def last(self, n: int = 50) -> List[Dict[str, Any]]:
+        """Most recent n rows, oldest first."""
+        return self._query("SELECT * FROM (SELECT * FROM trades ORDER BY id DESC LIMIT ?) ORDER BY id", (int(n),))
+
+    def after(self, cursor: int, limit: int = 500) -> List[Dict[str, Any]]:
+        """Rows with id > cursor, oldest first (primary-key range scan)."""
+        return self._query("SELECT * FROM trades WHERE id > ? ORDER BY id LIMIT ?", (int(cursor), int(limit)))
+
+    def between(self, t1, t2, limit: int = 1000) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM trades WHERE ts >= ? AND ts < ? ORDER BY ts LIMIT ?", (_epoch(t1), _epoch(t2), int(limit)))
+
+    def by_plugin(self, plugin: str, n: int = 100) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM (SELECT * FROM trades WHERE plugin = ? ORDER BY ts DESC LIMIT ?) ORDER BY ts", (plugin, int(n)))
+
+    def by_symbol(self, symbol: str, n: int = 100) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM (SELECT * FROM trades WHERE symbol = ? ORDER BY ts DESC LIMIT ?) ORDER BY ts", (symbol, int(n)))
+
+    def count(self) -> int:
+        self.flush()
+        with self._db_lock:
+            return self._conn().execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close(); self._db = None
+
+    # ---- migration ----
+    def import_csv(self, path: Path, chunk: int = 10_000) -> int:
+        """Import a legacy trade_log.csv. Rows are classified one by one because
+        the three writers shared the file name and may have interleaved."""
+        n = 0; rows: List[tuple] = []
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            for r in csv.reader(f):
+                row = _legacy_row(r)
+                if row is None: continue
+                rows.append(row); n += 1
+                if len(rows) >= chunk:
+                    self._write(rows); rows = []
+        if rows: self._write(rows)
+        return n
+
+def _legacy_row(r: List[str]) -> Optional[tuple]:
+    if not r or r[0] == "ts": return None
+    try:
+        if len(r) == 10 and r[1] in ("buy", "sell", "hold"):
+            # trading.Account: ts,action,price,qty,balance,position,size,avg_price,unrealized_pnl,realized_pnl
+            return (_epoch(r[0]), None, "account", r[1].upper(), _num(r[2]), _num(r[3]), None, _num(r[4]),
+                    _num(r[5]), _num(r[7]), None, _num(r[9]), None, "account")
+        if len(r) == 10:
+            # executor: ts,symbol,plugin,side,price,qty,cash_delta,balance_after,pos_qty_after,avg_price_after
+            return (_epoch(r[0]), r[1], r[2], r[3], _num(r[4]), _num(r[5]), _num(r[6]), _num(r[7]),
+                    _num(r[8]), _num(r[9]), None, None, None, "executor")
+        if len(r) == 7:
+            # atomic_append_csv: ts,symbol,side,qty,price,stake,note
+            return (_epoch(r[0]), r[1], None, r[2], _num(r[4]), _num(r[3]), None, None, None, None,
+                    _num(r[5]), None, r[6], "trader")
+    except ValueError:
+        return None
+    return None
+
+TRADES = TradeStore()
+atexit.register(TRADES.close)
+
+def migrate(csv_path: Path = LOGS/"trade_log.csv", store: TradeStore = TRADES) -> int:
+    """One-off import of a legacy CSV; the file is renamed so it is never imported twice."""
+    if not csv_path.exists(): return 0
+    n = store.import_csv(csv_path)
+    csv_path.rename(csv_path.with_name(csv_path.name + ".migrated"))
+    return n
+
+def bench(total: int = 10_000_000, step: int = 1_000_000, path: Path = LOGS/"trades_bench.db"):
+    """Append cost per row and query latency as the table grows to `total` rows."""
+    for p in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        if p.exists(): p.unlink()
+    st = TradeStore(path, batch=10_000, flush_interval=3600)
+    plugins = ["ema", "rsi", "momentum", "ai", "manual"]; syms = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    t_base = 1_700_000_000.0; written = 0
+    while written < total:
+        t0 = time.perf_counter()
+        for i in range(written, written + step):
+            st.append(ts=t_base + i, symbol=syms[i % 3], plugin=plugins[i % 5], side="BUY" if i & 1 else "SELL",
+                      price=100.0 + i % 97, qty=0.01)
+            if len(st._buf) >= st.batch: st.flush()
+        st.flush(); written += step
+        append_us = (time.perf_counter() - t0) / step * 1e6
+        q = {}
+        for name, fn in (("last_200", lambda: st.last(200)),
+                         ("between_1h", lambda: st.between(t_base + written - 7200, t_base + written - 3600)),
+                         ("by_plugin_100", lambda: st.by_plugin("rsi", 100))):
+            t0 = time.perf_counter()
+            for _ in range(20): fn()
+            q[name] = round((time.perf_counter() - t0) / 20 * 1000, 3)
+        print({"rows": written, "append_us_per_row": round(append_us, 3), "query_ms": q}, flush=True)
+    st.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        print({"imported": migrate(Path(sys.argv[2]) if len(sys.argv) > 2 else LOGS/"trade_log.csv")})
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:4]))
@@ -0,0 +1,78 @@
+import heapq, itertools, sys, time
+from typing import Any, Dict, List, Optional, Tuple
+
+ABOVE, BELOW = 1, -1  # fire when the price rises to / falls to the level
+
+class TriggerBook:
+    """Price-indexed triggers (resting limit / stop / take-profit levels).
+
+    Per symbol, a min-heap of levels that fire when the price rises to them and
+    a max-heap of levels that fire when it falls to them. cross() pops only the
+    entries the new price reaches, so a tick costs O(fired * log n) however many
+    triggers rest. cancel() is O(1): the entry is dropped when it surfaces.
+    """
+    def __init__(self):
+        self._up: Dict[str, List[Tuple[float, int]]] = {}
+        self._down: Dict[str, List[Tuple[float, int]]] = {}
+        self._live: Dict[int, Tuple[str, float, int, Any]] = {}  # id -> (symbol, level, direction, payload)
+        self._ids = itertools.count(1)
+
+    def add(self, symbol: str, level: float, direction: int, payload: Any = None) -> int:
+        tid = next(self._ids)
+        self._live[tid] = (symbol, level, direction, payload)
+        if direction == ABOVE: heapq.heappush(self._up.setdefault(symbol, []), (level, tid))
+        else: heapq.heappush(self._down.setdefault(symbol, []), (-level, tid))
+        return tid
+
+    def cancel(self, tid: int) -> bool:
+        return self._live.pop(tid, None) is not None
+
+    def cross(self, symbol: str, price: float) -> List[Any]:
+        """Payloads of every trigger `price` reaches; each fires once and is removed."""
+        out: List[Any] = []
+        live = self._live
+        up = self._up.get(symbol)
+        while up and up[0][0] <= price:
+            t = live.pop(heapq.heappop(up)[1], None)
+            if t is not None: out.append(t[3])
+        down = self._down.get(symbol)
+        while down and -down[0][0] >= price:
+            t = live.pop(heapq.heappop(down)[1], None)
+            if t is not None: out.append(t[3])
+        return out
+
+    def level(self, tid: int) -> Optional[float]:
+        t = self._live.get(tid)
+        return None if t is None else t[1]
+
+    def pending(self, symbol: Optional[str] = None) -> int:
+        return len(self._live) if symbol is None else sum(1 for t in self._live.values() if t[0] == symbol)
+
+    def __len__(self): return len(self._live)
+
+def bench(n: int = 10_000, ticks: int = 100_000):
+    """Per-tick cost with n resting triggers, against a linear scan of the same levels."""
+    import random
+    rng = random.Random(1); tb = TriggerBook(); px = 100.0
+    levels: List[Tuple[float, int]] = [(0.0, ABOVE)] * n
+    def arm(i):  # a fresh level 0.1%..20% away on the side the price has to travel to
+        d = rng.choice((ABOVE, BELOW)); levels[i] = (px * (1 + d * rng.uniform(0.001, 0.2)), d)
+        tb.add("X", levels[i][0], d, i)
+    for i in range(n): arm(i)
+    pc = time.perf_counter; fired = 0
+    t0 = pc()
+    for _ in range(ticks):
+        px *= 1 + rng.uniform(-1e-3, 1e-3)
+        hit = tb.cross("X", px); fired += len(hit)
+        for i in hit: arm(i)  # keep the book at n
+    dt = pc() - t0
+    t0 = pc()
+    for _ in range(100):
+        [i for i, (lv, d) in enumerate(levels) if (px >= lv if d == ABOVE else px <= lv)]
+    scan = (pc() - t0) / 100
+    print({"triggers": n, "ticks": ticks, "fired": fired, "us_per_tick": round(dt / ticks * 1e6, 3),
+           "scan_us_per_tick": round(scan * 1e6, 1)})
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:4]))
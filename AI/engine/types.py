@@ -22,3 +22,4 @@ class Fill(BaseModel):
     symbol: str; side: Literal['BUY','SELL']; qty: float; price: float; ts: datetime
 class State(BaseModel):
     equity: float; cash: float; positions: List[Position]; peak_equity: float; halted: bool
+    realized_pnl: float = 0.0
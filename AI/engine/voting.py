@@ -1,14 +1,84 @@
-from typing import List
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 from .types import StrategyVote, Decision
-def combine_votes(votes: List[StrategyVote]) -> Decision:
+THRESHOLD = 0.15  # |score| above this is a BUY/SELL, for both combine paths
+
+def combine_votes(votes: List[StrategyVote], threshold: float = THRESHOLD) -> Decision:
     if not votes:
         return Decision(action='HOLD', confidence=0.0, reason='no-votes', votes=[])
     num = sum(v.bias * max(v.confidence,1e-6) for v in votes)
     den = sum(max(v.confidence,1e-6) for v in votes)
     score = num / den if den else 0.0
     conf = min(sum(v.confidence for v in votes)/max(len(votes),1), 1.0)
-    if score > 0.15: act = 'BUY'
-    elif score < -0.15: act = 'SELL'
+    if score > threshold: act = 'BUY'
+    elif score < -threshold: act = 'SELL'
     else: act = 'HOLD'
     reason = f"score={score:.3f} conf={conf:.2f}"
     return Decision(action=act, confidence=conf, reason=reason, votes=votes)
+
+# ---- array path: bias/confidence live in preallocated (strategies x columns) matrices ----
+ACTIONS = ('SELL', 'HOLD', 'BUY')  # index = code + 1
+
+def combine_arrays(bias: np.ndarray, conf: np.ndarray, mask: np.ndarray = None,
+                   threshold: float = THRESHOLD) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """combine_votes() for every column at once -> (action code -1/0/+1, score, confidence).
+
+    Rows are strategies; `mask` marks the rows a column actually has (columns
+    may have different strategy counts). Same arithmetic as combine_votes."""
+    w = np.maximum(conf, 1e-6)
+    if mask is not None: w = w * mask; conf = conf * mask
+    den = w.sum(axis=0)
+    n = mask.sum(axis=0) if mask is not None else np.full(bias.shape[1], bias.shape[0])
+    score = np.divide((bias * w).sum(axis=0), den, out=np.zeros_like(den), where=den > 0)
+    confidence = np.minimum(np.divide(conf.sum(axis=0), np.maximum(n, 1)), 1.0)
+    code = (score > threshold).astype(np.int8) - (score < -threshold).astype(np.int8)
+    return code, score, confidence
+
+def reason(score: float, conf: float) -> str:
+    return f"score={score:.3f} conf={conf:.2f}"
+
+class VoteMatrix:
+    """Preallocated strategies x symbols bias/confidence matrices.
+
+    Strategies write floats straight into bias/conf; combine() decides every
+    symbol in one vectorized step. decision() builds the pydantic Decision for
+    one symbol only when an API / WS consumer asks for it."""
+    def __init__(self, strats: Dict[str, Sequence], threshold: float = THRESHOLD):
+        self.symbols = list(strats); self.threshold = threshold
+        self.col = {s: j for j, s in enumerate(self.symbols)}
+        self.strats = strats
+        rows = max((len(v) for v in strats.values()), default=0)
+        shape = (rows, len(self.symbols))
+        self.bias = np.zeros(shape); self.conf = np.zeros(shape); self.mask = np.zeros(shape)
+        for s, st in strats.items(): self.mask[:len(st), self.col[s]] = 1.0
+        self.full = bool(self.mask.all())
+        self.code = np.zeros(len(self.symbols), dtype=np.int8)
+        self.score = np.zeros(len(self.symbols)); self.confidence = np.zeros(len(self.symbols))
+
+    def combine(self) -> np.ndarray:
+        self.code, self.score, self.confidence = combine_arrays(self.bias, self.conf, None if self.full else self.mask, self.threshold)
+        return self.code
+
+    def combine_one(self, symbol: str) -> Tuple[int, float, float]:
+        # one column; plain floats beat NumPy dispatch for a handful of strategies
+        j = self.col[symbol]; n = len(self.strats[symbol])
+        if not n: return 0, 0.0, 0.0
+        b = self.bias[:n, j].tolist(); c = self.conf[:n, j].tolist()
+        num = den = cs = 0.0
+        for bi, ci in zip(b, c):
+            w = ci if ci > 1e-6 else 1e-6
+            num += bi*w; den += w; cs += ci
+        score = num/den; conf = min(cs/n, 1.0)
+        th = self.threshold
+        code = 1 if score > th else (-1 if score < -th else 0)
+        self.code[j] = code; self.score[j] = score; self.confidence[j] = conf
+        return code, score, conf
+
+    def decision(self, symbol: str) -> Decision:
+        j = self.col[symbol]; st = self.strats[symbol]
+        if not st:
+            return Decision(action='HOLD', confidence=0.0, reason='no-votes', votes=[])
+        votes = [StrategyVote(name=s.name, bias=float(self.bias[i, j]), confidence=float(self.conf[i, j]), note=s.note())
+                 for i, s in enumerate(st)]
+        return Decision(action=ACTIONS[int(self.code[j]) + 1], confidence=float(self.confidence[j]),
+                        reason=reason(float(self.score[j]), float(self.confidence[j])), votes=votes)
@@ -0,0 +1,20 @@
+import numpy as np
+from ..engine.strategy_sdk import Strategy
+from ..engine.indicators import ema, ema_batch
+class EMAStrategy(Strategy):
+    def __init__(self, fast:int=12, slow:int=26):
+        super().__init__(f"EMA_{fast}_{slow}")
+        self.fast=None; self.slow=None; self.p_fast=fast; self.p_slow=slow; self.diff=None
+    def score(self, price: float):
+        self.fast=ema(self.fast, price, self.p_fast)
+        self.slow=ema(self.slow, price, self.p_slow)
+        if self.fast is None or self.slow is None:
+            self.diff=None; return 0.0, 0.0
+        diff=self.diff=(self.fast - self.slow)/max(self.slow,1e-9)
+        return max(min(diff*5, 1.0), -1.0), min(abs(diff)*20, 1.0)
+    def note(self) -> str:
+        return "warming" if self.diff is None else f"diff={self.diff:.5f}"
+    def scores_batch(self, prices):
+        fast=ema_batch(prices, self.p_fast); slow=ema_batch(prices, self.p_slow)
+        diff=(fast - slow)/np.maximum(slow, 1e-9)
+        return np.clip(diff*5, -1.0, 1.0), np.minimum(np.abs(diff)*20, 1.0)
@@ -0,0 +1,17 @@
+import numpy as np
+from ..engine.strategy_sdk import Strategy
+from ..engine.indicators import Momentum, momentum_slope_batch
+class MomentumStrategy(Strategy):
+    def __init__(self, window:int=10):
+        super().__init__(f"MOM_{window}")
+        self.mom=Momentum(window); self.window=window; self.slope=None
+    def score(self, price: float):
+        slope=self.slope=self.mom.update(price)
+        if slope is None: return 0.0, 0.0
+        return max(min(slope*5,1.0),-1.0), min(abs(slope)*10,1.0)
+    def note(self) -> str:
+        return "warming" if self.slope is None else f"slope={self.slope:.5f}"
+    def scores_batch(self, prices):
+        slope=momentum_slope_batch(prices, self.window)
+        warm=np.isnan(slope); s=np.where(warm, 0.0, slope)
+        return np.where(warm, 0.0, np.clip(s*5, -1.0, 1.0)), np.where(warm, 0.0, np.minimum(np.abs(s)*10, 1.0))
@@ -1,57 +1,335 @@
-import asyncio
-import json, random
+import asyncio, atexit, os, sys, time
+import json, random, struct, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
+from .settings import AI_HISTORY, AI_HISTORY_LEN, AI_CHECKPOINTS, AI_CHECKPOINT_KEEP, AI_AUTOSAVE_SEC
+from .atomic import atomic_write_bytes
 
-MODEL = Path("models/ai_linear.json")
+MODEL = Path("models/ai_linear.json")  # pre-checkpoint format, still read when no checkpoint exists
 ACTIONS = ["HOLD","BUY","SELL"]
 _LAST = {"reward": 0.0, "conf": 0.0, "action": "HOLD"}
+REPLAY_SIZE = int(os.getenv("AURORA_AI_REPLAY", "50000"))
+BATCH = int(os.getenv("AURORA_AI_BATCH", "32"))  # transitions learned per live tick (bounds the per-tick cost)
 
-def _features(history_prices, pos_qty, cash, price, k=20):
-    hp = history_prices[-k:] if len(history_prices) >= k else [price]*(k-len(history_prices)) + list(history_prices)
-    hp = np.array(hp, dtype=float)
-    rets = np.diff(hp, prepend=hp[0])
-    if hp[-1] != 0:
-        rets = rets / (abs(hp[-1]) + 1e-9)
-    pos_flag = np.array([1.0 if pos_qty>0 else 0.0, cash/(cash + pos_qty*price + 1e-9)], dtype=float)
-    return np.concatenate([rets[-k:], pos_flag])
+class PriceRing:
+    """The last `cap` prices and their tick-to-tick changes in fixed arrays.
+
+    Every value is written twice (slot j and j + cap), so the newest k entries are
+    always one contiguous slice: push() is O(1) and window()/changes() are views.
+    Persisted as a small binary sidecar (int64 header + float64 prices, oldest first).
+    With a `writer` (a callable that runs a function in the background, such as
+    Checkpointer.background) save() only snapshots the bytes on the tick path and
+    the fsync'd write happens off it; saves queued behind a running one coalesce.
+    """
+    VERSION = 1
+    def __init__(self, cap=AI_HISTORY_LEN, path=AI_HISTORY, save_every=30, writer=None):
+        self.cap, self.path, self.save_every, self.writer = cap, path, save_every, writer
+        self.p = np.zeros(2 * cap); self.d = np.zeros(2 * cap)
+        self.j = cap - 1; self.n = 0; self._unsaved = 0
+        self._lock = threading.Lock(); self._data = None
+
+    def push(self, price):
+        prev = self.p[self.j] if self.n else price
+        j = self.j = (self.j + 1) % self.cap
+        self.p[j] = self.p[j + self.cap] = price
+        self.d[j] = self.d[j + self.cap] = price - prev
+        self.n = min(self.n + 1, self.cap)
+        self._unsaved += 1
+        if self.save_every and self._unsaved >= self.save_every: self.save()
+
+    def last(self): return float(self.p[self.j]) if self.n else 0.0
+    def window(self, k): e = self.j + self.cap + 1; return self.p[e - k:e]
+    def changes(self, k): e = self.j + self.cap + 1; return self.d[e - k:e]
+    def prices(self): return self.window(self.n)
+    def __len__(self): return self.n
+
+    def save(self):
+        """Nothing to do unless prices were pushed or seeded since the last save (an empty or
+        merely loaded ring is never written)."""
+        if self.path is None or not self._unsaved: return
+        data = np.array([self.VERSION, self.n], dtype="<i8").tobytes() + self.prices().astype("<f8").tobytes()
+        self._unsaved = 0
+        if self.writer is None: atomic_write_bytes(self.path, data); return
+        with self._lock:
+            queued = self._data is not None; self._data = data
+        if not queued: self.writer(self._write)
+
+    def _write(self):
+        with self._lock: data, self._data = self._data, None
+        if data is not None: atomic_write_bytes(self.path, data)
+
+    def load(self):
+        if self.path is None or not self.path.exists(): return
+        raw = self.path.read_bytes()
+        ver, n = np.frombuffer(raw, dtype="<i8", count=2)
+        if ver != self.VERSION: return
+        self.seed(np.frombuffer(raw, dtype="<f8", offset=16, count=int(n)))
+        self._unsaved = 0  # identical to the file
+
+    def seed(self, prices):
+        self.n = 0; self.j = self.cap - 1
+        every, self.save_every = self.save_every, 0
+        for px in prices[-self.cap:]: self.push(float(px))
+        self.save_every = every; self._unsaved = self.n
+
+def _features(ring, pos_qty, cash, price, k=20, out=None):
+    """Scaled price changes over the last k ticks, then position flag and cash share; written into `out`."""
+    out = np.empty(k + 2) if out is None else out
+    last = ring.last()
+    np.multiply(ring.changes(k), 1.0 / (abs(last) + 1e-9) if last != 0 else 1.0, out=out[:k])
+    out[0] = 0.0  # changes within the window only, as in _price_features
+    out[k] = 1.0 if pos_qty > 0 else 0.0
+    out[k + 1] = cash / (cash + pos_qty * price + 1e-9)
+    return out
+
+def _price_features(prices, k=20):
+    """The price part of _features for every bar i >= k-1 at once: row j is bars j..j+k-1."""
+    p = np.asarray(prices, dtype=float)
+    d = np.diff(p, prepend=p[:1])
+    win = np.lib.stride_tricks.sliding_window_view(d, k).copy()
+    win[:, 0] = 0.0  # _features diffs within the window, so its first step is always 0
+    last = p[k-1:]
+    scale = np.where(last != 0, np.abs(last) + 1e-9, 1.0)
+    return win / scale[:, None]
+
+class Replay:
+    """Fixed-capacity ring buffer of (x, a, r, x2, done) transitions in preallocated arrays."""
+    def __init__(self, dim, cap=REPLAY_SIZE, seed=None):
+        self.cap, self.n, self.i = cap, 0, 0
+        self.X = np.zeros((cap, dim)); self.X2 = np.zeros((cap, dim))
+        self.A = np.zeros(cap, dtype=np.int64); self.R = np.zeros(cap); self.D = np.zeros(cap, dtype=bool)
+        self.rng = np.random.default_rng(seed)
+
+    def push(self, x, a, r, x2, done=False):
+        i = self.i
+        self.X[i] = x; self.A[i] = a; self.R[i] = r; self.X2[i] = x2; self.D[i] = done
+        self.i = (i + 1) % self.cap; self.n = min(self.n + 1, self.cap)
+
+    def sample(self, batch):
+        idx = self.rng.integers(0, self.n, size=min(batch, self.n))
+        return self.X[idx], self.A[idx], self.R[idx], self.X2[idx], self.D[idx]
+
+    def __len__(self): return self.n
 
 class LinearQLearner:
     def __init__(self, k=20, alpha=0.01, gamma=0.95, eps=0.1, stake=0.10):
         self.k, self.alpha, self.gamma, self.eps, self.stake = k, alpha, gamma, eps, stake
         self.W = np.zeros((3, k+2), dtype=float)
+        self.replay = Replay(k+2)
+        self._prev = None  # (x, a) of the last live step, completed into a transition by the next one
+        self._x = np.zeros((2, k+2)); self._t = 0  # live feature rows, alternating so _prev stays intact
+        self.updates = 0
 
     def qvals(self, x): return self.W @ x
     def act(self, x): return random.randrange(3) if random.random()<self.eps else int(np.argmax(self.qvals(x)))
     def td_update(self, x, a, r, x2, terminal=False):
         q = self.qvals(x); target = r if terminal else r + self.gamma*np.max(self.qvals(x2))
         self.W[a] += self.alpha * (target - q[a]) * x
-    def save(self): MODEL.parent.mkdir(parents=True, exist_ok=True); json.dump(
-        {"k":self.k,"alpha":self.alpha,"gamma":self.gamma,"eps":self.eps,"stake":self.stake,"W":self.W.tolist()}, MODEL.open("w"))
+        self.updates += 1
+    def td_batch(self, X, A, R, X2, D):
+        """One semi-gradient step averaged over a minibatch: rows (x, a, r, x2, done)."""
+        target = R + self.gamma * np.where(D, 0.0, (X2 @ self.W.T).max(axis=1))
+        err = target - np.einsum("ij,ij->i", X, self.W[A])
+        onehot = A[None, :] == np.arange(3)[:, None]  # (3, batch): rows routed to the action taken
+        self.W += self.alpha / len(A) * (onehot * err) @ X
+        self.updates += 1
+    def learn(self, batch=BATCH):
+        if len(self.replay) >= batch: self.td_batch(*self.replay.sample(batch))
+    def snapshot(self):
+        """(header, arrays) copied on the caller's thread; cheap next to the write itself."""
+        return ({"k": self.k, "alpha": self.alpha, "gamma": self.gamma, "eps": self.eps, "stake": self.stake,
+                 "updates": self.updates}, {"W": self.W.copy()})
+    def restore(self, header, arrays):
+        self.k = header.get("k", self.k); self.alpha = header.get("alpha", self.alpha)
+        self.gamma = header.get("gamma", self.gamma); self.eps = header.get("eps", self.eps)
+        self.stake = header.get("stake", self.stake); self.updates = header.get("updates", 0)
+        self.W = arrays["W"]
+        if self.replay.X.shape[1] != self.k+2: self.replay = Replay(self.k+2); self._x = np.zeros((2, self.k+2))
+    def save(self): CHECKPOINTS.save(self)
+    def load(self):
+        ck = CHECKPOINTS.load()
+        if ck is not None:
+            self.restore(*ck)
+        elif MODEL.exists():
+            d = json.load(MODEL.open())
+            self.restore(d, {"W": np.array(d["W"], dtype=float)})
+
+class Checkpointer:
+    """Versioned binary model checkpoints, written off the caller's thread.
+
+    File ckpt-<version>.bin: magic, u32 header length, JSON header (hyperparameters
+    plus dtype/shape/offset of each array), then the raw arrays 64-byte aligned, so
+    load() maps them copy-on-write instead of parsing. Writes go through one
+    background thread (a save requested while another is queued replaces it), land
+    atomically via rename, and only the newest `keep` versions are retained.
+    """
+    MAGIC = b"AURCKPT1"
+    def __init__(self, root=AI_CHECKPOINTS, keep=AI_CHECKPOINT_KEEP, every=AI_AUTOSAVE_SEC):
+        self.root, self.keep, self.every = root, keep, every
+        self._lock = threading.Lock()
+        self._pool = None; self._fut = None; self._next = None
+        self._on_disk = self._scan()  # kept current by _drain(); status() never lists the directory
+        self.version = max(self._on_disk, default=0)
+        self.last_save = time.monotonic(); self._saved_updates = 0
+        self.last = None
+
+    def path(self, v): return self.root/f"ckpt-{v:06d}.bin"
+    def _scan(self):
+        return sorted(int(p.stem[5:]) for p in self.root.glob("ckpt-*.bin") if p.stem[5:].isdigit()) if self.root.exists() else []
+    def versions(self):
+        with self._lock: return list(self._on_disk)
+
+    def save(self, agent) -> int:
+        header, arrays = agent.snapshot()
+        with self._lock:
+            self.version += 1
+            queued = self._next is not None
+            self._next = (self.version, header, arrays)
+            if not queued:
+                if self._pool is None: self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ckpt")
+                self._fut = self._pool.submit(self._drain)
+        self.last_save = time.monotonic(); self._saved_updates = agent.updates
+        return self.version
+
+    def maybe_save(self, agent):
+        """Autosave policy: at most every `every` seconds, and only when the weights changed."""
+        if self.every > 0 and agent.updates != self._saved_updates and time.monotonic() - self.last_save >= self.every:
+            self.save(agent)
+
+    def _drain(self):
+        with self._lock: job, self._next = self._next, None
+        if job is None: return
+        v, header, arrays = job
+        t0 = time.perf_counter()
+        meta, off = {}, 0
+        for name, a in arrays.items():
+            off = -(-off // 64) * 64
+            meta[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": off}; off += a.nbytes
+        head = json.dumps({**header, "version": v, "saved_at": time.time(), "arrays": meta}).encode()
+        start = -(-(len(self.MAGIC) + 4 + len(head)) // 64) * 64
+        buf = bytearray(start + off)
+        buf[:len(self.MAGIC)] = self.MAGIC
+        struct.pack_into("<I", buf, len(self.MAGIC), len(head))
+        buf[len(self.MAGIC) + 4:len(self.MAGIC) + 4 + len(head)] = head
+        for name, a in arrays.items():
+            o = start + meta[name]["offset"]; buf[o:o + a.nbytes] = np.ascontiguousarray(a).tobytes()
+        try:
+            atomic_write_bytes(self.path(v), bytes(buf))
+            with self._lock:
+                self._on_disk.append(v)
+                drop = self._on_disk[:-self.keep] if self.keep > 0 else []
+                del self._on_disk[:len(drop)]
+            for old in drop: self.path(old).unlink(missing_ok=True)
+        except OSError as e:
+            self.last = {"version": v, "error": str(e)}; return
+        self.last = {"version": v, "bytes": len(buf), "write_ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC: raise ValueError(f"{path.name}: not a checkpoint")
+            n = struct.unpack("<I", f.read(4))[0]; header = json.loads(f.read(n))
+        start = -(-(len(self.MAGIC) + 4 + n) // 64) * 64
+        arrays = {name: np.memmap(path, dtype=m["dtype"], mode="c", offset=start + m["offset"], shape=tuple(m["shape"]))
+                  for name, m in header.pop("arrays").items()}
+        return header, arrays
+
     def load(self):
-        if MODEL.exists():
-            d = json.load(MODEL.open()); self.k=d.get("k",self.k); self.alpha=d.get("alpha",self.alpha)
-            self.gamma=d.get("gamma",self.gamma); self.eps=d.get("eps",self.eps); self.stake=d.get("stake",self.stake)
-            self.W = np.array(d["W"], dtype=float)
+        """Newest readable checkpoint as (header, arrays), falling back past damaged files; None if there is none."""
+        for v in reversed(self.versions()):
+            try: return self.read(self.path(v))
+            except (OSError, ValueError, KeyError): continue
+        return None
+
+    def background(self, fn):
+        """Run fn() on the writer thread, after any checkpoint already queued."""
+        with self._lock:
+            if self._pool is None: self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ckpt")
+            return self._pool.submit(fn)
+
+    def flush(self):
+        fut = self._fut
+        if fut is not None: fut.result()
+
+    def close(self):
+        self.flush()
+        if self._pool is not None: self._pool.shutdown(wait=True); self._pool = None
+
+    def status(self):
+        return {"version": self.version, "versions": self.versions(), "keep": self.keep,
+                "autosave_sec": self.every, "last": self.last}
+
+CHECKPOINTS = Checkpointer()
+atexit.register(CHECKPOINTS.close)
 
 AGENT = LinearQLearner()
+HISTORY = PriceRing(writer=CHECKPOINTS.background)
+atexit.register(HISTORY.save)  # registered after CHECKPOINTS.close, so it runs first and close() waits for the write
 def set_eps(e): AGENT.eps = float(e)
 def set_stake(s): AGENT.stake = float(s)
-def save(): AGENT.save()
-def load(): AGENT.load()
+def save(): AGENT.save(); HISTORY.save()
+def load(): AGENT.load(); HISTORY.load()
 
-def step(history, pos_qty, cash, price, reward):
-    x = _features(history, pos_qty, cash, price, AGENT.k)
+def step(pos_qty, cash, price, reward):
+    HISTORY.push(price)
+    AGENT._t ^= 1
+    x = _features(HISTORY, pos_qty, cash, price, AGENT.k, out=AGENT._x[AGENT._t])
+    # reward is the equity change since the last tick, i.e. the outcome of the previous action
+    if AGENT._prev is not None:
+        AGENT.replay.push(AGENT._prev[0], AGENT._prev[1], reward, x)
+    AGENT.learn()
+    CHECKPOINTS.maybe_save(AGENT)
     a = AGENT.act(x)
-    AGENT.td_update(x, a, reward, x, terminal=False)
+    AGENT._prev = (x, a)
     conf = float(np.clip(np.max(AGENT.qvals(x)), 0, 10))/10.0
     action = ACTIONS[a]
     stake = max(0.02, min(0.25, AGENT.stake * (0.5 + 0.5*conf)))
     _LAST.update({"reward": float(reward), "conf": float(conf), "action": action})
     return {"action": action, "stake": stake, "conf": round(conf,3)}
 
+def train_offline(prices, epochs=1, cash=1000.0, batch=64, learn_every=1, agent=None, seed=0):
+    """Replay a price series through a simulated account (BUY spends `stake` of cash, SELL closes
+    the position) and learn from minibatches of the replay memory. The price features are
+    computed for the whole series up front; only the 2 position features are per bar."""
+    agent = agent or AGENT
+    p = np.asarray(prices, dtype=float)
+    if len(p) <= agent.k: return {"bars": 0, "transitions": 0}
+    F = _price_features(p, agent.k)
+    rng = random.Random(seed); agent.replay.rng = np.random.default_rng(seed)
+    t0 = time.perf_counter(); steps = 0; final = cash
+    for _ in range(epochs):
+        c, q = cash, 0.0
+        x = np.concatenate([F[0], (0.0, 1.0)])
+        for j in range(len(F) - 1):
+            px, nx = p[j + agent.k - 1], p[j + agent.k]
+            a = rng.randrange(3) if rng.random() < agent.eps else int(np.argmax(agent.W @ x))
+            if a == 1 and c > 0:
+                spend = c * agent.stake; q += spend / px; c -= spend
+            elif a == 2 and q > 0:
+                c += q * px; q = 0.0
+            r = (c + q * nx) - (c + q * px)
+            x2 = np.concatenate([F[j + 1], (1.0 if q > 0 else 0.0, c / (c + q * nx + 1e-9))])
+            agent.replay.push(x, a, r, x2)
+            steps += 1
+            if steps % learn_every == 0: agent.learn(batch)
+            x = x2
+        final = c + q * p[-1]
+    dt = time.perf_counter() - t0
+    return {"bars": len(p), "epochs": epochs, "transitions": steps, "final_equity": round(float(final), 4),
+            "elapsed_sec": round(dt, 3), "bars_per_sec": round(steps / dt) if dt else None}
+
 def status():
     return {
         "alpha": AGENT.alpha, "gamma": AGENT.gamma, "eps": AGENT.eps, "stake": AGENT.stake,
-        "last": dict(_LAST), "weights_shape": list(AGENT.W.shape)
-    }
\ No newline at end of file
+        "last": dict(_LAST), "weights_shape": list(AGENT.W.shape), "replay": len(AGENT.replay),
+        "checkpoint": CHECKPOINTS.status()
+    }
+
+if __name__ == "__main__":
+    # python -m engine.ai_agent train BTCUSDT 1m [epochs]   (history from engine.klines backfill)
+    if len(sys.argv) >= 4 and sys.argv[1] == "train":
+        from .klines import KlineCache
+        closes = KlineCache(sys.argv[2], sys.argv[3]).closes()
+        load()
+        print(train_offline(closes, int(sys.argv[4]) if len(sys.argv) > 4 else 1))
+        save()
@@ -1,6 +1,63 @@
+from typing import Optional
 from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from .logview import trades_page
+from .marketdata import MD
+from .dashboard import FEED
+from .dispatch import DISPATCHER
+from .metrics import REGISTRY, CONTENT_TYPE
+from .profiler import PROFILER
+from .state import STORE
+from .settings import SYMBOL
+from . import orders, risk
 app = FastAPI(default_response_class=ORJSONResponse)
+@app.on_event("shutdown")
+async def shutdown():
+    await MD.aclose()  # pooled Binance clients: close keep-alive connections with the server
 @app.get("/health")
 async def health():
     return {"status":"ok"}
+@app.get("/logs/trades")
+def logs_trades(n: int = 200, after: Optional[int] = None):
+    # after=<cursor from the previous response> returns only newer rows; cursor is None for legacy CSV rows
+    return trades_page(max(1, min(int(n), 5000)), after)
+@app.get("/stream")
+async def stream():
+    # dashboard feed: one `snapshot` event, then `delta` events carrying only the panels that changed
+    return StreamingResponse(FEED.stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+@app.get("/plugins/dispatch")
+def plugins_dispatch():
+    # per-plugin on_tick latency, budget overruns, timeouts and skipped ticks
+    return DISPATCHER.stats()
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+@app.get("/risk")
+def risk_status():
+    with STORE.view() as st:
+        return {**risk.get_config(st), "engine": risk.RISK_ENGINE.status(), "halted": st.get("halted")}
+@app.post("/risk/reset")
+def risk_reset(rebase: bool = True):
+    # clears the drawdown kill-switch latched in state["halted"] (it survives restarts);
+    # rebase=true makes the current equity the new drawdown baseline so it does not trip again at once
+    with STORE.mutate() as st:
+        risk.reset_kill_switch(st, rebase)
+        return {"ok": True, "initial_balance": st.get("initial_balance"), "engine": risk.RISK_ENGINE.status()}
+@app.get("/orders/resting")
+def resting_list(symbol: Optional[str] = None):
+    return orders.list_resting(symbol)
+@app.post("/orders/resting")
+def resting_place(kind: str, side: str, trigger: float, fraction: float, symbol: str = SYMBOL, plugin: str = "manual"):
+    # kind: LIMIT | STOP | TAKE_PROFIT; fires at market once the ticker sees the price cross `trigger`
+    return orders.place_resting(kind, side, trigger, fraction, plugin, symbol)
+@app.delete("/orders/resting/{oid}")
+def resting_cancel(oid: str):
+    return {"ok": orders.cancel_resting(oid)}
+@app.post("/profile")
+def profile_start(seconds: float = 10.0, hz: float = 100.0, threads: str = "all"):
+    # sampling capture of this process; the collapsed stacks land in logs/profile-*.folded
+    return PROFILER.start(seconds, hz, threads)
+@app.get("/profile")
+def profile_status():
+    return PROFILER.status()
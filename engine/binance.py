@@ -1,14 +1,18 @@
 import asyncio
-import httpx, time
+import json, time
+from typing import Dict, Sequence
+from .marketdata import MD
+from .settings import SYMBOL
 
-BASE = "https://api.binance.com"
-def get_latest_close(symbol="BTCUSDT", interval="1m"):
-    url = f"{BASE}/api/v3/klines"
+def get_latest_close(symbol=SYMBOL, interval="1m"):
     params = {"symbol": symbol, "interval": interval, "limit": 1}
-    with httpx.Client(timeout=5.0) as c:
-        r = c.get(url, params=params)
-        r.raise_for_status()
-        k = r.json()[0]
-        # open time, open, high, low, close, volume, close time, ...
-        close = float(k[4]); t_close = int(k[6])//1000
-        return {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t_close)), "price": round(close,2)}
\ No newline at end of file
+    k = MD.get_json("/api/v3/klines", params)[0]
+    # open time, open, high, low, close, volume, close time, ...
+    close = float(k[4]); t_close = int(k[6])//1000
+    return {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t_close)), "price": round(close,2)}
+
+
+def get_latest_prices(symbols: Sequence[str]) -> Dict[str, float]:
+    """Last price for every symbol from a single /ticker/price request."""
+    rows = MD.get_json("/api/v3/ticker/price", {"symbols": json.dumps(list(symbols), separators=(",",":"))})
+    return {r["symbol"]: float(r["price"]) for r in rows}
@@ -0,0 +1,112 @@
+import asyncio
+import copy
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from .state import STORE
+from .tradestore import TRADES
+from .ticker import ticker
+from . import risk
+from .metrics import PUSH, PUSH_CLIENTS
+
+_PUSH, _CLIENTS = PUSH.labels("sse"), PUSH_CLIENTS.labels("sse")
+
+TRADES_KEEP = 200
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+def _ai_status() -> Optional[dict]:
+    try:
+        from .ai_agent import status
+    except Exception:  # numpy missing or model not importable
+        return None
+    return status()
+
+class DashboardFeed:
+    """One shared producer for every open dashboard.
+
+    While at least one client is subscribed, a single task checks cheap
+    change markers (state version, trade-store append count, ticker count,
+    AI status) every `interval`, rebuilds only the panels whose source moved
+    and pushes a delta containing just the panels that differ. New clients
+    get the cached snapshot. Server work therefore follows the rate of
+    change, not tabs x panels.
+    """
+    def __init__(self, interval: float = 0.5, queue_size: int = 32):
+        self.interval, self.queue_size = interval, queue_size
+        self.panels: Dict[str, Any] = {}
+        self.trades: list = []
+        self.cursor = 0
+        self.subs: Set[asyncio.Queue] = set()
+        self._marks: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._collecting = asyncio.Lock()
+
+    async def collect(self, reset: bool = False) -> Dict[str, Any]:
+        # the SQLite and AI-status reads block; run them off the event loop, one collect at a time
+        async with self._collecting:
+            if reset: self._marks.clear(); self.panels.clear(); self.trades = []; self.cursor = 0
+            return await asyncio.to_thread(self._collect)
+
+    def _collect(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        if self._marks.get("state") != STORE.version:
+            # plain copies taken under the lock: panels never alias live state, so a nested change
+            # (a position's qty) shows up as a delta and serialising them later needs no lock
+            with STORE.view() as st:
+                self._marks["state"] = STORE.version
+                out["positions"] = {"balance": st.get("balance", 0.0), "positions": copy.deepcopy(st.get("positions", {})),
+                                    "realized_pnl": st.get("realized_pnl", 0.0)}
+                out["risk"] = {**risk.get_config(st), "engine": risk.RISK_ENGINE.status()}
+        tick = {"running": bool(ticker._task and not ticker._task.done()), "interval": ticker.interval,
+                "count": ticker.count, "last_tick": ticker.last_tick}
+        if tick != self.panels.get("tick"): out["tick"] = tick
+        ai = _ai_status()
+        if ai != self.panels.get("ai"): out["ai"] = ai
+        if self._marks.get("trades") != TRADES.appended:
+            self._marks["trades"] = TRADES.appended
+            rows = TRADES.last(TRADES_KEEP) if not self.cursor else TRADES.after(self.cursor, TRADES_KEEP)
+            if rows:
+                self.cursor = rows[-1]["id"]
+                self.trades = (self.trades + rows)[-TRADES_KEEP:]
+                out["trades"] = {"append": rows, "cursor": self.cursor}
+        return {k: v for k, v in out.items() if k == "trades" or self.panels.get(k) != v}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.panels, "health": {"status": "ok"}, "trades": {"rows": self.trades, "cursor": self.cursor}}
+
+    async def _loop(self):
+        try:
+            while self.subs:
+                delta = await self.collect()
+                if delta:
+                    t0 = time.perf_counter()
+                    self.panels.update({k: v for k, v in delta.items() if k != "trades"})
+                    msg = _sse("delta", delta)
+                    for q in list(self.subs):
+                        if q.full(): q.get_nowait()  # slow tab: drop its oldest delta, the next one still applies
+                        q.put_nowait(msg)
+                    _PUSH.since(t0)
+                await asyncio.sleep(self.interval)
+        finally:
+            self._task = None
+
+    async def stream(self) -> AsyncIterator[str]:
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        first = not self.subs
+        self.subs.add(q); _CLIENTS.set(len(self.subs))
+        if first: self.panels.update(await self.collect(reset=True))
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        try:
+            yield _sse("snapshot", self.snapshot())
+            while True:
+                try:
+                    yield await asyncio.wait_for(q.get(), 15.0)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.subs.discard(q); _CLIENTS.set(len(self.subs))
+
+FEED = DashboardFeed()
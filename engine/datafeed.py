@@ -1,9 +1,10 @@
 import asyncio
 import time, random
 from .binance import get_latest_close
+from .settings import SYMBOL
 
 class PriceFeed:
-    def __init__(self, symbol="BTCUSDT", start=30000.0, drift=0.0, vol=25.0, seed=42):
+    def __init__(self, symbol=SYMBOL, start=30000.0, drift=0.0, vol=25.0, seed=42):
         random.seed(seed)
         self.symbol = symbol
         self.price = float(start)
@@ -0,0 +1,159 @@
+import asyncio, inspect, os, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from .loader import get_loaded_modules, safe_call
+from .state import STORE, namespace, diff, merge
+
+BUDGET_MS = float(os.getenv("AURORA_PLUGIN_BUDGET_MS", "50"))
+TIMEOUT_MS = float(os.getenv("AURORA_PLUGIN_TIMEOUT_MS", "250"))
+WORKERS = int(os.getenv("AURORA_PLUGIN_WORKERS", "4"))
+
+class _Slot:
+    __slots__ = ("name", "fn", "is_async", "inline", "budget", "timeout", "keys", "busy",
+                 "calls", "over_budget", "timeouts", "skipped", "errors", "last_ms", "ewma_ms")
+    def __init__(self, mod):
+        self.name = getattr(mod, "REGISTER_NAME", mod.__name__.rsplit(".", 1)[-1])
+        self.fn = mod.on_tick
+        self.is_async = inspect.iscoroutinefunction(self.fn)
+        self.inline = bool(getattr(mod, "TICK_INLINE", False))
+        self.budget = float(getattr(mod, "TICK_BUDGET_MS", BUDGET_MS)) / 1000
+        self.timeout = float(getattr(mod, "TICK_TIMEOUT_MS", TIMEOUT_MS)) / 1000
+        self.keys = tuple(getattr(mod, "STATE_KEYS", ()))
+        self.busy = False  # a call is still running (a timed-out worker included)
+        self.calls = self.over_budget = self.timeouts = self.skipped = self.errors = 0
+        self.last_ms = self.ewma_ms = 0.0
+
+    def observe(self, sec: float):
+        self.calls += 1
+        if sec > self.budget: self.over_budget += 1
+        self.last_ms = sec * 1000
+        self.ewma_ms += 0.1 * (self.last_ms - self.ewma_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "async" if self.is_async else ("inline" if self.inline else "thread"),
+                "budget_ms": self.budget * 1000, "timeout_ms": self.timeout * 1000, "calls": self.calls,
+                "over_budget": self.over_budget, "timeouts": self.timeouts, "skipped": self.skipped,
+                "errors": self.errors, "last_ms": round(self.last_ms, 3), "ewma_ms": round(self.ewma_ms, 3)}
+
+def merge_signals(results: Dict[str, dict]) -> Dict[str, Any]:
+    """Stake-weighted net of BUY/SELL signals; the winning side's mean stake is kept."""
+    buy = [float(r.get("stake", 0.0)) for r in results.values() if r.get("signal") == "BUY"]
+    sell = [float(r.get("stake", 0.0)) for r in results.values() if r.get("signal") == "SELL"]
+    net = sum(buy) - sum(sell)
+    if net > 0: sig, stake = "BUY", sum(buy) / len(buy)
+    elif net < 0: sig, stake = "SELL", sum(sell) / len(sell)
+    else: sig, stake = "HOLD", 0.0
+    return {"signal": sig, "stake": stake, "net": net,
+            "votes": {n: r["signal"] for n, r in results.items() if r.get("signal") in ("BUY", "SELL")}}
+
+class Dispatcher:
+    """Runs every loaded plugin's on_tick once per tick, concurrently.
+
+    Coroutine functions are awaited on the loop, blocking ones go to a small
+    thread pool (or run inline when the module sets TICK_INLINE = True). Each
+    plugin has a latency budget (overruns are counted) and a hard timeout
+    (TICK_BUDGET_MS / TICK_TIMEOUT_MS module attributes, env defaults). The
+    tick waits for at most the longest timeout; a late result is dropped, and
+    a worker still running from an earlier tick makes that plugin skip the
+    next ones instead of piling up threads.
+
+    A plugin never sees the live dict. It gets the state's top-level scalars
+    plus private copies of the containers it lists in STATE_KEYS (e.g.
+    ("positions", "ai")), taken at the start of the tick, so the per-tick copy
+    cost follows what each plugin uses rather than the whole state. What it
+    changed is merged back under STORE.mutate() once it returns in time; a
+    plugin that times out (inline ones included, measured after the fact) or
+    raises loses its writes, so a straggling thread only ever touches its
+    private copy. Calls into one plugin never overlap: while a call is still
+    running (a timed-out worker, or another dispatch), that plugin is skipped.
+    Module globals a plugin keeps for itself are not rolled back on timeout;
+    the no-overlap rule is what keeps them consistent.
+    """
+    def __init__(self, workers: int = WORKERS):
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Dict[int, _Slot] = {}
+        self.ticks = 0
+        self.last_ms = 0.0
+
+    def _pool_(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="plugin")
+        return self._pool
+
+    def slots(self) -> List[_Slot]:
+        mods = [m for m in get_loaded_modules() if hasattr(m, "on_tick")]
+        live = {id(m) for m in mods}
+        for k in [k for k in self._slots if k not in live]: del self._slots[k]
+        return [self._slots.get(id(m)) or self._slots.setdefault(id(m), _Slot(m)) for m in mods]
+
+    async def _run(self, slot: _Slot, state: dict, ctx: dict):
+        t0 = time.perf_counter()
+        try:
+            if slot.is_async:
+                try: res = await asyncio.wait_for(slot.fn(state, ctx), slot.timeout)
+                finally: slot.busy = False
+            else:
+                cf = self._pool_().submit(slot.fn, state, ctx)
+                # a thread cannot be cancelled: a timed-out one finishes on its own copy, and the
+                # plugin stays busy (skipped) until it does; cleared from the worker, not the loop
+                cf.add_done_callback(lambda _: setattr(slot, "busy", False))
+                res = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(cf)), slot.timeout)
+        except asyncio.TimeoutError:
+            slot.timeouts += 1; slot.observe(time.perf_counter() - t0)
+            return None
+        except Exception as e:
+            slot.errors += 1; slot.observe(time.perf_counter() - t0)
+            return {"error": str(e)}
+        slot.observe(time.perf_counter() - t0)
+        return res
+
+    async def dispatch(self, ctx: dict) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        names, jobs, base, copies, results = [], [], {}, {}, {}
+        inline = []
+        slots = []
+        for slot in self.slots():
+            if slot.busy: slot.skipped += 1
+            else: slots.append(slot)
+        with STORE.view() as live:
+            for slot in slots:
+                base[slot.name] = namespace(live, slot.keys); copies[slot.name] = namespace(live, slot.keys)
+        for slot in slots:
+            slot.busy = True
+            if slot.inline and not slot.is_async:
+                inline.append(slot); continue
+            names.append(slot.name); jobs.append(self._run(slot, copies[slot.name], ctx))
+        tasks = [asyncio.ensure_future(j) for j in jobs]
+        for slot in inline:  # overlaps with the thread-pool work already submitted
+            t1 = time.perf_counter()
+            try: res = safe_call(slot.fn, copies[slot.name], ctx)
+            finally: slot.busy = False
+            dt = time.perf_counter() - t1
+            slot.observe(dt)
+            if dt > slot.timeout:  # could not be interrupted, but its late answer is not used either
+                slot.timeouts += 1; continue
+            if isinstance(res, dict) and "error" in res: slot.errors += 1
+            results[slot.name] = res
+        for name, res in zip(names, await asyncio.gather(*tasks)):
+            if res is not None: results[name] = res
+        changes = [c for name, r in results.items() if not (isinstance(r, dict) and "error" in r)
+                   for c in diff(base[name], copies[name])]
+        if changes:
+            with STORE.mutate() as st:
+                merge(st, changes)
+        self.ticks += 1
+        self.last_ms = (time.perf_counter() - t0) * 1000
+        dict_results = {n: r for n, r in results.items() if isinstance(r, dict)}
+        return {"tick": ctx.get("tick"), "results": results, "merged": merge_signals(dict_results),
+                "dropped": [s.name for s in self.slots() if s.name not in results], "elapsed_ms": round(self.last_ms, 3)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ticks": self.ticks, "last_ms": round(self.last_ms, 3),
+                "plugins": {s.name: s.stats() for s in self._slots.values()}}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+
+DISPATCHER = Dispatcher()
@@ -0,0 +1,270 @@
+import heapq, sys, time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from .settings import SIM_MAKER_BPS, SIM_TAKER_BPS, SIM_SPREAD_BPS, SIM_LEVEL_BPS, SIM_LEVEL_NOTIONAL, SIM_LEVELS, SIM_STP
+
+BUY, SELL = 1, -1
+KINDS = ("market", "limit", "ioc")
+STP_MODES = ("none", "expire_maker", "expire_taker", "expire_both")  # as Binance selfTradePreventionMode
+_INF = float("inf")
+
+def _side(side) -> int:
+    if side in (BUY, SELL): return side
+    return BUY if str(side).upper() == "BUY" else SELL
+
+class Order:
+    __slots__ = ("id", "symbol", "side", "kind", "price", "qty", "filled", "notional", "fee", "status", "owner", "seq")
+    def __init__(self, id, symbol, side, kind, price, qty, owner, seq):
+        self.id, self.symbol, self.side, self.kind, self.price, self.qty = id, symbol, side, kind, price, qty
+        self.owner, self.seq = owner, seq
+        self.filled = self.notional = self.fee = 0.0
+        self.status = "new"
+
+    @property
+    def remaining(self) -> float: return self.qty - self.filled
+    @property
+    def avg_price(self) -> float: return self.notional / self.filled if self.filled else 0.0
+    @property
+    def live(self) -> bool: return self.status in ("new", "partial")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "symbol": self.symbol, "side": "BUY" if self.side == BUY else "SELL", "kind": self.kind,
+                "price": self.price, "qty": self.qty, "filled": self.filled, "avg_price": self.avg_price,
+                "fee": self.fee, "status": self.status, "owner": self.owner}
+
+class Fill:
+    __slots__ = ("order_id", "owner", "symbol", "side", "qty", "price", "fee", "maker", "seq")
+    def __init__(self, order_id, owner, symbol, side, qty, price, fee, maker, seq):
+        self.order_id, self.owner, self.symbol, self.side = order_id, owner, symbol, side
+        self.qty, self.price, self.fee, self.maker, self.seq = qty, price, fee, maker, seq
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"order_id": self.order_id, "owner": self.owner, "symbol": self.symbol,
+                "side": "BUY" if self.side == BUY else "SELL", "qty": self.qty, "price": self.price,
+                "fee": self.fee, "liquidity": "maker" if self.maker else "taker"}
+
+class _Book:
+    """Resting orders of one symbol (price levels: heap of prices + FIFO deque per level) and
+    the synthetic depth ladder around the last market price."""
+    __slots__ = ("bids", "asks", "bid_q", "ask_q", "mid", "bid0", "ask0", "step", "syn_bid", "syn_ask", "ib", "ia")
+    def __init__(self):
+        self.bids: List[float] = []; self.asks: List[float] = []  # bids hold -price
+        self.bid_q: Dict[float, Deque[Order]] = {}; self.ask_q: Dict[float, Deque[Order]] = {}
+        self.mid = self.bid0 = self.ask0 = self.step = 0.0
+        self.syn_bid: List[float] = []; self.syn_ask: List[float] = []
+        self.ib = self.ia = 0  # first synthetic level with quantity left
+
+class SimExchange:
+    """Local matching engine for paper trading and backtests.
+
+    Our own orders rest in per-symbol books with price-time priority. Outside
+    liquidity is modelled from the price feed: each on_price() re-centres a
+    ladder of `levels` synthetic levels per side, half the spread away from the
+    mark and `level_bps` apart, each holding `level_notional` of quote currency.
+    Takers walk resting orders and the ladder in price order, so large orders
+    pay slippage and can fill partially. A resting limit order fills as maker,
+    at its own price, once the market trades through it (or touches it, with
+    touch=True). Market and IOC remainders expire; limit remainders rest.
+
+    Every order here belongs to one account, so a taker reaching one of our
+    resting orders is a self-trade. `stp` handles it as Binance does: the
+    resting order (expire_maker), the incoming one (expire_taker) or both
+    expire with status "expired_in_match"; "none" lets them match.
+
+    Fills are also kept in `fills` for drain(); only the newest `fill_buffer`
+    are held, so a process that never drains does not grow without bound.
+    """
+    def __init__(self, maker_bps: float = SIM_MAKER_BPS, taker_bps: float = SIM_TAKER_BPS,
+                 spread_bps: float = SIM_SPREAD_BPS, level_bps: float = SIM_LEVEL_BPS,
+                 level_notional: float = SIM_LEVEL_NOTIONAL, levels: int = SIM_LEVELS, touch: bool = False,
+                 stp: str = SIM_STP, fill_buffer: int = 10_000):
+        if stp not in STP_MODES: raise ValueError(f"stp must be one of {STP_MODES}, got {stp!r}")
+        self.maker, self.taker = maker_bps / 1e4, taker_bps / 1e4
+        self.half, self.level, self.notional, self.levels, self.touch = spread_bps / 2e4, level_bps / 1e4, level_notional, levels, touch
+        self.books: Dict[str, _Book] = {}
+        self.orders: Dict[int, Order] = {}  # live resting orders
+        self.stp = stp
+        self.fills: Deque[Fill] = deque(maxlen=fill_buffer)  # newest fills since the last drain()
+        self._id = 0; self._seq = 0
+        self.events = 0
+
+    def _book(self, symbol: str) -> _Book:
+        b = self.books.get(symbol)
+        if b is None: b = self.books[symbol] = _Book()
+        return b
+
+    def mark(self, symbol: str) -> Optional[float]:
+        b = self.books.get(symbol)
+        return b.mid if b is not None and b.mid > 0 else None
+
+    # ---- market data ----
+    def on_price(self, symbol: str, price: float) -> List[Fill]:
+        """New market price: refresh the synthetic depth and fill resting orders the market traded through."""
+        b = self._book(symbol); self.events += 1
+        price = float(price)
+        b.mid = price; b.step = price * self.level
+        b.bid0 = price * (1 - self.half); b.ask0 = price * (1 + self.half)
+        lq = self.notional / price
+        b.syn_bid = [lq] * self.levels; b.syn_ask = [lq] * self.levels; b.ib = b.ia = 0
+        out: List[Fill] = []
+        touch = self.touch
+        while b.bids:
+            px = -b.bids[0]
+            if px < price or (px == price and not touch): break
+            self._fill_level(b, b.bid_q, px, out); heapq.heappop(b.bids)
+        while b.asks:
+            px = b.asks[0]
+            if px > price or (px == price and not touch): break
+            self._fill_level(b, b.ask_q, px, out); heapq.heappop(b.asks)
+        return out
+
+    def _fill_level(self, b: _Book, levels: Dict[float, Deque[Order]], px: float, out: List[Fill]):
+        for o in levels.pop(px, ()):
+            if o.live: out.append(self._exec(o, o.remaining, px, True))
+
+    # ---- order entry ----
+    def submit(self, symbol: str, side, qty: float, price: Optional[float] = None, kind: str = "market",
+               owner: str = "", quote: Optional[float] = None) -> Order:
+        """market: price ignored; limit: takes what crosses, rests the rest; ioc: limit that never rests.
+        quote (market/ioc only): size by quote currency spent, fees included, instead of qty."""
+        if kind not in KINDS: raise ValueError(f"unknown order kind {kind!r}")
+        if kind != "market" and price is None: raise ValueError(f"{kind} order needs a price")
+        if quote is not None and kind == "limit": raise ValueError("quote sizing is for market/ioc orders")
+        side = _side(side); self._id += 1; self._seq += 1; self.events += 1
+        o = Order(self._id, symbol, side, kind, None if kind == "market" else float(price),
+                  _INF if quote is not None else float(qty), owner, self._seq)
+        if o.qty <= 0 or (quote is not None and quote <= 0):
+            o.status = "rejected"; return o
+        b = self._book(symbol)
+        limit = (_INF if side == BUY else -_INF) if o.price is None else o.price
+        self._take(b, o, limit, quote)
+        stp = o.status == "expired_in_match"
+        if quote is not None:
+            o.qty = o.filled
+            if not stp:
+                o.status = ("filled" if o.notional + o.fee >= quote * (1 - 1e-9) else "partial_expired") if o.filled else "expired"
+        elif o.remaining > 1e-12 and not stp:
+            if kind == "limit":
+                q = (b.bid_q if side == BUY else b.ask_q).get(o.price)
+                if q is None:
+                    q = (b.bid_q if side == BUY else b.ask_q)[o.price] = deque()
+                    heapq.heappush(b.bids if side == BUY else b.asks, -o.price if side == BUY else o.price)
+                q.append(o); self.orders[o.id] = o
+            else:
+                o.status = "expired" if o.filled == 0 else "partial_expired"
+        return o
+
+    def _take(self, b: _Book, o: Order, limit: float, quote: Optional[float] = None):
+        # walk resting orders and the synthetic ladder on the opposite side, best price first
+        buy = o.side == BUY
+        heap, levels = (b.asks, b.ask_q) if buy else (b.bids, b.bid_q)
+        syn = b.syn_ask if buy else b.syn_bid
+        n = len(syn); step = b.step if buy else -b.step; base = b.ask0 if buy else b.bid0
+        while o.remaining > 1e-12:
+            while heap:
+                px = heap[0] if buy else -heap[0]
+                q = levels.get(px)
+                while q and not q[0].live: q.popleft()
+                if q: break
+                heapq.heappop(heap); levels.pop(px, None)
+            book_px = (heap[0] if buy else -heap[0]) if heap else None
+            i = b.ia if buy else b.ib
+            syn_px = base + i * step if i < n else None
+            if book_px is not None and (syn_px is None or (book_px <= syn_px if buy else book_px >= syn_px)):
+                px = book_px
+                if (px > limit) if buy else (px < limit): return
+                q = levels[px]; m = q[0]
+                if self.stp != "none":  # m is our own order: self-trade
+                    if self.stp != "expire_taker":
+                        m.status = "expired_in_match"; self.orders.pop(m.id, None); q.popleft()
+                        if not q:
+                            heapq.heappop(heap); del levels[px]
+                    if self.stp != "expire_maker":
+                        o.status = "expired_in_match"; return
+                    continue
+                qty = min(o.remaining, m.remaining)
+                if quote is not None:
+                    qty = min(qty, (quote - o.notional - o.fee) / (px * (1 + self.taker)))
+                    if qty <= 1e-12: return
+                self._exec(m, qty, px, True)
+                if not m.live: q.popleft()
+                if not q:
+                    heapq.heappop(heap); del levels[px]
+            elif syn_px is not None:
+                px = syn_px
+                if (px > limit) if buy else (px < limit): return
+                qty = min(o.remaining, syn[i])
+                if quote is not None:
+                    qty = min(qty, (quote - o.notional - o.fee) / (px * (1 + self.taker)))
+                    if qty <= 1e-12: return
+                syn[i] -= qty
+                if syn[i] <= 1e-12:
+                    if buy: b.ia += 1
+                    else: b.ib += 1
+            else:
+                return
+            self._exec(o, qty, px, False)
+
+    def _exec(self, o: Order, qty: float, px: float, maker: bool) -> Fill:
+        fee = qty * px * (self.maker if maker else self.taker)
+        o.filled += qty; o.notional += qty * px; o.fee += fee
+        if o.remaining <= 1e-12:
+            o.status = "filled"; self.orders.pop(o.id, None)
+        else:
+            o.status = "partial"
+        self._seq += 1
+        f = Fill(o.id, o.owner, o.symbol, o.side, qty, px, fee, maker, self._seq)
+        self.fills.append(f)
+        return f
+
+    def cancel(self, order_id: int) -> bool:
+        """Lazy: the order is marked dead and skipped when its level is next visited."""
+        self.events += 1
+        o = self.orders.pop(order_id, None)
+        if o is None or not o.live: return False
+        o.status = "cancelled"
+        return True
+
+    def drain(self) -> List[Fill]:
+        out = list(self.fills); self.fills.clear()
+        return out
+
+    def depth(self, symbol: str, n: int = 10) -> Dict[str, Any]:
+        """Aggregated resting quantity per price, best first (our orders only)."""
+        b = self.books.get(symbol)
+        if b is None: return {"bids": [], "asks": [], "mark": None}
+        side = lambda levels, rev: [(px, sum(o.remaining for o in q if o.live))
+                                   for px, q in sorted(levels.items(), reverse=rev)]
+        return {"bids": [l for l in side(b.bid_q, True) if l[1] > 0][:n],
+                "asks": [l for l in side(b.ask_q, False) if l[1] > 0][:n], "mark": self.mark(symbol)}
+
+def bench(n: int = 200_000, symbols: int = 4):
+    """Order events per second: a mix of limit placements, cancels, market/IOC takers and price updates."""
+    import random
+    rng = random.Random(1); ex = SimExchange()
+    syms = [f"SYM{i}" for i in range(symbols)]
+    for s in syms: ex.on_price(s, 100.0)
+    live: List[int] = []
+    t0 = time.perf_counter()
+    for k in range(n):
+        s = syms[k % symbols]; r = rng.random()
+        if r < 0.45:
+            side = BUY if rng.random() < 0.5 else SELL
+            px = round(100.0 * (1 - side * rng.uniform(0.0001, 0.01)), 2)
+            live.append(ex.submit(s, side, rng.uniform(0.01, 1.0), px, "limit").id)
+        elif r < 0.75 and live:
+            ex.cancel(live.pop(rng.randrange(len(live))))
+        elif r < 0.95:
+            ex.submit(s, BUY if rng.random() < 0.5 else SELL, rng.uniform(0.01, 5.0),
+                      100.0 * (1 + rng.uniform(-0.002, 0.002)), "market" if r < 0.9 else "ioc")
+        else:
+            ex.on_price(s, 100.0 * (1 + rng.uniform(-0.005, 0.005)))
+        if len(ex.fills) > 10_000: ex.drain()
+    dt = time.perf_counter() - t0
+    print({"events": ex.events, "events_per_sec": round(ex.events / dt), "resting": len(ex.orders)})
+
+SIM = SimExchange()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:4]))
@@ -1,34 +1,38 @@
 import asyncio
-from pathlib import Path
 from datetime import datetime
-import csv
+from .tradestore import TRADES
+from .metrics import ORDER, FILLS, timed
+from .settings import EXECUTION, SYMBOL
+from .exchange import SIM
+from .risk import RISK_ENGINE
 
-TRADE_LOG = Path("logs/trade_log.csv")
-SYMBOL = "BTCUSDT"
 
-def _ensure_state(state: dict):
+def _ensure_state(state: dict, symbol: str = SYMBOL):
     state.setdefault("balance", 1000.0)
     state.setdefault("positions", {})
-    state["positions"].setdefault(SYMBOL, {"qty": 0.0, "avg_price": 0.0})
+    state["positions"].setdefault(symbol, {"qty": 0.0, "avg_price": 0.0})
 
-def _log_trade(ts, plugin, side, price, qty, cash_delta, balance, pos_qty, avg_price):
-    TRADE_LOG.parent.mkdir(parents=True, exist_ok=True)
-    write_header = not TRADE_LOG.exists()
-    with TRADE_LOG.open("a", newline="") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["ts","symbol","plugin","side","price","qty","cash_delta","balance_after","pos_qty_after","avg_price_after"])
-        w.writerow([ts, SYMBOL, plugin, side, f"{price:.2f}", f"{qty:.8f}", f"{cash_delta:.2f}", f"{balance:.2f}", f"{pos_qty:.8f}", f"{avg_price:.2f}"])
+def _route(symbol: str, side: str, price: float, plugin: str, qty: float = 0.0, quote=None):
+    # AURORA_EXECUTION=sim: fill against the simulated book around the tick price instead of at it
+    if SIM.mark(symbol) != price: SIM.on_price(symbol, price)
+    return SIM.submit(symbol, side, qty, owner=plugin, quote=quote)
 
-def place_order(state: dict, *, side: str, price: float, fraction: float, plugin: str):
+def _log_trade(ts, plugin, side, price, qty, cash_delta, balance, pos_qty, avg_price, symbol=SYMBOL):
+    TRADES.append(ts=ts, symbol=symbol, plugin=plugin, side=side, price=price, qty=qty, cash_delta=cash_delta,
+                  balance_after=balance, pos_qty_after=pos_qty, avg_price_after=avg_price, source="executor")
+
+@timed(ORDER.labels("place_order"))
+def place_order(state: dict, *, side: str, price: float, fraction: float, plugin: str, symbol: str = SYMBOL):
     """
     side: 'BUY' | 'SELL' | 'EXIT'
     fraction: portion of balance (BUY) or position (SELL) to use, 0..1
+    symbol: position bucket in state["positions"]; the balance is shared across symbols
     """
-    _ensure_state(state)
+    _ensure_state(state, symbol)
+    RISK_ENGINE.pin(state)  # the drawdown baseline is the balance before the first trade
     ts = datetime.utcnow().isoformat(timespec="seconds") + "Z"
     bal = float(state["balance"])
-    pos = state["positions"][SYMBOL]
+    pos = state["positions"][symbol]
     qty = float(pos["qty"])
     avg = float(pos["avg_price"])
 
@@ -39,20 +43,32 @@ def place_order(state: dict, *, side: str, price: float, fraction: float, plugin
         spend = bal * fraction
         if spend <= 0.0:
             return {"ok": False, "reason": "no_cash"}
-        buy_qty = spend / float(price)
+        buy_qty = spend / float(price); fee = 0.0
+        if EXECUTION == "sim":
+            o = _route(symbol, "BUY", float(price), plugin, quote=spend)
+            if not o.filled:
+                return {"ok": False, "reason": "no_liquidity"}
+            buy_qty, price, fee, spend = o.filled, o.avg_price, o.fee, o.notional + o.fee
         new_qty = qty + buy_qty
         new_avg = ((qty * avg) + spend) / new_qty if new_qty > 0 else 0.0
         bal -= spend
         pos["qty"], pos["avg_price"] = new_qty, new_avg
         state["balance"] = round(bal, 2)
-        _log_trade(ts, plugin, "BUY", price, buy_qty, -spend, bal, new_qty, new_avg)
-        return {"ok": True, "side": "BUY", "qty": buy_qty}
+        RISK_ENGINE.on_position(symbol, new_qty, new_avg)
+        _log_trade(ts, plugin, "BUY", price, buy_qty, -spend, bal, new_qty, new_avg, symbol)
+        return {"ok": True, "side": "BUY", "qty": buy_qty, "price": price, "fee": fee, "symbol": symbol}
 
     sell_qty = qty if side == "EXIT" else qty * fraction
     sell_qty = min(qty, sell_qty)
     if sell_qty <= 0.0:
         return {"ok": False, "reason": "no_position"}
-    proceeds = sell_qty * float(price)
+    proceeds = sell_qty * float(price); fee = 0.0
+    if EXECUTION == "sim":
+        o = _route(symbol, "SELL", float(price), plugin, qty=sell_qty)
+        if not o.filled:
+            return {"ok": False, "reason": "no_liquidity"}
+        sell_qty, price, fee = o.filled, o.avg_price, o.fee
+        proceeds = o.notional - fee
     # realized PnL tracking (optional; stored on state)
     basis = sell_qty * avg
     realized = proceeds - basis
@@ -63,5 +79,6 @@ def place_order(state: dict, *, side: str, price: float, fraction: float, plugin
     bal += proceeds
     pos["qty"], pos["avg_price"] = new_qty, new_avg
     state["balance"] = round(bal, 2)
-    _log_trade(ts, plugin, "SELL" if side != "EXIT" else "EXIT", price, sell_qty, proceeds, bal, new_qty, new_avg)
-    return {"ok": True, "side": "SELL", "qty": sell_qty}
\ No newline at end of file
+    RISK_ENGINE.on_position(symbol, new_qty, new_avg)
+    _log_trade(ts, plugin, "SELL" if side != "EXIT" else "EXIT", price, sell_qty, proceeds, bal, new_qty, new_avg, symbol)
+    return {"ok": True, "side": "SELL", "qty": sell_qty, "price": price, "fee": fee, "symbol": symbol}
\ No newline at end of file
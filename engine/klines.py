@@ -0,0 +1,193 @@
+import asyncio, json, sys, time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .settings import KLINES_DIR
+from .atomic import atomic_write_text
+from .marketdata import MD, MarketData
+from .pricefeed import _interval_ms
+
+COLS = ("t", "open", "high", "low", "close", "volume")
+_DTYPE = {"t": np.int64}  # everything else float64
+EMPTY = -1  # slot the exchange confirmed has no candle (maintenance etc.); 0 = never fetched
+
+def _ms(ts) -> int:
+    if ts is None: return int(time.time() * 1000)
+    if isinstance(ts, (int, np.integer)): return int(ts)
+    if isinstance(ts, float): return int(ts * 1000)
+    d = ts if isinstance(ts, datetime) else datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    return int((d if d.tzinfo else d.replace(tzinfo=timezone.utc)).timestamp() * 1000)
+
+class KlineCache:
+    """OHLCV history for one symbol/interval as dense, time-indexed column files.
+
+    Each column is a raw little-endian array (t.bin int64 open time, the rest
+    float64) addressed by slot = (open_time - base) / step, so writes are
+    idempotent, a missing candle is simply a slot whose t is 0, and reads are
+    np.memmap views with no parsing or copying. meta.json holds base, step and
+    the number of slots in use; it is rewritten atomically after the data.
+    """
+    def __init__(self, symbol: str, interval: str = "1m", root: Path = KLINES_DIR):
+        self.symbol, self.interval = symbol.upper(), interval
+        self.step = _interval_ms(interval)
+        self.dir = root/self.symbol/interval
+        self.base: Optional[int] = None
+        self.n = 0
+        self._cap = 0
+        self._w: Dict[str, np.memmap] = {}
+        self._r: Optional[Tuple[int, int, Dict[str, np.memmap]]] = None
+        meta = self.dir/"meta.json"
+        if meta.exists():
+            m = json.loads(meta.read_text())
+            self.base, self.n = m["base"], m["n"]
+
+    def _path(self, c: str) -> Path: return self.dir/f"{c}.bin"
+
+    # ---- write side ----
+    def _open_w(self, cap: int):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for c in COLS:
+            dt = np.dtype(_DTYPE.get(c, np.float64))
+            with open(self._path(c), "ab") as f: f.truncate(cap * dt.itemsize)
+            self._w[c] = np.memmap(self._path(c), dtype=dt, mode="r+", shape=(cap,))
+        self._cap = cap
+
+    def _ensure(self, lo: int, hi: int):
+        if self.base is None:
+            self.base = lo; self.n = 0
+        if lo < self.base:
+            # earlier history than we hold: shift every column right (rare; one copy)
+            shift = (self.base - lo) // self.step
+            self.flush(); self._w.clear()
+            for c in COLS:
+                dt = np.dtype(_DTYPE.get(c, np.float64))
+                old = np.fromfile(self._path(c), dtype=dt, count=self.n) if self._path(c).exists() else np.zeros(0, dt)
+                new = np.zeros(self.n + shift, dt); new[shift:] = old
+                new.tofile(self._path(c))
+            self.base -= shift * self.step; self.n += shift; self._cap = 0
+        need = (hi - self.base) // self.step + 1
+        if need > self._cap or not self._w:
+            self.flush(); self._w.clear()
+            self._open_w(max(need, self.n, 2 * self._cap, 1024))
+        self.n = max(self.n, need)
+
+    def write(self, rows: Sequence[Sequence[Any]], confirm: Optional[Tuple[int, int]] = None) -> int:
+        """Store Binance kline rows ([open_time, o, h, l, c, v, close_time, ...]); candles still
+        open are skipped. confirm=(first, last) open times marks slots in that fetched range that
+        came back without a candle as EMPTY, so they are not requested again."""
+        now = _ms(None)
+        rows = [r for r in rows if int(r[6]) < now]
+        if not rows and confirm is None: return 0
+        t = np.fromiter((int(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+        lo = min(int(t.min()) if len(t) else confirm[0], confirm[0] if confirm else 1 << 62)
+        hi = max(int(t.max()) if len(t) else confirm[1], confirm[1] if confirm else 0)
+        self._ensure(lo, hi)
+        w = self._w
+        if confirm:
+            a, b = (confirm[0] - self.base) // self.step, (confirm[1] - self.base) // self.step + 1
+            seg = w["t"][a:b]; seg[seg == 0] = EMPTY
+        if len(t):
+            idx = (t - self.base) // self.step
+            w["t"][idx] = t
+            vals = np.array([r[1:6] for r in rows], dtype=np.float64)
+            for k, c in enumerate(COLS[1:]): w[c][idx] = vals[:, k]
+        return len(t)
+
+    def flush(self):
+        if not self._w: return
+        for mm in self._w.values(): mm.flush()
+        atomic_write_text(self.dir/"meta.json", json.dumps({"symbol": self.symbol, "interval": self.interval,
+                                                           "base": self.base, "step": self.step, "n": self.n}))
+
+    # ---- read side (zero-copy) ----
+    def _views(self) -> Dict[str, np.ndarray]:
+        if self.base is None or not self.n: return {c: np.zeros(0, _DTYPE.get(c, np.float64)) for c in COLS}
+        if self._w: return {c: self._w[c][:self.n] for c in COLS}
+        if self._r is None or self._r[:2] != (self.base, self.n):
+            self._r = (self.base, self.n, {c: np.memmap(self._path(c), dtype=_DTYPE.get(c, np.float64), mode="r",
+                                                        shape=(self.n,)) for c in COLS})
+        return self._r[2]
+
+    def _slots(self, start=None, end=None) -> Tuple[int, int]:
+        if self.base is None: return 0, 0
+        a = 0 if start is None else max(0, -(-(_ms(start) - self.base) // self.step))
+        b = self.n if end is None else min(self.n, (_ms(end) - self.base) // self.step + 1)
+        return a, max(a, b)
+
+    def read(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """Column views over [start, end]; missing candles have t <= 0."""
+        a, b = self._slots(start, end)
+        return {c: v[a:b] for c, v in self._views().items()}
+
+    def closes(self, start=None, end=None) -> np.ndarray:
+        """Close prices over [start, end]: a view when the range has no holes, else a compacted copy."""
+        d = self.read(start, end)
+        ok = d["t"] > 0
+        return d["close"] if ok.all() else d["close"][ok]
+
+    def last(self, n: int, every: int = 1) -> np.ndarray:
+        """Up to n most recent closes (strategy warm-up), one per `every` candles counting back from the newest."""
+        if n <= 0: return np.zeros(0)
+        d = self._views(); k = n * every
+        t = d["t"][-k:][::-1][::every][::-1]; c = d["close"][-k:][::-1][::every][::-1]
+        ok = t > 0
+        return c if ok.all() else c[ok]
+
+    def span(self) -> Optional[Tuple[int, int]]:
+        return None if self.base is None or not self.n else (self.base, self.base + (self.n - 1) * self.step)
+
+    def gaps(self, start, end) -> List[Tuple[int, int]]:
+        """Never-fetched open-time ranges (inclusive) within [start, end], including outside the stored span."""
+        s = _ms(start) // self.step * self.step; e = _ms(end) // self.step * self.step
+        if e < s: return []
+        if self.base is None:
+            return [(s, e)]
+        # align the request to the stored grid (intervals are epoch-aligned, so this is exact)
+        out: List[Tuple[int, int]] = []
+        lo_end = min(e, self.base - self.step)
+        if s <= lo_end: out.append((s, lo_end))
+        a, b = self._slots(max(s, self.base), e)
+        if b > a:
+            miss = np.flatnonzero(self._views()["t"][a:b] == 0)
+            if len(miss):
+                brk = np.flatnonzero(np.diff(miss) > 1)
+                for i0, i1 in zip(np.r_[0, brk + 1], np.r_[brk, len(miss) - 1]):
+                    out.append((self.base + (a + int(miss[i0])) * self.step, self.base + (a + int(miss[i1])) * self.step))
+        hi_start = max(s, self.base + self.n * self.step)
+        if hi_start <= e: out.append((hi_start, e))
+        return out
+
+    # ---- backfill ----
+    async def backfill(self, start, end=None, concurrency: int = 4, limit: int = 1000,
+                       md: MarketData = MD) -> Dict[str, Any]:
+        """Fetch every gap in [start, end] from /api/v3/klines: pages of `limit` candles, at most
+        `concurrency` requests in flight, each page written as soon as it arrives."""
+        last_closed = (_ms(None) // self.step - 1) * self.step
+        end_ms = min(_ms(end), last_closed) if end is not None else last_closed
+        pages = [(p, min(p + (limit - 1) * self.step, g1))
+                 for g0, g1 in self.gaps(start, end_ms) for p in range(g0, g1 + 1, limit * self.step)]
+        sem = asyncio.Semaphore(concurrency)
+        stats = {"pages": len(pages), "rows": 0, "errors": 0}
+
+        async def page(p0: int, p1: int):
+            async with sem:
+                try:
+                    rows = await md.aget_json("/api/v3/klines", {"symbol": self.symbol, "interval": self.interval,
+                                                                 "startTime": p0, "endTime": p1, "limit": limit})
+                except Exception:
+                    stats["errors"] += 1; return
+            # a short page means the exchange has no candles there; only confirm ranges we fully asked for
+            stats["rows"] += self.write(rows, confirm=(p0, p1) if len(rows) < limit else None)
+
+        await asyncio.gather(*(page(a, b) for a, b in pages))
+        self.flush()
+        stats["gaps"] = self.gaps(start, end_ms)
+        return stats
+
+if __name__ == "__main__":
+    # python -m engine.klines backfill BTCUSDT 1m 2024-01-01 [end]
+    if len(sys.argv) >= 5 and sys.argv[1] == "backfill":
+        kc = KlineCache(sys.argv[2], sys.argv[3])
+        res = asyncio.run(kc.backfill(sys.argv[4], sys.argv[5] if len(sys.argv) > 5 else None))
+        print({**res, "gaps": len(res["gaps"]), "span": kc.span()})
@@ -2,7 +2,7 @@ import asyncio
 from importlib.util import spec_from_file_location, module_from_spec
 from pathlib import Path
 from typing import List
-from .state import load_state, save_state
+from .state import STORE, namespace, diff, merge
 
 PLUGINS_DIR = Path("plugins")
 _LOADED_MODS = []
@@ -11,16 +11,17 @@ def discover_plugins() -> List[Path]:
     PLUGINS_DIR.mkdir(parents=True, exist_ok=True)
     return sorted(p for p in PLUGINS_DIR.glob("*.py") if p.name not in {"__init__.py"} and not p.name.startswith("_"))
 
-def _safe_call(fn, *a, **kw):
+def safe_call(fn, *a, **kw):
     try:
         return fn(*a, **kw)
     except Exception as e:
         return {"error": str(e)}
 
 def load_plugins() -> list:
+    """Import every plugin and run its on_load outside the state lock (imports can be slow); each
+    on_load works on namespace(state, STATE_KEYS) and only what it changed is merged under mutate()."""
     global _LOADED_MODS
     loaded = []
-    state = load_state()
     mods = []
     for path in discover_plugins():
         mod_name = f"plugins.{path.stem}"
@@ -28,17 +29,28 @@ def load_plugins() -> list:
         if not spec or not spec.loader:
             continue
         mod = module_from_spec(spec)
-        spec.loader.exec_module(mod)
+        err = safe_call(spec.loader.exec_module, mod)
+        if err is not None:  # one broken file must not take the others down; its error is kept
+            with STORE.mutate() as state:
+                state.setdefault("plugin_init", {})[path.stem] = err
+            continue
         name = getattr(mod, "REGISTER_NAME", path.stem)
-        if name not in state["plugins"]:
-            state["plugins"].append(name)
+        changes, res = [], None
         # optional on_load(state)
         if hasattr(mod, "on_load"):
-            res = _safe_call(mod.on_load, state)
-            state.setdefault("plugin_init", {})[name] = res
+            keys = tuple(getattr(mod, "STATE_KEYS", ()))
+            with STORE.view() as live:
+                before, mine = namespace(live, keys), namespace(live, keys)
+            res = safe_call(mod.on_load, mine)
+            if not (isinstance(res, dict) and "error" in res): changes = diff(before, mine)
+        with STORE.mutate() as state:
+            merge(state, changes)
+            if name not in state["plugins"]:
+                state["plugins"].append(name)
+            if hasattr(mod, "on_load"):
+                state.setdefault("plugin_init", {})[name] = res
         mods.append(mod)
         loaded.append(name)
-    save_state(state)
     _LOADED_MODS = mods
     return loaded
 
@@ -49,6 +61,6 @@ def plugin_spec():
     return {
         "REGISTER_NAME": "required:str",
         "on_load(state)": "optional -> dict",
-        "on_tick(state, ctx)": "optional -> dict   ctx={ts,tick,price}",
+        "on_tick(state, ctx)": "optional -> dict   ctx={ts,tick,price,symbol}",
         "on_event(state, event)": "optional -> dict",
     }
\ No newline at end of file
@@ -1,12 +1,44 @@
 import asyncio
+import csv, io, os
 from pathlib import Path
-import csv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from .settings import LOGS
+from .tradestore import TRADES
 
-TRADE_LOG = Path("logs/trade_log.csv")
+LEGACY_LOG = LOGS/"trade_log.csv"
 
-def tail_trades(n: int = 50) -> List[Dict[str, Any]]:
-    if not TRADE_LOG.exists():
+def _tail_lines(path: Path, n: int, block: int = 8192) -> List[str]:
+    """Last n lines of a file, reading backwards from EOF in fixed blocks."""
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell(); data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block, pos); pos -= step
+            f.seek(pos); data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    if pos > 0: lines = lines[1:]  # first line may be partial
+    return lines[-n:]
+
+def tail_csv(path: Path, n: int = 50) -> List[Dict[str, Any]]:
+    if not path.exists() or n <= 0:
         return []
-    rows = list(csv.DictReader(TRADE_LOG.open()))
-    return rows[-n:]
\ No newline at end of file
+    with path.open(newline="") as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        return []
+    rows = [r for r in csv.reader(io.StringIO("\n".join(_tail_lines(path, n + 1)))) if r and r != header]
+    return [dict(zip(header, r)) for r in rows[-n:]]
+
+def tail_trades(n: int = 50) -> List[Dict[str, Any]]:
+    rows = TRADES.last(n)
+    # not migrated yet: fall back to the legacy CSV without parsing all of it
+    return rows if rows or not LEGACY_LOG.exists() else tail_csv(LEGACY_LOG, n)
+
+def trades_page(n: int = 200, after: Optional[int] = None) -> Dict[str, Any]:
+    """Initial tail (after=None) or only the rows appended since `after`; `cursor` is the id to send next time.
+
+    Rows served from the legacy CSV (store not migrated yet) have no id, so `cursor` is None:
+    keep asking for the tail with after=None until the store has rows and a real cursor comes back."""
+    rows = tail_trades(n) if after is None else TRADES.after(after, n)
+    cursor = rows[-1].get("id") if rows else (after or 0)
+    return {"trades": rows, "cursor": cursor}
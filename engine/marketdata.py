@@ -0,0 +1,121 @@
+import asyncio, atexit, time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import httpx
+from .settings import BINANCE_BASE, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY
+
+class LatencyStats:
+    __slots__ = ("count", "errors", "total", "min", "max", "last", "recent")
+    def __init__(self, keep: int = 256):
+        self.count = 0; self.errors = 0; self.total = 0.0
+        self.min = float("inf"); self.max = 0.0; self.last = 0.0
+        self.recent: Deque[float] = deque(maxlen=keep)
+
+    def observe(self, sec: float, ok: bool = True):
+        self.count += 1; self.total += sec; self.last = sec
+        if sec < self.min: self.min = sec
+        if sec > self.max: self.max = sec
+        if not ok: self.errors += 1
+        self.recent.append(sec)
+
+    def snapshot(self) -> Dict[str, Any]:
+        r = sorted(self.recent)
+        pct = lambda q: round(r[min(len(r)-1, int(q*len(r)))]*1000, 3) if r else None
+        return {"count": self.count, "errors": self.errors,
+                "avg_ms": round(self.total/self.count*1000, 3) if self.count else None,
+                "min_ms": round(self.min*1000, 3) if self.count else None,
+                "max_ms": round(self.max*1000, 3), "last_ms": round(self.last*1000, 3),
+                "p50_ms": pct(0.50), "p99_ms": pct(0.99)}
+
+class MarketData:
+    """Long-lived pooled HTTP clients for Binance market data (sync + async share config and stats)."""
+    def __init__(self, base: str = BINANCE_BASE, timeout: float = HTTP_TIMEOUT, connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 max_connections: int = HTTP_MAX_CONNECTIONS, max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                 keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY):
+        self.base = base.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._aloop: Optional[asyncio.AbstractEventLoop] = None
+        self._closer: Optional[asyncio.Task] = None
+        self.stats: Dict[str, LatencyStats] = {}
+
+    def client(self) -> httpx.Client:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.Client(base_url=self.base, timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    def aclient(self) -> httpx.AsyncClient:
+        # an AsyncClient's pool belongs to the loop that created it
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient.is_closed or self._aloop is not loop:
+            if self._aclient is not None: self._retire()
+            self._aclient = httpx.AsyncClient(base_url=self.base, timeout=self.timeout, limits=self.limits)
+            self._aloop = loop
+            self._closer = loop.create_task(_close_with_loop(self._aclient))
+        return self._aclient
+
+    def _retire(self):
+        """Close the client of a loop we are leaving: on that loop while it still runs, else from here."""
+        client, loop, closer = self._aclient, self._aloop, self._closer
+        self._aclient = self._aloop = self._closer = None
+        if client.is_closed: return
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(closer.cancel)  # its finally closes the pool on the owning loop
+        else:  # the loop is gone: this marks the client closed; sockets its transports still hold go with them
+            asyncio.get_running_loop().create_task(_aclose_quietly(client))
+
+    def _observe(self, path: str, t0: float, ok: bool):
+        st = self.stats.get(path)
+        if st is None: st = self.stats[path] = LatencyStats()
+        st.observe(time.perf_counter() - t0, ok)
+
+    def get_json(self, path: str, params: Optional[dict] = None) -> Any:
+        t0 = time.perf_counter(); ok = False
+        try:
+            r = self.client().get(path, params=params)
+            r.raise_for_status()
+            ok = True
+            return r.json()
+        finally:
+            self._observe(path, t0, ok)
+
+    async def aget_json(self, path: str, params: Optional[dict] = None) -> Any:
+        t0 = time.perf_counter(); ok = False
+        try:
+            r = await self.aclient().get(path, params=params)
+            r.raise_for_status()
+            ok = True
+            return r.json()
+        finally:
+            self._observe(path, t0, ok)
+
+    def latency(self) -> Dict[str, Any]:
+        return {"base": self.base, "endpoints": {k: v.snapshot() for k, v in self.stats.items()}}
+
+    def close(self):
+        if self._client is not None:
+            self._client.close(); self._client = None
+
+    async def aclose(self):
+        if self._aclient is not None and self._aloop is asyncio.get_running_loop():
+            await self._aclient.aclose(); self._closer.cancel()
+            self._aclient = self._aloop = self._closer = None
+        elif self._aclient is not None:
+            self._retire()
+        self.close()
+
+async def _close_with_loop(client: httpx.AsyncClient):
+    # parked for the life of the loop: asyncio.run() cancels leftover tasks before it
+    # closes the loop, so the pool is shut down on the loop that owns its connections
+    try: await asyncio.get_running_loop().create_future()
+    finally: await client.aclose()
+
+async def _aclose_quietly(client: httpx.AsyncClient):
+    try: await client.aclose()
+    except RuntimeError: pass  # "Event loop is closed": nothing left to close it on
+
+MD = MarketData()
+atexit.register(MD.close)
@@ -1,25 +1,39 @@
 import asyncio
-from typing import Dict, Any, Tuple
-from .state import load_state, save_state
+from typing import Dict, Any, List, Optional, Set, Tuple
+from .state import STORE
 from .executor import place_order
+from .triggers import TriggerBook, ABOVE, BELOW
 from . import risk
+from .settings import SYMBOL, SYMBOLS
 
-def _pos(st) -> Tuple[float,float]:
-    p = st.get("positions", {}).get("BTCUSDT", {"qty":0.0,"avg_price":0.0})
+# resting order kind/side -> which way the price must cross the level for it to fire
+_FIRE = {("LIMIT", "BUY"): BELOW, ("LIMIT", "SELL"): ABOVE, ("STOP", "BUY"): ABOVE, ("STOP", "SELL"): BELOW,
+         ("TAKE_PROFIT", "BUY"): BELOW, ("TAKE_PROFIT", "SELL"): ABOVE}
+RESTING = TriggerBook()
+_TIDS: Dict[str, int] = {}  # order id -> trigger id
+_ARMED: Optional[dict] = None  # the state dict RESTING was built from
+
+def _pos(st, symbol: str = SYMBOL) -> Tuple[float,float]:
+    p = st.get("positions", {}).get(symbol, {"qty":0.0,"avg_price":0.0})
     return float(p.get("qty",0.0)), float(p.get("avg_price",0.0))
 
-def preview(side: str, fraction: float, price: float) -> Dict[str, Any]:
-    st = load_state()
+def preview(side: str, fraction: float, price: float, symbol: str = SYMBOL) -> Dict[str, Any]:
+    with STORE.view() as st:
+        return _preview(st, side, fraction, price, symbol)
+
+def _preview(st: dict, side: str, fraction: float, price: float, symbol: str) -> Dict[str, Any]:
     side = str(side).upper()
+    symbol = str(symbol).upper()
     fraction = max(0.0, min(1.0, float(fraction)))
-    qty, avg = _pos(st)
+    qty, avg = _pos(st, symbol)
 
     # Risk gate only needed pre-BUY
     ok, why = (True, "ok")
     if side == "BUY":
-        ok, why = risk.enforce_pre_trade(st, side=side, fraction=fraction, price=price)
+        ok, why = risk.enforce_pre_trade(st, side=side, fraction=fraction, price=price, symbol=symbol)
 
     info = {
+        "symbol": symbol,
         "side": side,
         "fraction": fraction,
         "price": price,
@@ -39,10 +53,76 @@ def preview(side: str, fraction: float, price: float) -> Dict[str, Any]:
         info["est_proceeds"] = info["est_qty"] * float(price)
     return info
 
-def submit(side: str, fraction: float, price: float, plugin: str = "manual") -> Dict[str, Any]:
-    st = load_state()
+def submit(side: str, fraction: float, price: float, plugin: str = "manual", symbol: str = SYMBOL) -> Dict[str, Any]:
     side = str(side).upper()
     fraction = max(0.0, min(1.0, float(fraction)))
-    res = place_order(st, side=side, price=price, fraction=fraction, plugin=plugin)
-    save_state(st)
-    return res
\ No newline at end of file
+    with STORE.mutate() as st:
+        return place_order(st, side=side, price=price, fraction=fraction, plugin=plugin, symbol=str(symbol).upper())
+
+def _arm(st: dict):
+    # state["orders"] is the persisted truth; the trigger book is rebuilt from it after a restart/replace
+    global RESTING, _ARMED
+    if _ARMED is st: return
+    RESTING = TriggerBook(); _TIDS.clear()
+    for oid, o in st.get("orders", {}).items():
+        _TIDS[oid] = RESTING.add(o["symbol"], o["trigger"], _FIRE[(o["kind"], o["side"])], oid)
+    _ARMED = st
+
+def place_resting(kind: str, side: str, trigger: float, fraction: float, plugin: str = "manual",
+                  symbol: str = SYMBOL) -> Dict[str, Any]:
+    """Park an order until the price crosses `trigger`; kind: LIMIT | STOP | TAKE_PROFIT.
+    Only symbols in AURORA_SYMBOLS are accepted: those are the ones the ticker prices."""
+    kind, side, symbol = str(kind).upper(), str(side).upper(), str(symbol).upper()
+    if (kind, side) not in _FIRE:
+        return {"ok": False, "reason": "bad_kind_or_side"}
+    if symbol not in SYMBOLS:
+        return {"ok": False, "reason": "unsupported_symbol", "symbols": SYMBOLS}
+    with STORE.mutate() as st:
+        _arm(st)
+        st["order_seq"] = int(st.get("order_seq", 0)) + 1
+        oid = str(st["order_seq"])
+        o = st.setdefault("orders", {})[oid] = {"id": oid, "kind": kind, "side": side, "symbol": symbol,
+                                                 "trigger": float(trigger), "fraction": max(0.0, min(1.0, float(fraction))),
+                                                 "plugin": plugin}
+        _TIDS[oid] = RESTING.add(symbol, o["trigger"], _FIRE[(kind, side)], oid)
+        return {"ok": True, **o}
+
+def cancel_resting(oid: str) -> bool:
+    with STORE.mutate() as st:
+        _arm(st)
+        if st.get("orders", {}).pop(str(oid), None) is None: return False
+        RESTING.cancel(_TIDS.pop(str(oid)))
+        return True
+
+def list_resting(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+    with STORE.view() as st:
+        return [o for o in st.get("orders", {}).values() if symbol is None or o["symbol"] == symbol.upper()]
+
+def pending() -> int:
+    if _ARMED is not STORE.read():
+        with STORE.view() as st: _arm(st)
+    return len(RESTING)
+
+def symbols() -> Set[str]:
+    """Symbols with at least one resting order (the ticker fetches a price for each)."""
+    if not pending(): return set()
+    with STORE.view() as st:
+        return {o["symbol"] for o in st.get("orders", {}).values()}
+
+def on_price(symbol: str, price: float) -> List[Dict[str, Any]]:
+    """Fire the resting orders `price` crosses (at market). Untouched orders cost nothing."""
+    if not pending(): return []
+    fired = RESTING.cross(symbol, price)
+    if not fired: return []
+    out = []
+    with STORE.mutate() as st:
+        for oid in fired:
+            _TIDS.pop(oid, None)
+            o = st.get("orders", {}).pop(oid, None)
+            if o is None: continue
+            ok, why = (risk.enforce_pre_trade(st, side="BUY", fraction=o["fraction"], price=price, symbol=o["symbol"])
+                       if o["side"] == "BUY" else (True, "ok"))
+            res = place_order(st, side=o["side"], price=price, fraction=o["fraction"],
+                              plugin=f'{o["plugin"]}:{o["kind"].lower()}', symbol=o["symbol"]) if ok else {"ok": False, "reason": why}
+            out.append({"order": o, **res})
+    return out
@@ -1,20 +1,18 @@
 import asyncio
-from .state import load_state, save_state
+from .state import STORE
 
 DEFAULT_CAP = 10.0  # % of cash for BUY per plugin before global risk
 
 def get_caps():
-    st = load_state()
-    caps = st.get("plugin_caps", {})
-    return caps
+    with STORE.view() as st:
+        return dict(st.get("plugin_caps", {}))
 
 def set_cap(name: str, pct: float):
-    st = load_state()
-    caps = st.setdefault("plugin_caps", {})
-    caps[name] = float(max(0.1, min(100.0, pct)))
-    save_state(st)
-    return caps
+    with STORE.mutate() as st:
+        caps = st.setdefault("plugin_caps", {})
+        caps[name] = float(max(0.1, min(100.0, pct)))
+        return dict(caps)
 
 def resolve_cap(name: str) -> float:
-    caps = get_caps()
-    return float(caps.get(name, DEFAULT_CAP))
\ No newline at end of file
+    with STORE.view() as st:
+        return float(st.get("plugin_caps", {}).get(name, DEFAULT_CAP))
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os, signal, sys, threading, time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .settings import LOGS
+
+MAX_SECONDS = 300.0
+MAX_HZ = 1000.0
+
+def _label(frame) -> str:
+    co = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{co.co_qualname}"
+
+class Sampler:
+    """Wall-clock sampling profiler that runs only while a capture is active.
+
+    start() spawns one daemon thread that reads sys._current_frames() `hz`
+    times a second for `seconds`, then writes the stacks in collapsed format
+    (`thread;outer;...;inner count`, one line per distinct stack; feed it to
+    flamegraph.pl or speedscope) to logs/profile-<ts>.folded. Nothing is hooked
+    into the interpreter, so there is no cost when idle.
+    """
+    def __init__(self, out_dir: Path = LOGS):
+        self.out_dir = out_dir
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.current: Optional[Dict[str, Any]] = None
+        self.last: Optional[Dict[str, Any]] = None
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float = 10.0, hz: float = 100.0, threads: str = "all") -> Dict[str, Any]:
+        """threads: 'all' or 'main' (the event-loop thread in the API and trader processes)."""
+        seconds = max(0.1, min(float(seconds), MAX_SECONDS)); hz = max(1.0, min(float(hz), MAX_HZ))
+        with self._lock:
+            if self.running():
+                return {**self.current, "started": False, "note": "already running"}
+            path = self.out_dir/f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+            self.current = {"path": str(path), "seconds": seconds, "hz": hz, "threads": threads,
+                            "started_at": time.time()}
+            self._thread = threading.Thread(target=self._run, args=(path, seconds, hz, threads),
+                                            name="profiler", daemon=True)
+            self._thread.start()
+        return {**self.current, "started": True}
+
+    def _run(self, path: Path, seconds: float, hz: float, threads: str):
+        me = threading.get_ident()
+        main = threading.main_thread().ident
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        period = 1.0 / hz
+        samples = 0
+        t_end = time.perf_counter() + seconds
+        nxt = time.perf_counter()
+        while nxt < t_end:
+            for tid, frame in sys._current_frames().items():
+                if tid == me or (threads == "main" and tid != main): continue
+                parts = []
+                while frame is not None:
+                    parts.append(_label(frame)); frame = frame.f_back
+                if tid not in names:
+                    names.update((t.ident, t.name) for t in threading.enumerate())
+                parts.append(names.get(tid, str(tid)))
+                stacks[";".join(reversed(parts))] += 1
+            samples += 1
+            nxt += period
+            delay = nxt - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+            else: nxt = time.perf_counter()  # fell behind; don't burst to catch up
+        self.last = {**(self.current or {}), "samples": samples, "stacks": len(stacks), "finished_at": time.time()}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text("".join(f"{s} {n}\n" for s, n in stacks.most_common()))
+            os.replace(tmp, path)
+        except OSError as e:
+            self.last["error"] = str(e)
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.running(), "current": self.current if self.running() else None, "last": self.last}
+
+PROFILER = Sampler()
+
+def install_signal(sig: int = getattr(signal, "SIGUSR2", 0), seconds: float = 10.0, hz: float = 100.0):
+    """Let `kill -USR2 <pid>` start a capture in a process that has no API (e.g. engine.trader)."""
+    if not sig or threading.current_thread() is not threading.main_thread(): return
+    # start from a helper thread: the handler runs on the main thread, which may hold PROFILER's lock
+    signal.signal(sig, lambda *_: threading.Thread(target=PROFILER.start, args=(seconds, hz), daemon=True).start())
@@ -1,5 +1,9 @@
-import asyncio
-from typing import Tuple
+import asyncio, sys, time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .metrics import RISK, timed
+from .state import STORE, StateStore
+from .settings import SYMBOL
 
 DEFAULTS = {
     "max_drawdown_pct": 15.0,     # halt sells/buys if equity < (1-maxDD)*initial
@@ -7,58 +11,313 @@ DEFAULTS = {
     "min_cash_reserve_pct": 50.0, # always leave this % of cash untouched
     "sl_pct": 20.0,               # stop-loss: if loss >= 20% vs avg, exit all
     "tp_pct": 30.0,               # take-profit: if gain >= 30% vs avg, take 25%
-    "tp_partial_pct": 25.0        # % of position to take when TP hits
+    "tp_partial_pct": 25.0,       # % of position to take when TP hits
+    "max_symbol_pct": 100.0       # cap one symbol's exposure (after the BUY) at this % of equity
 }
 
+BUY, SELL = 1, -1
+
+class Limits:
+    """DEFAULTS + state["risk"] compiled once into fractions; `rc` is the merged dict (read-only)."""
+    __slots__ = ("rc", "dd", "stake_cap", "reserve", "sl", "tp", "tp_partial", "symbol_cap")
+    def __init__(self, overrides: Optional[dict]):
+        rc = dict(DEFAULTS); rc.update(overrides or {})
+        self.rc = rc
+        self.dd = rc["max_drawdown_pct"]/100.0; self.stake_cap = rc["stake_cap_pct"]/100.0
+        self.reserve = rc["min_cash_reserve_pct"]/100.0; self.sl = rc["sl_pct"]; self.tp = rc["tp_pct"]
+        self.tp_partial = rc["tp_partial_pct"]/100.0; self.symbol_cap = rc["max_symbol_pct"]/100.0
+
+class RiskEngine:
+    """Portfolio risk state kept between calls.
+
+    Limits are compiled when state["risk"] is replaced (set_config always
+    assigns a new dict), not on every check. Positions live in per-symbol
+    arrays (qty, avg, last mark) kept in step by on_position() from the
+    executor, and unrealized PnL / gross exposure are running sums updated by
+    one term per fill or mark. A single check is O(prices passed in); a batch
+    is a handful of numpy operations over its orders. on_tick() re-evaluates
+    drawdown at every tick and latches the kill-switch, so it trips within one
+    tick even when no order is being placed.
+
+    The engine follows `store`, not whichever dict a caller passes: quantities
+    are re-read from state["positions"] whenever store.version moved (any
+    writer, dispatcher merges included), and marks, peak and the latch are
+    dropped only when store.replace() installs a different state. With
+    store=None (benchmarks, tests) it keys on the dict's identity and relies on
+    on_position() for changes.
+    """
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store
+        self._cfg: object = None
+        self.limits = Limits(None)
+        self._key: object = None      # store.generation, or id() of the standalone state dict
+        self._version = -1
+        self.index: Dict[str, int] = {}
+        self.qty = np.zeros(0); self.avg = np.zeros(0); self.mark = np.zeros(0)
+        self.unreal = 0.0    # sum qty * (mark - avg)
+        self.exposure = 0.0  # sum qty * mark
+        self.peak = 0.0
+        self.halted: Optional[str] = None
+
+    # ---- limits ----
+    def compile(self, state: dict) -> Limits:
+        cfg = state.get("risk")
+        if cfg is not self._cfg:
+            self.limits = Limits(cfg); self._cfg = cfg
+        return self.limits
+
+    # ---- positions / marks ----
+    def _slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = self.index[symbol] = len(self.index)
+            if i >= len(self.qty):
+                grow = max(16, len(self.qty))
+                self.qty, self.avg, self.mark = (np.concatenate([a, np.zeros(grow)]) for a in (self.qty, self.avg, self.mark))
+        return i
+
+    def sync(self, state: dict):
+        """Re-read positions when the store changed since the last call; O(1) otherwise, O(symbols) after a write."""
+        s = self.store
+        key = s.generation if s is not None else id(state)
+        if key != self._key:  # a different state altogether: nothing carried over
+            self.index.clear(); self.qty[:] = 0.0; self.avg[:] = 0.0; self.mark[:] = 0.0
+            self.halted = "kill_switch" if state.get("halted") else None; self.peak = 0.0
+            self._key = key; self._version = -1
+        elif s is None or s.version == self._version:
+            return
+        pos = state.get("positions", {})
+        for sym, i in self.index.items():
+            if sym not in pos: self.qty[i] = self.avg[i] = 0.0
+        for sym, p in pos.items():
+            i = self._slot(sym)
+            self.qty[i] = float(p.get("qty", 0.0)); self.avg[i] = float(p.get("avg_price", 0.0))
+            if not self.mark[i]: self.mark[i] = self.avg[i]  # no mark yet: count at cost
+        self._version = s.version if s is not None else 0
+        self._resum()
+
+    def _resum(self):
+        self.unreal = float(self.qty @ (self.mark - self.avg)); self.exposure = float(self.qty @ self.mark)
+
+    def on_position(self, symbol: str, qty: float, avg: float):
+        i = self._slot(symbol)
+        if not self.mark[i]: self.mark[i] = avg
+        m = self.mark[i]
+        self.unreal += qty * (m - avg) - self.qty[i] * (m - self.avg[i])
+        self.exposure += (qty - self.qty[i]) * m
+        self.qty[i] = qty; self.avg[i] = avg
+
+    def on_prices(self, prices: Dict[str, float]):
+        for sym, px in prices.items():
+            i = self._slot(sym); px = float(px)
+            d = self.qty[i] * (px - self.mark[i])
+            self.unreal += d; self.exposure += d; self.mark[i] = px
+
+    def equity(self, state: dict, prices: Optional[Dict[str, float]] = None) -> float:
+        eq = float(state.get("balance", 0.0)) + self.unreal
+        if prices:
+            idx = self.index
+            for sym, px in prices.items():
+                i = idx.get(sym)
+                if i is not None: eq += self.qty[i] * (float(px) - self.mark[i])
+        return eq
+
+    # ---- kill-switch ----
+    def on_tick(self, state: dict, prices: Dict[str, float]) -> bool:
+        """Mark to the tick's prices and latch the kill-switch on max drawdown. True while trading is allowed."""
+        self.sync(state); self.on_prices(prices); self.pin(state)
+        lim = self.compile(state)
+        eq = self.equity(state)
+        if eq > self.peak: self.peak = eq
+        if self.halted is None and eq < self._initial(state) * (1.0 - lim.dd):
+            self.halted = "kill_switch"
+            state["halted"] = {"reason": "max_drawdown_reached", "equity": float(eq), "ts": time.time()}
+        return self.halted is None
+
+    def reset(self, state: dict, rebase: bool = True):
+        """Clear the latch. Drawdown is measured from initial_balance, so unless rebase=False the current
+        equity becomes the new baseline; otherwise the next tick below the old floor trips it again."""
+        self.sync(state)
+        self.halted = None; state.pop("halted", None)
+        if rebase: state["initial_balance"] = self.peak = float(self.equity(state))
+
+    def pin(self, state: dict):
+        """Fix the drawdown baseline at the current balance the first time; callers hold STORE.mutate()."""
+        if state.get("initial_balance") is None: state["initial_balance"] = float(state.get("balance", 1000.0))
+
+    def _initial(self, state: dict) -> float:
+        # read-only: checks also run under STORE.view(); the baseline is written by pin()
+        ib = state.get("initial_balance")
+        return float(state.get("balance", 1000.0) if ib is None else ib)
+
+    # ---- checks ----
+    def check(self, state: dict, side: str, fraction: float, price: float, symbol: str = SYMBOL,
+              prices: Optional[Dict[str, float]] = None) -> Tuple[bool, str]:
+        lim = self.compile(state); self.sync(state)
+        initial = self._initial(state)
+        if self.halted: return False, self.halted
+        eq = self.equity(state, {**(prices or {}), symbol: price})
+        if eq < initial * (1.0 - lim.dd):
+            return False, "max_drawdown_reached"
+        if side == "BUY":
+            fraction = min(fraction, lim.stake_cap)
+            bal = float(state.get("balance", 0.0))
+            spend = bal * fraction
+            if bal - spend < bal * lim.reserve:
+                return False, "min_cash_reserve"
+            i = self.index.get(symbol)
+            held = self.qty[i] * float(price) if i is not None else 0.0
+            if held + spend > eq * lim.symbol_cap:
+                return False, "max_symbol_exposure"
+        return True, "ok"
+
+    def slots(self, symbols: Sequence[str]) -> np.ndarray:
+        """Array positions of `symbols`; callers checking the same universe every tick can keep this."""
+        idx = self.index
+        return np.array([idx[s] if s in idx else self._slot(s) for s in symbols], dtype=np.int64)
+
+    def check_batch(self, state: dict, symbols: Union[Sequence[str], np.ndarray], sides: Sequence,
+                    fractions: Sequence[float], prices: Sequence[float], cumulative: bool = True) -> Tuple[np.ndarray, List[str]]:
+        """Pre-trade check for many candidate orders at once -> (ok mask, reason per order).
+
+        symbols may be names or the int array from slots(); sides 'BUY'/'SELL' or +1/-1.
+        Equity is taken with every candidate's price applied to its symbol. With
+        cumulative=True, BUYs draw on the cash reserve in the order given, so
+        the first BUY that would breach it and every BUY after it are rejected,
+        and the symbol cap counts the spend of earlier BUYs on the same symbol.
+        """
+        lim = self.compile(state); self.sync(state)
+        initial = self._initial(state)
+        n = len(symbols)
+        if self.halted: return np.zeros(n, dtype=bool), [self.halted] * n
+        idx = symbols if isinstance(symbols, np.ndarray) and symbols.dtype.kind == "i" else self.slots(symbols)
+        px = np.asarray(prices, dtype=float)
+        # equity with the candidate marks applied (last price wins for repeated symbols)
+        moved = np.zeros(len(self.qty)); moved[idx] = px - self.mark[idx]
+        eq = float(state.get("balance", 0.0)) + self.unreal + float(self.qty @ moved)
+        if eq < initial * (1.0 - lim.dd):
+            return np.zeros(n, dtype=bool), ["max_drawdown_reached"] * n
+        sd = np.asarray(sides)
+        buy = sd == BUY if sd.dtype.kind in "iuf" else (sd == "BUY") | (sd == "buy")
+        bal = float(state.get("balance", 0.0))
+        spend = np.where(buy, bal * np.minimum(np.asarray(fractions, dtype=float), lim.stake_cap), 0.0)
+        drawn = np.cumsum(spend) if cumulative else spend
+        reserve_ok = bal - drawn >= bal * lim.reserve
+        if cumulative: reserve_ok = np.logical_and.accumulate(reserve_ok | ~buy) | ~buy
+        symbol_ok = self.qty[idx] * px + (_running_by(idx, spend) if cumulative else spend) <= eq * lim.symbol_cap
+        ok = ~buy | (reserve_ok & symbol_ok)
+        reasons = ["ok"] * n
+        for i in np.flatnonzero(~ok).tolist():
+            reasons[i] = "min_cash_reserve" if not reserve_ok[i] else "max_symbol_exposure"
+        return ok, reasons
+
+    def auto_actions(self, state: dict, prices: Dict[str, float]) -> List[dict]:
+        """SL/TP on every symbol's aggregate position in one pass over the arrays."""
+        lim = self.compile(state); self.sync(state); self.on_prices(prices)
+        n = len(self.index)
+        q, a, m = self.qty[:n], self.avg[:n], self.mark[:n]
+        live = (q > 0) & (a > 0)
+        change = np.where(live, (m - a) / np.where(live, a, 1.0) * 100.0, 0.0)
+        sl = np.flatnonzero(live & (change <= -lim.sl)); tp = np.flatnonzero(live & (change > -lim.sl) & (change >= lim.tp))
+        if not len(sl) and not len(tp): return []
+        names = list(self.index)
+        return ([{"signal": "EXIT", "reason": "SL", "symbol": names[i]} for i in sl] +
+                [{"signal": "SELL", "stake": lim.tp_partial, "reason": "TP", "symbol": names[i]} for i in tp])
+
+    def status(self) -> Dict[str, float]:
+        return {"unrealized": round(self.unreal, 6), "exposure": round(self.exposure, 6), "peak_equity": round(self.peak, 6),
+                "symbols": len(self.index), "halted": self.halted}
+
+def _running_by(keys: np.ndarray, v: np.ndarray) -> np.ndarray:
+    # running sum of v within each key, in the original order (stable sort, one cumsum, group offsets)
+    n = len(v)
+    if not n: return v
+    order = np.argsort(keys, kind="stable"); k = keys[order]; c = np.cumsum(v[order])
+    start = np.r_[True, k[1:] != k[:-1]]
+    first = np.maximum.accumulate(np.where(start, np.arange(n), 0))
+    out = np.empty(n); out[order] = c - np.where(first > 0, c[first - 1], 0.0)
+    return out
+
+RISK_ENGINE = RiskEngine(STORE)
+
 def get_config(state: dict) -> dict:
-    rc = dict(DEFAULTS)
-    rc.update(state.get("risk", {}))
-    return rc
+    return RISK_ENGINE.compile(state).rc
 
 def set_config(state: dict, **kwargs) -> dict:
-    rc = get_config(state)
+    rc = dict(get_config(state))
     for k,v in kwargs.items():
         if v is None: continue
         if k in DEFAULTS:
             try: rc[k] = float(v)
             except: pass
-    state["risk"] = rc
+    state["risk"] = rc  # a new dict: the engine recompiles on next use
     return rc
 
-def _equity(state: dict, mkt_price: float) -> float:
-    bal = float(state.get("balance", 0.0))
-    pos = state.get("positions", {}).get("BTCUSDT", {"qty":0.0,"avg_price":0.0})
-    qty = float(pos.get("qty",0.0)); avg = float(pos.get("avg_price",0.0))
-    return bal + (mkt_price - avg) * qty
-
-def enforce_pre_trade(state: dict, *, side: str, fraction: float, price: float) -> Tuple[bool,str]:
-    rc = get_config(state)
-    state.setdefault("initial_balance", float(state.get("balance", 1000.0)))
-    initial = float(state["initial_balance"])
-    eq = _equity(state, price)
-    # drawdown halt
-    if eq < initial * (1.0 - rc["max_drawdown_pct"]/100.0):
-        return False, "max_drawdown_reached"
-
-    if side == "BUY":
-        # cap stake, and enforce cash reserve
-        cap = rc["stake_cap_pct"]/100.0
-        fraction = min(fraction, cap)
-        bal = float(state.get("balance", 0.0))
-        spend = bal * fraction
-        reserve_min = bal * (rc["min_cash_reserve_pct"]/100.0)
-        if bal - spend < reserve_min:
-            return False, "min_cash_reserve"
-    return True, "ok"
-
-def auto_risk_actions(state: dict, *, price: float):
-    pos = state.get("positions", {}).get("BTCUSDT", {"qty":0.0,"avg_price":0.0})
+def reset_kill_switch(state: dict, rebase: bool = True):
+    RISK_ENGINE.reset(state, rebase)
+
+def _equity(state: dict, prices: Union[float, Dict[str, float]], symbol: str = SYMBOL) -> float:
+    # prices: one mark for `symbol`, or {symbol: mark}; positions without a mark count at cost
+    if not isinstance(prices, dict): prices = {symbol: prices}
+    eq = float(state.get("balance", 0.0))
+    for sym, pos in state.get("positions", {}).items():
+        if sym not in prices: continue
+        qty = float(pos.get("qty",0.0)); avg = float(pos.get("avg_price",0.0))
+        eq += (float(prices[sym]) - avg) * qty
+    return eq
+
+@timed(RISK.labels("pre_trade"))
+def enforce_pre_trade(state: dict, *, side: str, fraction: float, price: float, symbol: str = SYMBOL,
+                      prices: Optional[Dict[str, float]] = None) -> Tuple[bool,str]:
+    return RISK_ENGINE.check(state, side, fraction, price, symbol, prices)
+
+@timed(RISK.labels("pre_trade_batch"))
+def enforce_pre_trade_batch(state: dict, orders: Sequence[dict], cumulative: bool = True) -> Tuple[np.ndarray, List[str]]:
+    """orders: [{"symbol", "side", "fraction", "price"}, ...]"""
+    return RISK_ENGINE.check_batch(state, [o.get("symbol", SYMBOL) for o in orders], [o["side"] for o in orders],
+                                   [float(o["fraction"]) for o in orders], [float(o["price"]) for o in orders], cumulative)
+
+@timed(RISK.labels("auto"))
+def auto_risk_actions(state: dict, *, price: float, symbol: str = SYMBOL, rc: Optional[dict] = None):
+    pos = state.get("positions", {}).get(symbol, {"qty":0.0,"avg_price":0.0})
     qty = float(pos.get("qty",0.0)); avg = float(pos.get("avg_price",0.0))
     if qty <= 0 or avg <= 0: return None
-    rc = get_config(state)
+    rc = rc or get_config(state)
     change = (price - avg) / avg * 100.0
     if change <= -rc["sl_pct"]:
-        return {"signal":"EXIT", "reason":"SL"}
+        return {"signal":"EXIT", "reason":"SL", "symbol": symbol}
     if change >= rc["tp_pct"]:
-        return {"signal":"SELL", "stake": rc["tp_partial_pct"]/100.0, "reason":"TP"}
-    return None
\ No newline at end of file
+        return {"signal":"SELL", "stake": rc["tp_partial_pct"]/100.0, "reason":"TP", "symbol": symbol}
+    return None
+
+def auto_risk_actions_all(state: dict, prices: Dict[str, float]) -> List[dict]:
+    return RISK_ENGINE.auto_actions(state, prices)
+
+def bench(symbols: int = 500, n: int = 2000):
+    """Single and batched pre-trade check latency at `symbols` open positions."""
+    import random
+    rng = random.Random(1); syms = [f"S{i:04d}USDT" for i in range(symbols)]
+    st = {"balance": 1_000_000.0, "positions": {s: {"qty": rng.uniform(0, 10), "avg_price": 100.0} for s in syms}}
+    eng = RiskEngine(); eng.on_tick(st, {s: 100.0 * rng.uniform(0.95, 1.05) for s in syms})
+    pc = time.perf_counter
+    t0 = pc()
+    for k in range(n): eng.check(st, "BUY", 0.01, 101.0, syms[k % symbols])
+    single = (pc() - t0) / n
+    sides = ["BUY" if rng.random() < 0.7 else "SELL" for _ in syms]; fr = [0.001] * symbols
+    px = [100.0 * rng.uniform(0.95, 1.05) for _ in syms]
+    t0 = pc()
+    for _ in range(n // 10): eng.check_batch(st, syms, sides, fr, px)
+    batch = (pc() - t0) / (n // 10)
+    idx = eng.slots(syms); sd = np.where(np.array(sides) == "BUY", BUY, SELL); fa = np.array(fr); pa = np.array(px)
+    t0 = pc()
+    for _ in range(n // 10): eng.check_batch(st, idx, sd, fa, pa)
+    batch_arr = (pc() - t0) / (n // 10)
+    t0 = pc()
+    for _ in range(n // 10): eng.on_tick(st, {syms[0]: 100.0})
+    tick = (pc() - t0) / (n // 10)
+    print({"symbols": symbols, "check_us": round(single * 1e6, 2), "batch_us": round(batch * 1e6, 1),
+           "batch_arrays_us": round(batch_arr * 1e6, 1), "batch_orders": symbols, "on_tick_us": round(tick * 1e6, 2)})
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:4]))
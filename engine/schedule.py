@@ -0,0 +1,100 @@
+import asyncio, math, sys, time
+from typing import AsyncIterator, Optional
+from .metrics import REGISTRY
+from .settings import TICK_POLICY, TICK_ALIGN
+
+POLICIES = ("skip", "coalesce", "catchup")
+# seconds; a healthy tick is late by well under a millisecond, an overrun by up to several periods
+TICK_BUCKETS = (1e-4, 5e-4, 1e-3, 2e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+LATENESS = REGISTRY.histogram("aurora_tick_lateness_seconds", "How late a tick fired after its deadline", ("loop",), TICK_BUCKETS)
+JITTER = REGISTRY.histogram("aurora_tick_jitter_seconds", "|actual period - interval| between consecutive ticks", ("loop",), TICK_BUCKETS)
+MISSED = REGISTRY.counter("aurora_ticks_missed_total", "Deadlines dropped because the previous tick overran", ("loop",))
+
+class TickScheduler:
+    """Fixed-rate ticks on the monotonic clock, aligned to wall-clock multiples of the interval.
+
+    Deadlines are first + k * interval, never "after the work plus a sleep", so
+    the period does not stretch with tick duration and error does not accumulate.
+    With align=True the first deadline is the next wall-clock boundary (every
+    1s tick at :00.000, every 60s one at the top of the minute); the phase is
+    taken once and then kept on time.monotonic(), so clock steps cannot move it.
+
+    When a tick overruns one or more deadlines the policy decides what happens:
+      skip      drop the missed deadlines and wait for the next boundary
+      coalesce  fire once immediately for all of them, then back on the grid
+      catchup   fire every missed deadline back to back
+    """
+    def __init__(self, interval: float, name: str = "tick", policy: str = TICK_POLICY, align: bool = TICK_ALIGN):
+        if policy not in POLICIES: raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.interval, self.name, self.policy, self.align = float(interval), name, policy, align
+        self.deadline: Optional[float] = None  # monotonic time of the next tick
+        self.ticks = 0; self.missed = 0
+        self._lateness, self._jitter, self._missed = LATENESS.labels(name), JITTER.labels(name), MISSED.labels(name)
+
+    def _first(self, now: float) -> float:
+        if not self.align: return now
+        wall = time.time()
+        return now + (math.ceil(wall / self.interval) * self.interval - wall)
+
+    def _overrun(self, now: float):
+        # the previous tick ran past this deadline; pick the next one according to the policy
+        if self.policy == "catchup": return
+        n = int((now - self.deadline) // self.interval) + 1  # deadlines already passed, this one included
+        if self.policy == "coalesce": n -= 1  # the tick about to fire stands in for the latest of them
+        self.missed += n; self._missed.inc(n)
+        self.deadline += n * self.interval
+
+    async def __aiter__(self) -> AsyncIterator[float]:
+        """Yields the wall-clock time of each scheduled boundary."""
+        mono = time.monotonic; iv = self.interval
+        now = mono()
+        self.deadline = self._first(now)
+        offset = time.time() - now  # monotonic -> wall, fixed for the life of the schedule
+        prev: Optional[float] = None
+        while True:
+            now = mono()
+            if now < self.deadline:
+                await asyncio.sleep(self.deadline - now)
+                now = mono()
+            elif prev is not None:
+                self._overrun(now)
+                if now < self.deadline:
+                    await asyncio.sleep(self.deadline - now)
+                    now = mono()
+            self._lateness.observe(max(0.0, now - self.deadline))
+            if prev is not None: self._jitter.observe(abs(now - prev - iv))
+            prev = now; self.ticks += 1
+            at = self.deadline + offset
+            self.deadline += iv
+            yield round(at / iv) * iv if self.align else at
+
+async def _bench(interval: float, ticks: int, work: float, policy: str):
+    def busy(d):
+        end = time.perf_counter() + d
+        while time.perf_counter() < end: pass
+    t0 = time.monotonic()
+    for _ in range(ticks):
+        busy(work); await asyncio.sleep(interval)
+    naive = time.monotonic() - t0 - ticks * interval
+    s = TickScheduler(interval, "bench", policy, align=True); t0 = None; n = 0
+    async for at in s:
+        if t0 is None: t0 = time.monotonic()
+        n += 1
+        if n > ticks: break
+        busy(work)
+    drift = time.monotonic() - t0 - ticks * interval
+    h = LATENESS.labels("bench")
+    print({"interval": interval, "ticks": ticks, "work": work, "policy": policy,
+           "naive_drift_ms": round(naive * 1e3, 2), "sched_drift_ms": round(drift * 1e3, 2),
+           "mean_lateness_us": round(h.sum / max(1, h.count) * 1e6, 1), "missed": s.missed})
+    for fam in (LATENESS, JITTER, MISSED): fam.children.pop(("bench",), None)
+
+def bench(interval: float = 0.02, ticks: int = 100, work: float = 0.005, policy: str = "skip"):
+    """Accumulated drift of sleep(interval) after work vs the scheduler, over the same ticks."""
+    asyncio.run(_bench(interval, ticks, work, policy))
+
+if __name__ == "__main__":
+    # python -m engine.schedule bench [interval] [ticks] [work] [policy]
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        a = sys.argv[2:6]
+        bench(*(f(v) for f, v in zip((float, int, float, str), a)))
@@ -1,15 +1,154 @@
 import asyncio
+from contextlib import contextmanager
 from pathlib import Path
-import json, time
+from typing import Any, List, Tuple
+import atexit, copy, json, os, threading, time
+from .metrics import PERSIST
+
+_PERSIST = PERSIST.labels("state")
 
 STATE_FILE = Path("logs/state.json")
 
-def load_state():
-    if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text() or "{}")
+def _default_state() -> dict:
     return {"balance": 1000.0, "plugins": [], "last_heartbeat": None}
 
+class StateStore:
+    """Process-wide state kept in memory.
+
+    Readers use `view()` (the live dict, under the lock) or `snapshot()` (a
+    shared read-only copy rebuilt once per change); all mutations go through
+    `mutate()`, which serialises writers on one lock and only marks the store
+    dirty. A
+    single background thread coalesces dirty marks and rewrites the file at
+    most once per `flush_interval`, so callers never pay for the JSON dump.
+    Lock sections never await, so this is safe from both the event loop and
+    FastAPI's threadpool.
+    """
+    def __init__(self, path: Path = STATE_FILE, flush_interval: float = 0.25):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._io = threading.Lock()  # one file writer at a time, in dump order
+        self._state = None
+        self._dirty = False
+        self._wake = threading.Event()
+        self._writer = None
+        self.flushes = 0
+        self.version = 0  # bumped on every mutation; cheap change marker for readers
+        self.generation = 0  # bumped when replace() swaps in a whole new state
+        self._snap = None; self._snap_version = -1
+
+    def _ensure(self) -> dict:
+        if self._state is None:
+            with self._lock:
+                if self._state is None:
+                    self._state = json.loads(self.path.read_text() or "{}") if self.path.exists() else _default_state()
+        return self._state
+
+    def read(self) -> dict:
+        """Live state; treat as read-only outside `mutate()`."""
+        return self._ensure()
+
+    def snapshot(self) -> dict:
+        """Deep copy of the state as of the current version, shared by every reader until the next
+        mutation: one O(state) copy per change, O(1) for the reads in between. Do not modify it."""
+        with self._lock:
+            if self._snap_version != self.version or self._snap is None:
+                self._snap = copy.deepcopy(self._ensure()); self._snap_version = self.version
+            return self._snap
+
+    @contextmanager
+    def view(self):
+        """Consistent read under the writer lock (no persistence)."""
+        with self._lock:
+            yield self._ensure()
+
+    @contextmanager
+    def mutate(self):
+        with self._lock:
+            st = self._ensure()
+            try:
+                yield st
+            finally:
+                st["last_heartbeat"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+                self._mark_dirty()
+
+    def replace(self, state: dict):
+        with self._lock:
+            self._state = state; self.generation += 1
+            state["last_heartbeat"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self.version += 1
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name="state-writer", daemon=True)
+            self._writer.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(); self._wake.clear()
+            time.sleep(self.flush_interval)  # coalesce a burst of writes into one dump
+            self.flush()
+
+    def flush(self):
+        with self._io:
+            t0 = time.perf_counter()
+            with self._lock:
+                if not self._dirty: return
+                text = json.dumps(self._state, separators=(",", ":"))
+                self._dirty = False
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_text(text)
+                os.replace(tmp, self.path)
+            except Exception:
+                self._dirty = True
+                raise
+            self.flushes += 1
+            _PERSIST.since(t0)
+
+_GONE = object()
+
+def namespace(st: dict, keys: Tuple[str, ...]) -> dict:
+    # a plugin's view: top-level scalars are immutable and shared, only the containers it declared are copied
+    ns = {k: v for k, v in st.items() if not isinstance(v, (dict, list))}
+    for k in keys:
+        if k in st: ns[k] = copy.deepcopy(st[k])
+    return ns
+
+def diff(before: dict, after: dict, depth: int = 2, path: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], Any]]:
+    """(path, value) for every key changed between two copies; nested dicts are compared `depth` levels
+    down so two writers of different sub-keys (a plugin and a fill landing mid-tick) do not clobber each other."""
+    out = []
+    for k, v in after.items():
+        old = before.get(k, _GONE)
+        if old is _GONE or old != v:
+            if depth > 1 and isinstance(v, dict) and isinstance(old, dict): out += diff(old, v, depth - 1, path + (k,))
+            else: out.append((path + (k,), v))
+    out += [(path + (k,), _GONE) for k in before if k not in after]
+    return out
+
+def merge(st: dict, changes: List[Tuple[Tuple[str, ...], Any]]):
+    # write diff() output into `st` (call under STORE.mutate())
+    for path, v in changes:
+        d = st
+        for k in path[:-1]:
+            nxt = d.get(k)
+            if not isinstance(nxt, dict): nxt = d[k] = {}
+            d = nxt
+        if v is _GONE: d.pop(path[-1], None)
+        else: d[path[-1]] = v
+
+STORE = StateStore()
+atexit.register(STORE.flush)
+
+def load_state():
+    """Read-only snapshot (STORE.snapshot()); change state through STORE.mutate() or save_state()."""
+    return STORE.snapshot()
+
 def save_state(state: dict):
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    state["last_heartbeat"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
-    STATE_FILE.write_text(json.dumps(state, indent=2))
\ No newline at end of file
+    STORE.replace(state)
@@ -1,8 +1,27 @@
-from typing import Dict, Any
-from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+from abc import ABC
+import numpy as np
 from .types import StrategyVote
 class Strategy(ABC):
+    """Implement score() (hot path: plain floats, no pydantic) and note(); on_price()
+    wraps them in a StrategyVote for callers that want the model. Older strategies
+    that only override on_price() keep working through the default score(); a
+    subclass overriding neither is rejected when it is defined (set
+    __abstract__ = True on intermediate base classes).
+    scores_batch() is optional: a whole price array at once, for backtests."""
     name: str
     def __init__(self, name:str): self.name=name
-    @abstractmethod
-    def on_price(self, price: float) -> StrategyVote: ...
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        # score() and on_price() default to each other; a concrete strategy has to break the cycle
+        if cls.score is Strategy.score and cls.on_price is Strategy.on_price and not cls.__dict__.get("__abstract__"):
+            raise TypeError(f"{cls.__name__} must override score() or on_price()")
+    def score(self, price: float) -> Tuple[float, float]:
+        v=self.on_price(price)
+        return v.bias, v.confidence
+    def note(self) -> str: return ""
+    def on_price(self, price: float) -> StrategyVote:
+        bias, conf = self.score(price)
+        return StrategyVote(name=self.name, bias=bias, confidence=conf, note=self.note())
+    def scores_batch(self, prices: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        return None
@@ -1,5 +1,13 @@
 import os, asyncio, time
 from typing import Any, Dict, Optional
+from .dispatch import DISPATCHER
+from . import orders
+from .risk import RISK_ENGINE
+from .state import STORE
+from .loader import get_loaded_modules
+from .pricefeed import fetch_binance_prices
+from .schedule import TickScheduler
+from .settings import SYMBOL
 
 class Ticker:
     def __init__(self, interval: float = 1.0):
@@ -9,18 +17,43 @@ class Ticker:
         self.last_tick: Optional[float] = None
         self.count: int = 0
 
-    async def tick_once(self) -> Dict[str, Any]:
+    async def tick_once(self, price: Optional[float] = None, prices: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """price: the AURORA_SYMBOL mark plugins see; prices: marks for any other symbols
+        (resting orders and positions on them are evaluated too)."""
         self.last_tick = time.time()
         self.count += 1
-        await asyncio.sleep(0)
-        return {"ts": self.last_tick, "count": self.count}
+        out: Dict[str, Any] = {"ts": self.last_tick, "count": self.count}
+        prices = dict(prices or {})
+        if price is not None: prices[SYMBOL] = price
+        price = prices.get(SYMBOL)
+        if prices:
+            if RISK_ENGINE.halted is None:
+                with STORE.mutate() as st:  # on_tick may write initial_balance / the latched kill-switch
+                    if not RISK_ENGINE.on_tick(st, prices): out["halted"] = RISK_ENGINE.halted
+            fired = [f for sym, px in prices.items() for f in orders.on_price(sym, px)]
+            if fired: out["orders"] = fired
+        if price is not None and get_loaded_modules():
+            out["plugins"] = await DISPATCHER.dispatch({"ts": self.last_tick, "tick": self.count, "price": price, "symbol": SYMBOL})
+        else:
+            await asyncio.sleep(0)
+        return out
+
+    async def _prices(self) -> Dict[str, float]:
+        # one batched request for the plugin symbol plus every symbol with resting orders or a position
+        syms = orders.symbols()
+        with STORE.view() as st:
+            syms.update(s for s, p in st.get("positions", {}).items() if p.get("qty"))
+        if get_loaded_modules(): syms.add(SYMBOL)
+        if not syms: return {}
+        try: return await fetch_binance_prices(sorted(syms))
+        except Exception: return {}
 
     async def _loop(self) -> None:
         self._stop.clear()
         try:
-            while not self._stop.is_set():
-                await self.tick_once()
-                await asyncio.sleep(self.interval)
+            async for _ in TickScheduler(self.interval, "ticker"):
+                if self._stop.is_set(): break
+                await self.tick_once(prices=await self._prices())
         finally:
             self._task = None
 
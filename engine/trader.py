@@ -1,6 +1,8 @@
 import asyncio, logging, os
 from datetime import datetime
 from typing import Optional
+from .profiler import install_signal
+from .schedule import TickScheduler
 
 try:
     import uvloop
@@ -29,16 +31,14 @@ class Trader:
             return
         self._running, self._stop = True, asyncio.Event()
         try:
-            while not self._stop.is_set():
+            async for _ in TickScheduler(self.interval, "trader"):  # may be cancelled while waiting
+                if self._stop.is_set(): break
                 try:
                     await self.tick_once()
-                    await asyncio.sleep(self.interval)  # may be cancelled here
-                except asyncio.CancelledError:
-                    log.info("tick loop cancelled; shutting down cleanly")
-                    break
                 except Exception as e:
-                    log.exception("tick error: %s", e)
-                    await asyncio.sleep(0.25)
+                    log.exception("tick error: %s", e)  # the next tick stays on its boundary
+        except asyncio.CancelledError:
+            log.info("tick loop cancelled; shutting down cleanly")
         finally:
             self._running = False
 
@@ -51,6 +51,7 @@ async def _amain() -> None:
     await t.tick_loop()
 
 def main() -> None:
+    install_signal()
     try:
         asyncio.run(_amain())
     except (KeyboardInterrupt, asyncio.CancelledError):
@@ -1,15 +1,10 @@
-import os, csv, time
+import os, time
 from dataclasses import dataclass, asdict, field
-from pathlib import Path
 from typing import Optional, Literal
+from .tradestore import TRADES
 
 Action = Literal["buy","sell","hold"]
 
-LOG_PATH = Path("logs/trade_log.csv")
-LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-if not LOG_PATH.exists():
-    LOG_PATH.write_text("ts,action,price,qty,balance,position,size,avg_price,unrealized_pnl,realized_pnl\n")
-
 @dataclass
 class Position:
     size: float = 0.0         # +long, -short
@@ -45,21 +40,9 @@ class Account:
         return None
 
     def _log(self, action: Action, price: float, qty: float) -> None:
-        row = {
-            "ts": int(time.time()),
-            "action": action,
-            "price": round(price, 8),
-            "qty": round(qty, 8),
-            "balance": round(self.balance, 8),
-            "position": round(self.pos.size, 8),
-            "size": round(abs(self.pos.size), 8),
-            "avg_price": round(self.pos.avg_price, 8),
-            "unrealized_pnl": 0.0,  # filled by caller if needed
-            "realized_pnl": round(self.realized_pnl, 8),
-        }
-        with LOG_PATH.open("a", newline="") as f:
-            w = csv.DictWriter(f, fieldnames=row.keys())
-            w.writerow(row)
+        TRADES.append(ts=time.time(), symbol=None, plugin="account", side=action.upper(), price=price, qty=qty,
+                      balance_after=self.balance, pos_qty_after=self.pos.size, avg_price_after=self.pos.avg_price,
+                      realized_pnl=self.realized_pnl, source="account")
 
     def _avg_in(self, old_size: float, old_avg: float, add_size: float, price: float) -> float:
         # Weighted average price for increasing a position on same side
@@ -1,15 +1,21 @@
 import asyncio
 REGISTER_NAME = "ai_plugin"
-from engine.ai_agent import step, load, save, set_eps, set_stake
+STATE_KEYS = ("ai", "positions")  # containers on_tick reads or writes; the dispatcher copies only these
+from engine.ai_agent import step, load, save, set_eps, set_stake, HISTORY
+from engine.settings import SYMBOL
 
 def on_load(state):
     load()
-    state.setdefault("ai", {"history": [], "last_equity": None, "eps": 0.10})
+    ai = state.setdefault("ai", {"last_equity": None, "eps": 0.10})
+    legacy = ai.pop("history", None)  # older state.json kept the price history inline
+    if legacy and not len(HISTORY):
+        HISTORY.seed(legacy); HISTORY.save()
     return {"status":"loaded"}
 
 def on_tick(state, ctx):
     price = float(ctx["price"])
-    pos = state.setdefault("positions", {}).setdefault("BTCUSDT", {"qty":0.0,"avg_price":0.0})
+    sym = ctx.get("symbol", SYMBOL)  # the symbol whose price ctx carries
+    pos = state.setdefault("positions", {}).setdefault(sym, {"qty":0.0,"avg_price":0.0})
     qty = float(pos.get("qty",0.0))
     cash = float(state.get("balance", 0.0))
     equity = cash + qty * price
@@ -21,12 +27,7 @@ def on_tick(state, ctx):
         reward = equity - float(last_eq)
     state["ai"]["last_equity"] = equity
 
-    hist = state["ai"].setdefault("history", [])
-    hist.append(price)
-    if len(hist) > 500:
-        del hist[:len(hist)-500]
-
-    out = step(hist, qty, cash, price, reward)
+    out = step(qty, cash, price, reward)
     act = out["action"]; stake = out["stake"]
     if act == "HOLD":
         return {"note":"hold", **out}
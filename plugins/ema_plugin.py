@@ -1,5 +1,6 @@
 import asyncio
 REGISTER_NAME = "ema_plugin"
+TICK_INLINE = True  # trivial; cheaper than a thread-pool hop
 def on_load(state):
     state.setdefault("ema_seen", 0)
     return {"status": "loaded"}
@@ -1,4 +1,5 @@
 import asyncio
 REGISTER_NAME = "momentum_plugin"
+TICK_INLINE = True  # trivial; cheaper than a thread-pool hop
 def on_tick(state, ctx):
     return {"momentum": "hold", "price": ctx["price"]}
\ No newline at end of file
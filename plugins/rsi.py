@@ -1,13 +1,20 @@
+import numpy as np
 from ..engine.strategy_sdk import Strategy
-from ..engine.types import StrategyVote
-from ..engine.indicators import rsi
+from ..engine.indicators import rsi, rsi_batch
 class RSIStrategy(Strategy):
     def __init__(self, low=30, high=70, period=14):
         super().__init__(f"RSI_{period}_{low}_{high}")
-        self.state={}; self.low=low; self.high=high; self.period=period
-    def on_price(self, price: float) -> StrategyVote:
-        v=rsi(self.state, price, self.period)
-        if v<self.low: bias=+1.0; conf=min((self.low-v)/self.low,1.0)
-        elif v>self.high: bias=-1.0; conf=min((v-self.high)/(100-self.high),1.0)
-        else: bias=0.0; conf=0.2
-        return StrategyVote(name=self.name, bias=bias, confidence=conf, note=f"rsi={v:.2f}")
+        self.state={}; self.low=low; self.high=high; self.period=period; self.v=50.0
+    def score(self, price: float):
+        v=self.v=rsi(self.state, price, self.period)
+        if v<self.low: return +1.0, min((self.low-v)/self.low,1.0)
+        if v>self.high: return -1.0, min((v-self.high)/(100-self.high),1.0)
+        return 0.0, 0.2
+    def note(self) -> str: return f"rsi={self.v:.2f}"
+    def scores_batch(self, prices):
+        v=rsi_batch(prices, self.period)
+        lo, hi = v<self.low, v>self.high
+        bias=np.where(lo, 1.0, np.where(hi, -1.0, 0.0))
+        conf=np.where(lo, np.minimum((self.low-v)/self.low, 1.0),
+                      np.where(hi, np.minimum((v-self.high)/(100-self.high), 1.0), 0.2))
+        return bias, conf
@@ -1,5 +1,6 @@
 import asyncio
 REGISTER_NAME = "rsi_plugin"
+TICK_INLINE = True  # trivial; cheaper than a thread-pool hop
 def on_tick(state, ctx):
     c = int(state.get("rsi_ticks", 0)) + 1
     state["rsi_ticks"] = c
@@ -0,0 +1,65 @@
+import json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+class StandIn:
+    """Local stand-in for the Binance REST API. routes: path -> fn(query) -> body (JSON-able),
+    or (status, body), or (status, body, delay_sec). Records each request and the client ports seen."""
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.ports = set()
+        stand = self
+
+        class H(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+            def log_message(self, *a): pass
+            def do_GET(self):
+                u = urlparse(self.path); q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                stand.requests.append((u.path, q)); stand.ports.add(self.client_address[1])
+                fn = stand.routes.get(u.path)
+                res = fn(q) if fn else (404, {"msg": "not found"})
+                status, body, delay = (res + (0.0,))[:3] if isinstance(res, tuple) else (200, res, 0.0)
+                if delay: time.sleep(delay)
+                b = json.dumps(body).encode()
+                self.send_response(status); self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(b))); self.end_headers(); self.wfile.write(b)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), H)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown(); self.server.server_close()
+
+@pytest.fixture
+def standin():
+    s = StandIn()
+    yield s
+    s.close()
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """The process-wide STORE, emptied and pointed at a scratch file for one test."""
+    from engine.state import STORE, _default_state
+    monkeypatch.setattr(STORE, "path", tmp_path/"state.json")
+    monkeypatch.setattr(STORE, "_state", _default_state())
+    STORE.generation += 1  # engines keyed on the store (risk) start over
+    yield STORE
+    STORE._dirty = False  # nothing of a test's state reaches the real file
+    STORE.generation += 1
+
+@pytest.fixture
+def trades(tmp_path, monkeypatch):
+    """A scratch TradeStore swapped in for TRADES wherever engine modules imported it."""
+    from engine.tradestore import TradeStore
+    ts = TradeStore(tmp_path/"trades.db")
+    for name, mod in list(sys.modules.items()):
+        if name.startswith("engine.") and hasattr(mod, "TRADES"): monkeypatch.setattr(mod, "TRADES", ts)
+    yield ts
+    ts.close()
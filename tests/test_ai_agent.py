@@ -0,0 +1,110 @@
+import threading
+import numpy as np
+from engine import ai_agent
+from engine.ai_agent import Checkpointer, LinearQLearner, PriceRing, Replay, _features, _price_features, train_offline
+
+def walk(n, seed=0):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+
+def test_ring_keeps_the_newest_prices_as_contiguous_views():
+    r = PriceRing(cap=5, path=None)
+    for px in range(1, 9): r.push(float(px))
+    assert len(r) == 5 and r.last() == 8.0
+    assert r.prices().tolist() == [4, 5, 6, 7, 8] and r.changes(3).tolist() == [1, 1, 1]
+    assert r.window(3).base is r.p  # no copy
+
+def test_ring_round_trips_through_its_sidecar_and_never_writes_when_empty(tmp_path):
+    path = tmp_path/"h.bin"
+    r = PriceRing(cap=4, path=path, save_every=0)
+    r.save(); assert not path.exists()
+    for px in (1.0, 2.0, 3.0, 4.0, 5.0): r.push(px)
+    r.save()
+    back = PriceRing(cap=4, path=path); back.load()
+    assert back.prices().tolist() == [2, 3, 4, 5] and back.changes(4)[1:].tolist() == [1, 1, 1]
+    mtime = path.stat().st_mtime_ns
+    back.save()  # merely loaded: identical to the file
+    assert path.stat().st_mtime_ns == mtime
+
+def test_background_saves_coalesce_to_the_newest(tmp_path):
+    jobs = []
+    r = PriceRing(cap=8, path=tmp_path/"h.bin", save_every=1, writer=jobs.append)
+    for px in (1.0, 2.0, 3.0): r.push(px)
+    assert len(jobs) == 1  # later saves replaced the queued bytes
+    jobs[0]()
+    back = PriceRing(cap=8, path=tmp_path/"h.bin"); back.load()
+    assert back.prices().tolist() == [1, 2, 3]
+
+def test_live_features_match_the_offline_batch():
+    p = walk(60); k = 20
+    F = _price_features(p, k)
+    r = PriceRing(cap=50, path=None)
+    for i, px in enumerate(p):
+        r.push(px)
+        if i >= k - 1:
+            np.testing.assert_allclose(_features(r, 0.0, 1.0, px, k)[:k], F[i - k + 1], rtol=1e-12, atol=1e-15)
+
+def test_replay_wraps_and_samples_stored_transitions():
+    rb = Replay(dim=2, cap=3, seed=0)
+    for i in range(5): rb.push([i, i], i % 3, float(i), [i + 1, i + 1], done=i == 4)
+    assert len(rb) == 3 and sorted(rb.R.tolist()) == [2.0, 3.0, 4.0]
+    X, A, R, X2, D = rb.sample(10)
+    assert len(R) == 3 and set(R) <= {2.0, 3.0, 4.0}
+    assert np.array_equal(X2, X + 1) and np.array_equal(D, R == 4.0)
+
+def test_minibatch_of_one_is_the_single_td_update():
+    rng = np.random.default_rng(1)
+    a, b = LinearQLearner(k=3), LinearQLearner(k=3)
+    a.W = rng.normal(size=(3, 5)); b.W = a.W.copy()
+    x, x2 = rng.normal(size=5), rng.normal(size=5)
+    a.td_update(x, 2, 0.5, x2)
+    b.td_batch(x[None], np.array([2]), np.array([0.5]), x2[None], np.array([False]))
+    np.testing.assert_allclose(a.W, b.W, rtol=1e-14)
+
+def test_live_step_records_the_next_state_as_successor(monkeypatch, tmp_path):
+    agent = LinearQLearner(k=3, eps=0.0)
+    monkeypatch.setattr(ai_agent, "AGENT", agent)
+    monkeypatch.setattr(ai_agent, "HISTORY", PriceRing(cap=16, path=None))
+    monkeypatch.setattr(ai_agent, "CHECKPOINTS", Checkpointer(root=tmp_path, every=0))
+    for i, px in enumerate((100.0, 101.0, 103.0, 102.0)):
+        ai_agent.step(0.0, 1000.0, px, reward=float(i))
+    rb = agent.replay
+    assert len(rb) == 3 and rb.R[:3].tolist() == [1.0, 2.0, 3.0]
+    assert np.array_equal(rb.X2[0], rb.X[1]) and np.array_equal(rb.X2[1], rb.X[2])
+    assert not np.array_equal(rb.X[1], rb.X2[1])
+
+def test_offline_training_is_reproducible():
+    p = walk(400)
+    runs = [(train_offline(p, epochs=2, agent=LinearQLearner(k=10), seed=7, batch=16)) for _ in range(2)]
+    assert runs[0]["transitions"] == 2 * (400 - 10)
+    assert runs[0]["final_equity"] == runs[1]["final_equity"]
+
+def test_checkpoints_are_versioned_pruned_and_loaded_newest_first(tmp_path):
+    ck = Checkpointer(root=tmp_path, keep=2, every=0)
+    agent = LinearQLearner(k=3)
+    for i in range(4):
+        agent.W[:] = i; agent.updates = i; ck.save(agent); ck.flush()
+    ck.close()
+    assert ck.versions() == [3, 4] and sorted(p.name for p in tmp_path.iterdir()) == ["ckpt-000003.bin", "ckpt-000004.bin"]
+    header, arrays = Checkpointer(root=tmp_path).load()
+    assert header["version"] == 4 and header["updates"] == 3 and isinstance(arrays["W"], np.memmap)
+    assert (arrays["W"] == 3).all()
+    ck.path(4).write_bytes(b"torn")
+    header, arrays = Checkpointer(root=tmp_path).load()
+    assert header["version"] == 3 and (arrays["W"] == 2).all()
+
+def test_saves_queued_behind_a_running_write_coalesce(tmp_path):
+    ck = Checkpointer(root=tmp_path, keep=10, every=0)
+    gate = threading.Event(); ck.background(gate.wait)  # occupy the writer thread
+    agent = LinearQLearner(k=3)
+    for _ in range(3): ck.save(agent)
+    gate.set(); ck.close()
+    assert ck.versions() == [3]
+
+def test_autosave_only_when_due_and_changed(tmp_path, monkeypatch):
+    ck = Checkpointer(root=tmp_path, every=60.0); agent = LinearQLearner(k=3)
+    ck.maybe_save(agent); assert ck.version == 0  # unchanged weights
+    agent.updates = 1
+    ck.maybe_save(agent); assert ck.version == 0  # not due yet
+    monkeypatch.setattr(ai_agent.time, "monotonic", lambda: ck.last_save + 61.0)
+    ck.maybe_save(agent); ck.close()
+    assert ck.versions() == [1]
@@ -0,0 +1,63 @@
+import json, time
+import pytest
+from engine.atomic import Journal, atomic_write_json
+
+def journal(tmp_path, **kw):
+    return Journal(tmp_path/"state.journal", tmp_path/"state.json", **kw)
+
+def records(j):
+    return [json.loads(l) for l in j.path.read_bytes().splitlines()]
+
+def test_sync_mode_makes_every_commit_durable_before_returning(tmp_path):
+    j = journal(tmp_path, mode="sync")
+    j.commit({"n": 1}, [{"id": 1}]); j.commit({"n": 2}, [{"id": 2}])
+    assert [(r["state"]["n"], r["fills"]) for r in records(j)] == [(1, [{"id": 1}]), (2, [{"id": 2}])]
+    assert j.fsyncs == 2 and journal(tmp_path).load() == {"n": 2}
+
+def test_group_mode_writes_one_record_per_barrier(tmp_path):
+    j = journal(tmp_path, mode="group", window=60.0)
+    for i in range(3): j.commit({"n": i}, [i])
+    assert j.fsyncs == 0 and j.latest is None
+    j.barrier()
+    assert records(j)[0]["fills"] == [0, 1, 2] and records(j)[0]["state"] == {"n": 2}
+    assert j.fsyncs == 1 and j.latest == {"n": 2}
+    j.barrier()  # nothing pending: no empty record
+    assert len(records(j)) == 1
+
+def test_group_mode_flushes_when_too_many_fills_wait(tmp_path):
+    j = journal(tmp_path, mode="group", window=60.0, max_pending=4)
+    j.commit({"n": 1}, [1, 2]); j.commit({"n": 2}, [3, 4])
+    assert j.fsyncs == 1 and records(j)[0]["fills"] == [1, 2, 3, 4]
+
+def test_async_mode_flushes_in_the_background_within_the_window(tmp_path):
+    j = journal(tmp_path, mode="async", window=0.02)
+    j.commit({"n": 1}, [1])
+    for _ in range(100):
+        if j.fsyncs: break
+        time.sleep(0.01)
+    assert journal(tmp_path).load() == {"n": 1}
+
+def test_checkpoint_truncates_and_load_replays_the_tail(tmp_path):
+    j = journal(tmp_path, mode="sync", checkpoint_bytes=1 << 20)
+    j.commit({"n": 1}); j.checkpoint()
+    assert j.path.read_bytes() == b"" and json.loads(j.snapshot_path.read_text()) == {"n": 1}
+    j.commit({"n": 2})
+    assert journal(tmp_path).load() == {"n": 2}
+
+def test_journal_checkpoints_itself_past_the_size_limit(tmp_path):
+    j = journal(tmp_path, mode="sync", checkpoint_bytes=200)
+    for i in range(20): j.commit({"n": i, "pad": "x" * 20})
+    assert j.checkpoints >= 1 and j.path.stat().st_size < 200
+    assert journal(tmp_path).load()["n"] == 19
+
+def test_torn_tail_from_a_crash_is_ignored(tmp_path):
+    j = journal(tmp_path, mode="sync")
+    atomic_write_json(j.snapshot_path, {"n": 0})
+    j.commit({"n": 1}); j.close()
+    with open(j.path, "ab") as f: f.write(b'{"ts": 1, "fills": [], "sta')
+    assert journal(tmp_path).load() == {"n": 1}
+    assert journal(tmp_path).state() == {"n": 1}
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        journal(tmp_path, mode="eventually")
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from AI.engine.backtest import run_backtest
+from AI.engine.exchange import SimExchange
+from AI.engine.trader import default_strats
+
+def walk(n=5000, seed=1):
+    rng = np.random.default_rng(seed)
+    return 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+
+@pytest.mark.parametrize("threshold", [0.1, 0.15, 0.3])
+def test_vectorized_and_replay_paths_agree(threshold):
+    p = walk()
+    a = run_backtest(p, threshold=threshold)
+    b = run_backtest(p, threshold=threshold, vectorized=False)
+    assert a.fills and a.fills == b.fills
+    assert np.array_equal(a.equity, b.equity)
+    assert a.halted_at == b.halted_at
+
+def test_threshold_changes_the_replay_decisions():
+    p = walk()
+    lo = run_backtest(p, threshold=0.1, vectorized=False)
+    hi = run_backtest(p, threshold=0.3, vectorized=False)
+    assert len(hi.fills) < len(lo.fills)
+
+def test_paths_agree_against_the_sim_exchange():
+    p = walk(3000, seed=7)
+    a = run_backtest(p, exchange=SimExchange(maker_bps=2, taker_bps=5, spread_bps=2))
+    b = run_backtest(p, exchange=SimExchange(maker_bps=2, taker_bps=5, spread_bps=2), vectorized=False)
+    assert a.fills == b.fills and np.array_equal(a.equity, b.equity)
+
+def test_stop_when_ends_the_run_early():
+    p = walk()
+    r = run_backtest(p, stop_when=lambda i, eq: i >= 1023, check_every=1024)
+    assert r.stopped_at == 1023 and len(r.equity) == 1024
+
+def test_strategies_without_scores_batch_fall_back_to_replay():
+    p = walk(2000)
+    strats = default_strats()
+    for s in strats: s.scores_batch = lambda prices: None
+    a = run_backtest(p, strats=strats)
+    b = run_backtest(p, vectorized=False)
+    assert a.fills == b.fills
+
+def test_backtests_leave_the_live_journal_alone():
+    from AI.engine.atomic import STATE_JOURNAL
+    run_backtest(walk(1000))
+    assert STATE_JOURNAL.commits == 0
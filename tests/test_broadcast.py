@@ -0,0 +1,67 @@
+import asyncio, json
+from AI.engine.broadcast import Hub
+
+class Sock:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay, self.fail = delay, fail
+        self.sent = []; self.closed = None; self.gate = asyncio.Event(); self.gate.set()
+    async def send_text(self, text):
+        await self.gate.wait()
+        if self.fail: raise ConnectionError("gone")
+        if self.delay: await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+    async def close(self, code=1000): self.closed = code
+
+async def settle(hub, n=50):
+    for _ in range(n):
+        if all(c.q.empty() for c in hub.clients.values()): break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+def test_every_client_gets_every_event_in_order():
+    async def main():
+        hub = Hub(); a, b = Sock(), Sock()
+        hub.add(a); hub.add(b)
+        for i in range(5): hub.publish("tick", {"i": i})
+        await settle(hub)
+        m = hub.metrics()
+        for ws in (a, b): hub.remove(ws)
+        return a, b, m
+    a, b, m = asyncio.run(main())
+    assert [e["payload"]["i"] for e in a.sent] == [0, 1, 2, 3, 4] and a.sent == b.sent
+    assert a.sent[0]["kind"] == "tick"
+    assert m["published"] == 5 and m["delivered"] == 10 and m["fanout_latency"]["count"] == 10
+
+def test_publish_without_clients_is_a_no_op():
+    hub = Hub(); hub.publish("tick", {})
+    assert hub.published == 0
+
+def test_slow_client_skips_oldest_frames_without_holding_up_the_others():
+    async def main():
+        hub = Hub(queue_size=2, max_lag=100); fast, slow = Sock(), Sock()
+        slow.gate.clear()  # stuck mid-send
+        hub.add(fast); hub.add(slow)
+        await asyncio.sleep(0)
+        for i in range(6):
+            hub.publish("tick", {"i": i}); await asyncio.sleep(0.01)
+        slow.gate.set(); await settle(hub)
+        for ws in (fast, slow): hub.remove(ws)
+        return fast, slow, hub
+    fast, slow, hub = asyncio.run(main())
+    assert [e["payload"]["i"] for e in fast.sent] == list(range(6))
+    assert [e["payload"]["i"] for e in slow.sent] == [0, 4, 5]  # the newest frames survive
+    assert hub.skipped == 3 and hub.dropped_clients == 0
+
+def test_lagging_failing_and_timed_out_clients_are_dropped():
+    async def main():
+        hub = Hub(queue_size=1, max_lag=2, send_timeout=0.05)
+        stuck, broken, slow = Sock(), Sock(fail=True), Sock(delay=1.0)
+        stuck.gate.clear()
+        for ws in (stuck, broken, slow): hub.add(ws)
+        await asyncio.sleep(0)
+        for i in range(5): hub.publish("tick", {"i": i})
+        await asyncio.sleep(0.2)
+        return hub, stuck, broken, slow
+    hub, stuck, broken, slow = asyncio.run(main())
+    assert len(hub) == 0 and hub.dropped_clients == 3
+    assert stuck.closed == broken.closed == slow.closed == 1013
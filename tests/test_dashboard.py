@@ -0,0 +1,47 @@
+import asyncio, json
+from engine.dashboard import DashboardFeed
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_nested_position_change_produces_a_delta(store, trades):
+    feed = DashboardFeed()
+    with store.mutate() as st: st["positions"] = {"BTCUSDT": {"qty": 1.0, "avg_price": 100.0}}
+    feed.panels.update(run(feed.collect(reset=True)))
+    assert run(feed.collect()) == {}  # nothing moved
+    with store.mutate() as st: st["positions"]["BTCUSDT"]["qty"] = 0.5  # balance untouched
+    delta = run(feed.collect())
+    assert delta["positions"]["positions"]["BTCUSDT"]["qty"] == 0.5
+    assert "risk" not in delta
+
+def test_panels_do_not_alias_live_state(store, trades):
+    feed = DashboardFeed()
+    with store.mutate() as st: st["positions"] = {"BTCUSDT": {"qty": 1.0, "avg_price": 100.0}}
+    feed.panels.update(run(feed.collect(reset=True)))
+    with store.mutate() as st: st["positions"]["BTCUSDT"]["qty"] = 2.0
+    assert feed.snapshot()["positions"]["positions"]["BTCUSDT"]["qty"] == 1.0
+
+def test_trades_are_appended_by_cursor(store, trades):
+    feed = DashboardFeed()
+    trades.append(symbol="BTCUSDT", side="BUY", price=100.0, qty=1.0)
+    first = run(feed.collect(reset=True))
+    assert [r["side"] for r in first["trades"]["append"]] == ["BUY"]
+    trades.append(symbol="BTCUSDT", side="SELL", price=110.0, qty=1.0)
+    delta = run(feed.collect())
+    assert [r["side"] for r in delta["trades"]["append"]] == ["SELL"]
+    assert delta["trades"]["cursor"] == delta["trades"]["append"][-1]["id"]
+    assert len(feed.trades) == 2
+
+def test_stream_sends_the_snapshot_then_deltas(store, trades):
+    async def main():
+        feed = DashboardFeed(interval=0.01)
+        gen = feed.stream()
+        snap = await gen.__anext__()
+        with store.mutate() as st: st["balance"] = 42.0
+        delta = await asyncio.wait_for(gen.__anext__(), 2.0)
+        await gen.aclose()
+        return snap, delta
+    snap, delta = run(main())
+    assert snap.startswith("event: snapshot\n")
+    ev, data = delta.split("\n")[:2]
+    assert ev == "event: delta" and json.loads(data[len("data: "):])["positions"]["balance"] == 42.0
@@ -0,0 +1,101 @@
+import asyncio, threading, time
+from types import SimpleNamespace
+import pytest
+from engine import dispatch
+from engine.dispatch import Dispatcher
+
+def plugin(name, fn, **attrs):
+    return SimpleNamespace(__name__=f"plugins.{name}", REGISTER_NAME=name, on_tick=fn, **attrs)
+
+@pytest.fixture
+def mods(monkeypatch, store):
+    loaded = []
+    monkeypatch.setattr(dispatch, "get_loaded_modules", lambda: loaded)
+    return loaded
+
+def tick(d, n=1):
+    return asyncio.run(d.dispatch({"tick": n, "price": 100.0, "ts": None}))
+
+def test_writes_are_merged_and_only_declared_containers_are_copied(mods, store):
+    seen = {}
+    def on_tick(state, ctx):
+        seen.update(state)
+        state["positions"]["BTCUSDT"] = {"qty": 1.0, "avg_price": 100.0}
+        state["counter"] = state.get("counter", 0) + 1
+        return {"signal": "BUY", "stake": 0.1}
+    mods.append(plugin("p", on_tick, TICK_INLINE=True, STATE_KEYS=("positions",)))
+    with store.mutate() as st: st["positions"] = {}; st["big"] = {"x": list(range(10))}
+    out = tick(Dispatcher())
+    assert out["merged"]["signal"] == "BUY"
+    assert "big" not in seen and "plugins" not in seen and seen["balance"] == 1000.0
+    live = store.read()
+    assert live["positions"]["BTCUSDT"]["qty"] == 1.0 and live["counter"] == 1
+    assert live["big"] == {"x": list(range(10))}
+
+def test_a_write_landing_mid_tick_is_not_clobbered(mods, store):
+    def on_tick(state, ctx):
+        with store.mutate() as st: st["positions"]["ETHUSDT"] = {"qty": 2.0}  # e.g. a fill
+        state["positions"]["BTCUSDT"]["qty"] = 5.0
+        return {}
+    mods.append(plugin("p", on_tick, TICK_INLINE=True, STATE_KEYS=("positions",)))
+    with store.mutate() as st: st["positions"] = {"BTCUSDT": {"qty": 1.0}}
+    tick(Dispatcher())
+    assert store.read()["positions"] == {"BTCUSDT": {"qty": 5.0}, "ETHUSDT": {"qty": 2.0}}
+
+def test_errors_lose_their_writes(mods, store):
+    def on_tick(state, ctx):
+        state["x"] = 1; raise RuntimeError("boom")
+    mods.append(plugin("p", on_tick))
+    d = Dispatcher()
+    out = tick(d)
+    assert out["results"]["p"] == {"error": "boom"} and "x" not in store.read()
+    assert d.stats()["plugins"]["p"]["errors"] == 1
+
+def test_timed_out_thread_is_dropped_and_skipped_until_it_finishes(mods, store):
+    release = threading.Event(); calls = []
+    def on_tick(state, ctx):
+        calls.append(ctx["tick"]); state["x"] = ctx["tick"]
+        if ctx["tick"] == 1: release.wait(5)
+        return {"signal": "SELL", "stake": 0.1}
+    mods.append(plugin("slow", on_tick, TICK_TIMEOUT_MS=50))
+    d = Dispatcher()
+    try:
+        out = tick(d, 1)
+        assert out["dropped"] == ["slow"] and "x" not in store.read()
+        tick(d, 2)
+        assert calls == [1]  # still running: skipped, never overlapped
+        release.set()
+        for _ in range(100):
+            if not d._slots[id(mods[0])].busy: break
+            time.sleep(0.01)
+        out = tick(d, 3)
+        assert calls == [1, 3] and out["results"]["slow"]["signal"] == "SELL" and store.read()["x"] == 3
+        st = d.stats()["plugins"]["slow"]
+        assert st["timeouts"] == 1 and st["skipped"] == 1
+    finally:
+        release.set(); d.close()
+
+def test_inline_overrun_is_counted_and_dropped(mods, store):
+    def on_tick(state, ctx):
+        time.sleep(0.03); state["x"] = 1; return {"signal": "BUY", "stake": 1.0}
+    mods.append(plugin("p", on_tick, TICK_INLINE=True, TICK_TIMEOUT_MS=10))
+    d = Dispatcher()
+    out = tick(d)
+    assert "p" not in out["results"] and "x" not in store.read()
+    assert d.stats()["plugins"]["p"]["timeouts"] == 1
+
+def test_async_plugin_times_out_and_concurrent_dispatches_do_not_overlap(mods, store):
+    running = []; peak = [0]
+    async def on_tick(state, ctx):
+        running.append(1); peak[0] = max(peak[0], len(running))
+        try: await asyncio.sleep(0.2 if ctx["tick"] == 1 else 0.0)
+        finally: running.pop()
+        return {"n": ctx["tick"]}
+    mods.append(plugin("a", on_tick, TICK_TIMEOUT_MS=100))
+    d = Dispatcher()
+    async def main():
+        return await asyncio.gather(d.dispatch({"tick": 1, "price": 1.0}), d.dispatch({"tick": 2, "price": 1.0}))
+    first, second = asyncio.run(main())
+    assert peak[0] == 1
+    assert first["dropped"] == ["a"] and second["dropped"] == ["a"]
+    assert d.stats()["plugins"]["a"]["skipped"] == 1 and d.stats()["plugins"]["a"]["timeouts"] == 1
@@ -0,0 +1,88 @@
+import pytest
+from engine.exchange import SimExchange, BUY, SELL
+
+def ex(**kw):
+    # 1 bps between levels, 2 bps spread, 1000 quote per level, 0.1% fees
+    e = SimExchange(maker_bps=10, taker_bps=10, spread_bps=2, level_bps=1, level_notional=1000, levels=5, **kw)
+    e.on_price("X", 100.0)
+    return e
+
+def test_market_buy_walks_the_ladder_and_pays_taker_fees():
+    e = ex()
+    o = e.submit("X", "BUY", 15.0)
+    assert o.status == "filled" and o.filled == pytest.approx(15.0)
+    fills = e.drain()
+    assert [f.price for f in fills] == pytest.approx([100.01, 100.02])
+    assert fills[0].qty == pytest.approx(10.0) and not fills[0].maker
+    assert o.fee == pytest.approx(o.notional * 0.001)
+    assert o.avg_price > 100.01
+
+def test_market_order_larger_than_the_ladder_partially_fills():
+    e = ex()
+    o = e.submit("X", SELL, 100.0)
+    assert o.status == "partial_expired"
+    assert o.filled == pytest.approx(50.0)  # 5 levels of 10 each
+    assert min(f.price for f in e.drain()) == pytest.approx(99.99 * 0.9996, rel=1e-4)
+
+def test_quote_sizing_includes_fees():
+    e = ex()
+    o = e.submit("X", BUY, 0, quote=500.0)
+    assert o.status == "filled"
+    assert o.notional + o.fee == pytest.approx(500.0)
+
+def test_ioc_stops_at_its_limit_and_never_rests():
+    e = ex()
+    o = e.submit("X", BUY, 25.0, 100.025, "ioc")
+    assert o.filled == pytest.approx(20.0) and o.status == "partial_expired"
+    assert not e.orders
+
+def test_limit_rests_then_fills_as_maker_when_market_trades_through():
+    e = ex()
+    o = e.submit("X", BUY, 2.0, 99.0, "limit")
+    assert o.status == "new" and e.depth("X")["bids"] == [(99.0, 2.0)]
+    assert e.on_price("X", 99.5) == []
+    assert e.on_price("X", 99.0) == []  # touching is not enough by default
+    (f,) = e.on_price("X", 98.9)
+    assert f.maker and f.price == 99.0 and f.fee == pytest.approx(2 * 99.0 * 0.001)
+    assert o.status == "filled" and not e.orders
+
+def test_price_time_priority_and_cancel():
+    e = ex()
+    a = e.submit("X", SELL, 1.0, 101.0, "limit", owner="a")
+    b = e.submit("X", SELL, 1.0, 101.0, "limit", owner="b")
+    c = e.submit("X", SELL, 1.0, 100.5, "limit", owner="c")
+    assert e.cancel(c.id) and not e.cancel(c.id)
+    fills = e.on_price("X", 101.5)
+    assert [f.owner for f in fills] == ["a", "b"]
+
+def test_self_trade_expires_the_resting_order_by_default():
+    e = ex()
+    rest = e.submit("X", SELL, 1.0, 100.005, "limit")
+    o = e.submit("X", BUY, 1.0)
+    assert rest.status == "expired_in_match" and not e.orders
+    assert o.status == "filled" and o.avg_price == pytest.approx(100.01)  # filled by the market instead
+    assert all(f.order_id == o.id for f in e.drain())
+
+def test_self_trade_expire_taker():
+    e = ex(stp="expire_taker")
+    rest = e.submit("X", SELL, 1.0, 100.005, "limit")
+    o = e.submit("X", BUY, 1.0, 100.1, "limit")
+    assert o.status == "expired_in_match" and o.filled == 0
+    assert rest.status == "new" and list(e.orders) == [rest.id]
+
+def test_self_trade_allowed_with_none():
+    e = ex(stp="none")
+    rest = e.submit("X", SELL, 1.0, 100.005, "limit")
+    e.submit("X", BUY, 1.0)
+    assert rest.status == "filled"
+
+def test_fill_buffer_is_bounded():
+    e = ex(fill_buffer=3)
+    for _ in range(10): e.submit("X", BUY, 1.0)
+    assert len(e.fills) == 3 and len(e.drain()) == 3 and not e.fills
+
+def test_rejects_bad_orders():
+    e = ex()
+    assert e.submit("X", BUY, 0.0).status == "rejected"
+    with pytest.raises(ValueError): e.submit("X", BUY, 1.0, kind="limit")
+    with pytest.raises(ValueError): SimExchange(stp="sometimes")
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from engine.indicators import (EMA, RSI, Rolling, Momentum, ema, rsi, ema_batch, rsi_batch,
+                               rolling_mean_batch, rolling_std_batch, momentum_slope_batch)
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(0)
+    x = 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, 20_000)))
+    x[5000:5100] = x[5000]  # a flat stretch: zero variance
+    return x
+
+def stream(obj_update, x):
+    return np.array([np.nan if (v := obj_update(p)) is None else v for p in x.tolist()])
+
+@pytest.mark.parametrize("period", [2, 8, 26, 200])
+def test_ema_batch_matches_streaming(prices, period):
+    s = stream(EMA(period).update, prices)
+    np.testing.assert_allclose(ema_batch(prices, period), s, rtol=1e-13, atol=0)
+    prev = None; f = []
+    for p in prices[:500].tolist(): prev = ema(prev, p, period); f.append(prev)
+    assert s[:500].tolist() == f  # the object and the function are the same arithmetic
+
+@pytest.mark.parametrize("period", [7, 14, 21])
+def test_rsi_batch_matches_streaming(prices, period):
+    s = stream(RSI(period).update, prices)
+    b = rsi_batch(prices, period)
+    np.testing.assert_allclose(b, s, rtol=0, atol=1e-11)
+    st = {}; f = [rsi(st, p, period) for p in prices[:500].tolist()]
+    assert s[:500].tolist() == f
+    assert b[0] == 50.0
+    up = np.arange(1.0, 50.0)  # no losses at all
+    assert (rsi_batch(up, period)[1:] == 100.0).all() and stream(RSI(period).update, up)[-1] == 100.0
+
+@pytest.mark.parametrize("n", [1, 10, 50, 3000])
+def test_rolling_batch_matches_streaming(prices, n):
+    r = Rolling(n); mean, std = [], []
+    for p in prices.tolist():
+        r.push(p); mean.append(r.mean()); std.append(r.std())
+    np.testing.assert_allclose(rolling_mean_batch(prices, n), mean, rtol=1e-13, atol=0)
+    scale = float(prices.max()) ** 2
+    np.testing.assert_allclose(rolling_std_batch(prices, n) ** 2, np.square(std), rtol=0, atol=1e-12 * scale)
+
+@pytest.mark.parametrize("window", [2, 12, 100])
+def test_momentum_batch_is_exact(prices, window):
+    s = stream(Momentum(window).update, prices)
+    b = momentum_slope_batch(prices, window)
+    assert np.array_equal(b, s, equal_nan=True)
+
+def test_short_and_empty_inputs():
+    assert len(ema_batch([], 5)) == 0 and ema_batch([3.0], 5).tolist() == [3.0]
+    assert rsi_batch([1.0], 14).tolist() == [50.0]
+    assert np.isnan(momentum_slope_batch([1.0, 2.0], 5)).all()
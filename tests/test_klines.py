@@ -0,0 +1,102 @@
+import asyncio
+import numpy as np
+import pytest
+from engine.klines import KlineCache, EMPTY
+from engine.marketdata import MarketData
+
+T0 = 1_704_067_200_000  # 2024-01-01T00:00Z
+M = 60_000
+HOLE = (T0 + 100 * M, T0 + 149 * M)  # the exchange has no candles here
+
+def row(t): return [t, "1", "2", "0.5", str(t // M % 100_000), "3", t + M - 1]
+
+def klines(q):
+    s, e, lim = int(q["startTime"]), int(q["endTime"]), int(q["limit"])
+    return [row(t) for t in range(s, e + 1, M) if not HOLE[0] <= t <= HOLE[1]][:lim]
+
+@pytest.fixture
+def md(standin):
+    standin.routes["/api/v3/klines"] = klines
+    m = MarketData(base=standin.url)
+    yield m
+    m.close()
+
+def test_backfill_pages_and_stores_every_candle(tmp_path, md, standin):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    end = T0 + 2499 * M
+    res = asyncio.run(kc.backfill(T0, end, concurrency=2, limit=1000, md=md))
+    assert res["pages"] == 3 and res["errors"] == 0 and res["gaps"] == []
+    assert [int(q["startTime"]) for _, q in sorted(standin.requests, key=lambda r: int(r[1]["startTime"]))] == \
+        [T0, T0 + 1000 * M, T0 + 2000 * M]
+    assert res["rows"] == 2500 - 50
+    c = kc.closes(T0, end)
+    assert len(c) == 2450 and c[0] == T0 // M % 100_000
+    d = kc.read(*HOLE)
+    assert (d["t"] == EMPTY).all()
+
+def test_confirmed_empty_ranges_are_not_fetched_again(tmp_path, md, standin):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    asyncio.run(kc.backfill(T0, T0 + 299 * M, md=md))
+    n = len(standin.requests)
+    again = KlineCache("BTCUSDT", "1m", root=tmp_path)  # reopened from meta.json
+    res = asyncio.run(again.backfill(T0, T0 + 299 * M, md=md))
+    assert res["pages"] == 0 and len(standin.requests) == n
+
+def test_gaps_inside_before_and_after_the_stored_span(tmp_path):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    kc.write([row(T0 + i * M) for i in range(10) if i not in (3, 4, 7)])
+    assert kc.span() == (T0, T0 + 9 * M)
+    assert kc.gaps(T0 - 2 * M, T0 + 11 * M) == [
+        (T0 - 2 * M, T0 - M), (T0 + 3 * M, T0 + 4 * M), (T0 + 7 * M, T0 + 7 * M), (T0 + 10 * M, T0 + 11 * M)]
+    assert kc.gaps(T0, T0 + 2 * M) == []
+
+def test_short_page_confirms_only_fully_requested_slots(tmp_path):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    kc.write([row(T0), row(T0 + 2 * M)], confirm=(T0, T0 + 3 * M))
+    assert kc.gaps(T0, T0 + 5 * M) == [(T0 + 4 * M, T0 + 5 * M)]
+    assert list(kc.read(T0, T0 + 3 * M)["t"]) == [T0, EMPTY, T0 + 2 * M, EMPTY]
+
+def test_earlier_history_is_prepended_and_slots_remapped(tmp_path):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    kc.write([row(T0 + i * M) for i in range(100, 110)], confirm=(T0 + 100 * M, T0 + 111 * M))
+    kc.flush()
+    kc.write([row(T0 + i * M) for i in range(0, 5)])
+    kc.flush()
+    assert kc.base == T0 and kc.span() == (T0, T0 + 111 * M)
+    re = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    t = re.read()["t"]
+    assert list(t[:5]) == [T0 + i * M for i in range(5)]
+    assert (t[5:100] == 0).all()
+    assert list(t[100:110]) == [T0 + i * M for i in range(100, 110)]
+    assert list(t[110:112]) == [EMPTY, EMPTY]  # the confirmation moved with its slots
+    np.testing.assert_array_equal(re.closes(T0 + 100 * M, T0 + 109 * M), [(T0 // M + i) % 100_000 for i in range(100, 110)])
+    assert re.gaps(T0, T0 + 111 * M) == [(T0 + 5 * M, T0 + 99 * M)]
+
+def test_open_candles_are_not_stored(tmp_path):
+    import time
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    now = int(time.time() * 1000) // M * M
+    assert kc.write([row(now)]) == 0 and kc.span() is None
+
+def test_last_counts_back_from_the_newest_candle(tmp_path):
+    kc = KlineCache("BTCUSDT", "1m", root=tmp_path)
+    kc.write([row(T0 + i * M) for i in range(10) if i != 7])
+    c = lambda *i: [(T0 // M + j) % 100_000 for j in i]
+    assert len(kc.last(0)) == 0 and len(kc.last(-3)) == 0
+    assert kc.last(3).tolist() == c(8, 9)  # slot 7 is a hole
+    assert kc.last(4, every=2).tolist() == c(3, 5, 9)
+    assert kc.last(100).tolist() == c(0, 1, 2, 3, 4, 5, 6, 8, 9)
+
+def test_trader_warms_up_at_the_trading_interval(tmp_path, monkeypatch):
+    from AI.engine import trader
+    S = 1000
+    kc = KlineCache("BTCUSDT", "1s", root=tmp_path)
+    kc.write([[T0 + i * S, "1", "1", "1", str(i), "1", T0 + i * S + S - 1] for i in range(100)])
+    kc.flush()
+    monkeypatch.setattr(trader, "FEED_KLINE_INTERVAL", "1s")
+    monkeypatch.setattr(trader, "KlineCache", lambda sym, iv: KlineCache(sym, iv, root=tmp_path))
+    seen = []
+    class Probe:
+        def score(self, p): seen.append(p); return 0.0, 0.0
+    trader.Trader({"BTCUSDT": [Probe()]}).warm_up(every=5.0, n=4)
+    assert seen == [84.0, 89.0, 94.0, 99.0]
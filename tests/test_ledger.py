@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+import pytest
+from AI.engine.ledger import Ledger
+from AI.engine.types import Position
+from AI.engine.backtest import BacktestTrader
+from AI.engine.settings import SL_PCT, TP_PCT
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def lot(qty=2.0, entry=100.0, symbol="X"):
+    return Position(symbol=symbol, qty=qty, entry=entry, stake=qty * entry, ts=T0)
+
+def test_partial_close_keeps_the_rest_of_the_lot_with_its_share_of_the_stake():
+    led = Ledger(); p = lot()
+    led.open(p)
+    assert led.close(p, 0.5, 110.0) == 0.5
+    assert p.qty == pytest.approx(1.5) and p.stake == pytest.approx(150.0)
+    assert led.qty["X"] == pytest.approx(1.5) and led.cost["X"] == pytest.approx(150.0)
+    assert led.realized["X"] == pytest.approx(5.0)
+    assert len(led) == 1 and led.first("X") is p
+
+def test_closing_the_rest_removes_the_lot_and_zeroes_the_aggregates():
+    led = Ledger(); p = lot()
+    led.open(p)
+    led.close(p, 0.5, 110.0)
+    assert led.close(p, 10.0, 90.0, fee=1.0) == pytest.approx(1.5)  # capped at what is left
+    assert len(led) == 0 and led.first("X") is None
+    assert led.qty["X"] == 0.0 and led.cost["X"] == 0.0
+    assert led.realized_total == pytest.approx(5.0 - 15.0 - 1.0)
+
+def test_close_a_lot_other_than_the_oldest():
+    led = Ledger(); a, b = lot(entry=100.0), lot(entry=120.0)
+    led.open(a); led.open(b)
+    led.close(b, b.qty, 130.0)
+    assert led.positions() == [a]
+    assert led.cost["X"] == pytest.approx(200.0)
+
+def test_exposure_uses_marks_and_falls_back_to_cost():
+    led = Ledger([lot(symbol="X"), lot(qty=1.0, entry=50.0, symbol="Y")])
+    assert led.exposure({"X": 110.0}) == pytest.approx(2 * 110.0 + 50.0)
+    assert led.unrealized({"X": 110.0}) == pytest.approx(20.0)
+
+def test_partial_close_leaves_stop_and_take_profit_levels_in_place():
+    t = BacktestTrader([], ["X"])
+    t.apply_fill("BUY", 2.0, 100.0, 200.0, "open", "X")
+    p = t.ledger.first("X")
+    _, sl, tp = t._protect[id(p)]
+    levels = (t.triggers.level(sl), t.triggers.level(tp))
+    assert levels == pytest.approx((100.0 - SL_PCT * 100.0, 100.0 + TP_PCT * 100.0))
+    t.apply_fill("SELL", 1.0, 100.0, p.stake, "half", "X", lot=p)
+    _, sl, tp = t._protect[id(p)]
+    assert (t.triggers.level(sl), t.triggers.level(tp)) == pytest.approx(levels)
+    assert t.close_signals("X", levels[0]) == [p]
@@ -0,0 +1,88 @@
+import asyncio, threading
+import httpx
+import pytest
+from engine.marketdata import MarketData
+
+def price(q): return {"symbol": q["symbol"], "price": "123.45"}
+
+def test_sync_requests_reuse_one_pooled_connection(standin):
+    standin.routes["/api/v3/ticker/price"] = price
+    md = MarketData(base=standin.url)
+    try:
+        for _ in range(5):
+            assert md.get_json("/api/v3/ticker/price", {"symbol": "BTCUSDT"})["price"] == "123.45"
+    finally:
+        md.close()
+    assert len(standin.requests) == 5 and len(standin.ports) == 1
+
+def test_async_requests_reuse_the_pool_and_close_cleanly(standin):
+    standin.routes["/api/v3/ticker/price"] = price
+    md = MarketData(base=standin.url, max_connections=2, max_keepalive=2)
+    async def run():
+        for _ in range(3):
+            await asyncio.gather(*(md.aget_json("/api/v3/ticker/price", {"symbol": "ETHUSDT"}) for _ in range(2)))
+        client = md.aclient()
+        await md.aclose()
+        return client
+    client = asyncio.run(run())
+    assert len(standin.requests) == 6 and len(standin.ports) <= 2
+    assert client.is_closed and md._aclient is None
+
+def test_read_timeout_raises_and_is_counted(standin):
+    standin.routes["/slow"] = lambda q: (200, {}, 0.5)
+    md = MarketData(base=standin.url, timeout=0.1, connect_timeout=0.1)
+    try:
+        with pytest.raises(httpx.ReadTimeout):
+            md.get_json("/slow")
+    finally:
+        md.close()
+    snap = md.latency()["endpoints"]["/slow"]
+    assert snap["count"] == 1 and snap["errors"] == 1
+    assert 90 <= snap["max_ms"] < 450
+
+def test_latency_stats_and_http_errors(standin):
+    standin.routes["/api/v3/ticker/price"] = price
+    md = MarketData(base=standin.url)
+    try:
+        for _ in range(10): md.get_json("/api/v3/ticker/price", {"symbol": "BTCUSDT"})
+        with pytest.raises(httpx.HTTPStatusError):
+            md.get_json("/missing")
+    finally:
+        md.close()
+    lat = md.latency()
+    assert lat["base"] == standin.url
+    ok = lat["endpoints"]["/api/v3/ticker/price"]
+    assert ok["count"] == 10 and ok["errors"] == 0
+    assert 0 < ok["min_ms"] <= ok["p50_ms"] <= ok["p99_ms"] <= ok["max_ms"]
+    assert lat["endpoints"]["/missing"]["errors"] == 1
+
+def test_client_is_closed_when_its_loop_shuts_down(standin):
+    standin.routes["/api/v3/ticker/price"] = price
+    md = MarketData(base=standin.url)
+    async def run():
+        await md.aget_json("/api/v3/ticker/price", {"symbol": "BTCUSDT"})
+        return md.aclient()
+    first = asyncio.run(run())
+    assert first.is_closed  # closed by asyncio.run() before the loop went away
+    second = asyncio.run(run())
+    assert second is not first and second.is_closed and len(standin.requests) == 2
+
+def test_client_of_a_loop_still_running_is_closed_there(standin):
+    standin.routes["/api/v3/ticker/price"] = price
+    md = MarketData(base=standin.url)
+    other = asyncio.new_event_loop()
+    t = threading.Thread(target=other.run_forever, daemon=True); t.start()
+    try:
+        async def get(): await md.aget_json("/api/v3/ticker/price", {"symbol": "BTCUSDT"}); return md.aclient()
+        old = asyncio.run_coroutine_threadsafe(get(), other).result(5)
+        async def switch():
+            new = md.aclient()
+            for _ in range(100):
+                if old.is_closed: break
+                await asyncio.sleep(0.01)
+            await md.aclose()
+            return new
+        new = asyncio.run(switch())
+        assert old.is_closed and new is not old and new.is_closed
+    finally:
+        other.call_soon_threadsafe(other.stop); t.join(5); other.close()
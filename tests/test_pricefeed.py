@@ -0,0 +1,118 @@
+import asyncio, json
+import pytest
+from engine import pricefeed
+from engine.marketdata import MarketData
+from engine.pricefeed import KlineStream
+
+websockets = pytest.importorskip("websockets")
+
+def kline(t, close, final=True, symbol="BTCUSDT"):
+    # combined-stream envelope, as /stream?streams=... sends it
+    return json.dumps({"stream": f"{symbol.lower()}@kline_1s",
+                       "data": {"e": "kline", "E": t + 500, "s": symbol,
+                                "k": {"t": t, "T": t + 999, "s": symbol, "c": str(close), "x": final}}})
+
+def rest_klines(q):
+    s, e = int(q["startTime"]), int(q["endTime"])
+    return [[t, "1", "1", "1", str(1000 + t // 1000), "1", t + 999] for t in range(s, e + 1, 1000)][:int(q["limit"])]
+
+@pytest.fixture
+def rest(standin, monkeypatch):
+    standin.routes["/api/v3/klines"] = rest_klines
+    standin.routes["/api/v3/ticker/price"] = lambda q: {"symbol": q["symbol"], "price": "42.0"}
+    md = MarketData(base=standin.url)
+    monkeypatch.setattr(pricefeed, "MD", md)
+    yield standin
+    md.close()
+
+def run(script, n, drop_first=False, **kw):
+    """Serve `script(conn_no)` (a list of messages per connection) and collect n bars."""
+    async def main():
+        conns = [0]
+        async def handler(ws, path=None):
+            conns[0] += 1
+            for m in script(conns[0]): await ws.send(m)
+            if conns[0] > 1 or not drop_first: await ws.wait_closed()
+        async with websockets.serve(handler, "127.0.0.1", 0) as srv:
+            port = srv.sockets[0].getsockname()[1]
+            ks = KlineStream("BTCUSDT", "1s", base=f"ws://127.0.0.1:{port}", **kw)
+            out = []
+            async for bar in ks:
+                out.append(bar)
+                if len(out) == n: break
+            return out, ks.stats
+    return asyncio.run(asyncio.wait_for(main(), 10))
+
+def test_only_closed_klines_by_default():
+    msgs = [kline(0, 100, False), kline(0, 101), kline(1000, 102, False), kline(1000, 103)]
+    bars, stats = run(lambda c: msgs, 2)
+    assert [b.price for b in bars] == [101, 103]
+    assert bars[0].ts.timestamp() == pytest.approx(0.999)  # close time of the kline
+    assert stats["received"] == 4
+
+def test_partial_updates_are_opt_in():
+    msgs = [kline(0, 100, False), kline(0, 101)]
+    bars, _ = run(lambda c: msgs, 2, partial=True)
+    assert [b.price for b in bars] == [100, 101]
+
+def test_gap_is_backfilled_over_rest(rest):
+    msgs = [kline(0, 1000), kline(1000, 1001), kline(4000, 1004)]
+    bars, stats = run(lambda c: msgs, 5)
+    assert [b.price for b in bars] == [1000, 1001, 1002, 1003, 1004]
+    assert stats["gaps"] == 1 and stats["backfilled"] == 2
+    assert rest.requests[0][1]["startTime"] == "2000" and rest.requests[0][1]["endTime"] == "3999"
+
+def test_reconnect_skips_replayed_klines(rest):
+    first = [kline(0, 1000), kline(1000, 1001)]
+    again = [kline(1000, 1001), kline(2000, 1002)]  # the server replays the last kline after reconnecting
+    bars, stats = run(lambda c: first if c == 1 else again, 3, drop_first=True)
+    assert [b.price for b in bars] == [1000, 1001, 1002]
+    assert stats["reconnects"] == 1
+
+def test_falls_back_to_polling_when_the_socket_is_unreachable(rest):
+    async def main():
+        ks = KlineStream("BTCUSDT", "1s", base="ws://127.0.0.1:9", retries=2, max_backoff=0.1)
+        async for bar in ks:
+            return bar, ks.stats
+    bar, stats = asyncio.run(asyncio.wait_for(main(), 10))
+    assert bar.price == 42.0 and stats["polling"] == 1 and stats["received"] == 0
+
+def test_poll_fallback_seeds_from_cache_and_skips_unknown(monkeypatch):
+    async def down(symbols): raise OSError("unreachable")
+    monkeypatch.setattr(pricefeed, "fetch_binance_prices", down)
+    monkeypatch.setattr(pricefeed, "_cached_price", {"BTCUSDT": 64000.0}.get)
+    async def main():
+        out = []
+        async for bar in pricefeed.stream_prices(["BTCUSDT", "NEWUSDT"], 0.01):
+            out.append(bar)
+            if len(out) == 3: return out
+    bars = asyncio.run(main())
+    assert {b.symbol for b in bars} == {"BTCUSDT"}
+    assert all(abs(b.price / 64000.0 - 1) < 0.01 for b in bars)
+
+def test_long_gap_is_paged_in_1000_kline_requests(rest):
+    msgs = [kline(0, 1000), kline(2500_000, 3500)]
+    bars, stats = run(lambda c: msgs, 2501, maxsize=5000)
+    assert [b.price for b in bars] == [1000 + i for i in range(2501)]
+    assert stats["backfilled"] == 2499
+    pages = [(int(q["startTime"]), int(q["limit"])) for p, q in rest.requests if p == "/api/v3/klines"]
+    assert pages == [(1000, 1000), (1001_000, 1000), (2001_000, 499)]
+
+def test_socket_is_retried_while_polling_and_takes_over(rest):
+    async def main():
+        polled = asyncio.Event()
+        async def handler(ws, path=None):
+            if not polled.is_set(): return  # close without a message: counts as a failed connect
+            for m in [kline(0, 1000), kline(1000, 1001)]: await ws.send(m)
+            await ws.wait_closed()
+        async with websockets.serve(handler, "127.0.0.1", 0) as srv:
+            port = srv.sockets[0].getsockname()[1]
+            ks = KlineStream("BTCUSDT", "1s", base=f"ws://127.0.0.1:{port}", retries=2, max_backoff=0.05, probe=0.05, max_probe=0.1)
+            out = []; polling = []
+            async for bar in ks:
+                out.append(bar.price); polling.append(ks.stats["polling"]); polled.set()
+                if bar.price == 1001: return out, polling, ks.stats
+    out, polling, stats = asyncio.run(asyncio.wait_for(main(), 10))
+    assert out[0] == 42.0 and polling[0] == 1
+    assert out[-2:] == [1000, 1001] and polling[-1] == 0
+    assert stats["gaps"] == 0
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from engine import risk
+from engine.risk import RiskEngine, _running_by
+from engine.state import load_state
+
+@pytest.fixture
+def eng(store):
+    with store.mutate() as st:
+        st.update(balance=1000.0, positions={"BTCUSDT": {"qty": 1.0, "avg_price": 100.0}})
+    return RiskEngine(store)
+
+def test_a_copy_of_the_state_does_not_reset_the_engine(eng, store):
+    with store.mutate() as st: assert eng.on_tick(st, {"BTCUSDT": 120.0})
+    assert eng.peak == pytest.approx(1020.0)
+    snap = load_state()
+    eng.check(snap, "BUY", 0.01, 120.0)
+    assert eng.peak == pytest.approx(1020.0) and eng.mark[eng.index["BTCUSDT"]] == 120.0
+
+def test_positions_written_elsewhere_are_picked_up(eng, store):
+    with store.mutate() as st: eng.on_tick(st, {"BTCUSDT": 100.0})
+    with store.mutate() as st:  # e.g. a dispatcher merge: no on_position() call
+        st["positions"]["ETHUSDT"] = {"qty": 2.0, "avg_price": 50.0}
+        st["positions"]["BTCUSDT"]["qty"] = 3.0
+    with store.view() as st: eng.sync(st)
+    assert eng.qty[eng.index["BTCUSDT"]] == 3.0 and eng.qty[eng.index["ETHUSDT"]] == 2.0
+    assert eng.exposure == pytest.approx(3 * 100.0 + 2 * 50.0)
+    with store.mutate() as st: del st["positions"]["ETHUSDT"]
+    with store.view() as st: eng.sync(st)
+    assert eng.qty[eng.index["ETHUSDT"]] == 0.0
+
+def test_replace_starts_over(eng, store):
+    with store.mutate() as st: eng.on_tick(st, {"BTCUSDT": 150.0})
+    store.replace({"balance": 10.0, "positions": {}})
+    with store.view() as st: eng.sync(st)
+    assert eng.peak == 0.0 and not eng.index
+
+def test_kill_switch_latches_and_reset_rebases(eng, store):
+    with store.mutate() as st:
+        eng.pin(st)
+        assert not eng.on_tick(st, {"BTCUSDT": 100.0 - 200.0})  # equity 800 < 850
+        assert st["halted"]["reason"] == "max_drawdown_reached"
+        assert eng.check(st, "SELL", 1.0, -100.0) == (False, "kill_switch")
+    with store.mutate() as st:
+        assert eng.on_tick(st, {"BTCUSDT": 100.0}) is False  # latched even after recovery
+        eng.reset(st)
+        assert "halted" not in st and st["initial_balance"] == pytest.approx(1000.0)
+        assert eng.on_tick(st, {"BTCUSDT": 100.0})
+
+def test_single_check_limits(eng, store):
+    with store.view() as st:
+        assert eng.check(st, "BUY", 0.05, 100.0) == (True, "ok")
+        assert eng.check(st, "SELL", 1.0, 100.0) == (True, "ok")
+    with store.mutate() as st: st["risk"] = {**risk.DEFAULTS, "min_cash_reserve_pct": 95.0}
+    with store.view() as st: assert eng.check(st, "BUY", 0.1, 100.0) == (False, "min_cash_reserve")
+    with store.mutate() as st: st["risk"] = {**risk.DEFAULTS, "max_symbol_pct": 10.0}
+    with store.view() as st: assert eng.check(st, "BUY", 0.01, 100.0) == (False, "max_symbol_exposure")
+
+def test_batch_symbol_cap_counts_earlier_orders_for_the_same_symbol(eng, store):
+    with store.mutate() as st:
+        st["risk"] = {**risk.DEFAULTS, "max_symbol_pct": 20.0, "min_cash_reserve_pct": 0.0}
+        st["positions"] = {}
+    orders = [{"symbol": "ETHUSDT", "side": "BUY", "fraction": 0.1, "price": 10.0}] * 3 + \
+             [{"symbol": "SOLUSDT", "side": "BUY", "fraction": 0.1, "price": 10.0}]
+    with store.view() as st:
+        ok, why = risk.enforce_pre_trade_batch(st, orders)
+        assert ok.tolist() == [True, True, False, True] and why[2] == "max_symbol_exposure"
+        ok, _ = risk.enforce_pre_trade_batch(st, orders, cumulative=False)
+        assert ok.all()
+
+def test_batch_matches_single_checks_for_distinct_symbols(eng, store):
+    syms = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    with store.view() as st:
+        ok, why = eng.check_batch(st, syms, ["BUY", "SELL", "BUY"], [0.05, 1.0, 0.05], [100.0, 10.0, 5.0], cumulative=False)
+        assert [(bool(o), w) for o, w in zip(ok, why)] == \
+               [eng.check(st, sd, f, p, s) for s, sd, f, p in zip(syms, ["BUY", "SELL", "BUY"], [0.05, 1.0, 0.05], [100.0, 10.0, 5.0])]
+
+def test_running_sum_per_key():
+    keys = np.array([2, 1, 2, 3, 1, 2]); v = np.array([1.0, 10.0, 2.0, 5.0, 20.0, 4.0])
+    assert _running_by(keys, v).tolist() == [1.0, 10.0, 3.0, 5.0, 30.0, 7.0]
+
+def test_auto_actions_flag_stop_loss_and_take_profit(eng, store):
+    with store.mutate() as st: st["positions"]["ETHUSDT"] = {"qty": 1.0, "avg_price": 10.0}
+    with store.view() as st:
+        acts = eng.auto_actions(st, {"BTCUSDT": 70.0, "ETHUSDT": 14.0})
+    assert {(a["symbol"], a["reason"]) for a in acts} == {("BTCUSDT", "SL"), ("ETHUSDT", "TP")}
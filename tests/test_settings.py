@@ -0,0 +1,16 @@
+import os, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def symbols(**env):
+    e = {k: v for k, v in os.environ.items() if not k.startswith("AURORA_SYMBOL")}
+    out = subprocess.run([sys.executable, "-c", "from engine import settings as s; print(s.SYMBOL, ','.join(s.SYMBOLS))"],
+                         cwd=ROOT, env={**e, **env}, capture_output=True, text=True, check=True).stdout.split()
+    return out[0], out[1].split(",")
+
+def test_default_symbol_follows_the_configured_universe():
+    assert symbols() == ("BTCUSDT", ["BTCUSDT"])
+    assert symbols(AURORA_SYMBOLS="ethusdt, SOLUSDT") == ("ETHUSDT", ["ETHUSDT", "SOLUSDT"])
+    assert symbols(AURORA_SYMBOL="SOLUSDT") == ("SOLUSDT", ["SOLUSDT"])
+    assert symbols(AURORA_SYMBOLS="ETHUSDT,SOLUSDT", AURORA_SYMBOL="solusdt") == ("SOLUSDT", ["ETHUSDT", "SOLUSDT"])
@@ -0,0 +1,55 @@
+import json, threading
+from engine import loader, plugin_cfg
+from engine.state import StateStore, load_state, namespace, diff, merge
+
+def test_snapshot_is_shared_until_the_next_mutation(store):
+    a = load_state()
+    assert load_state() is a  # no copy per read
+    with store.mutate() as st: st["balance"] = 5.0
+    b = load_state()
+    assert b is not a and b["balance"] == 5.0 and a["balance"] == 1000.0
+    b["balance"] = 0.0
+    assert store.read()["balance"] == 5.0  # never the live dict
+
+def test_mutations_are_persisted_in_the_background(tmp_path):
+    s = StateStore(tmp_path/"state.json", flush_interval=0.0)
+    with s.mutate() as st: st["balance"] = 7.0
+    s.flush()
+    assert json.loads((tmp_path/"state.json").read_text())["balance"] == 7.0
+    assert StateStore(tmp_path/"state.json").read()["balance"] == 7.0
+    assert s.version == 1
+
+def test_concurrent_writers_do_not_lose_updates(store):
+    def bump():
+        for _ in range(500):
+            with store.mutate() as st: st["n"] = st.get("n", 0) + 1
+    ts = [threading.Thread(target=bump) for _ in range(4)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    assert store.read()["n"] == 2000
+
+def test_namespace_diff_merge_round_trip():
+    live = {"balance": 1.0, "positions": {"X": {"qty": 1.0}}, "other": {"big": [1, 2]}}
+    before, mine = namespace(live, ("positions",)), namespace(live, ("positions",))
+    assert "other" not in mine and mine["positions"] is not live["positions"]
+    mine["positions"]["X"]["qty"] = 2.0; mine["seen"] = 1; del mine["balance"]
+    merge(live, diff(before, mine))
+    assert live == {"positions": {"X": {"qty": 2.0}}, "other": {"big": [1, 2]}, "seen": 1}
+
+def test_plugin_caps_are_returned_as_copies(store):
+    caps = plugin_cfg.set_cap("p", 25.0)
+    caps["p"] = 99.0
+    plugin_cfg.get_caps()["p"] = 99.0
+    assert plugin_cfg.resolve_cap("p") == 25.0 and plugin_cfg.resolve_cap("q") == plugin_cfg.DEFAULT_CAP
+
+def test_load_plugins_merges_on_load_writes_and_skips_broken_files(store, tmp_path, monkeypatch):
+    (tmp_path/"good.py").write_text(
+        "REGISTER_NAME = 'good'\nSTATE_KEYS = ('cfg',)\n"
+        "def on_load(state):\n    state['cfg']['k'] = 1; state['seen'] = True\n    return {'status': 'loaded'}\n")
+    (tmp_path/"bad.py").write_text("from ..nowhere import x\n")
+    monkeypatch.setattr(loader, "PLUGINS_DIR", tmp_path)
+    with store.mutate() as st: st["cfg"] = {"keep": 0}
+    assert loader.load_plugins() == ["good"]
+    st = store.read()
+    assert st["cfg"] == {"keep": 0, "k": 1} and st["seen"] is True
+    assert st["plugin_init"]["good"] == {"status": "loaded"} and "error" in st["plugin_init"]["bad"]
@@ -0,0 +1,69 @@
+import threading
+from engine import logview
+from engine.tradestore import TradeStore, migrate
+
+T0 = 1_700_000_000.0
+
+def fill(st, n, t0=T0):
+    for i in range(n):
+        st.append(ts=t0 + i, symbol=("BTCUSDT", "ETHUSDT")[i % 2], plugin=("ema", "rsi", "ai")[i % 3],
+                  side="BUY" if i % 2 else "SELL", price=100.0 + i, qty=0.01, note=str(i))
+
+def test_appends_are_readable_at_once_and_in_order(trades):
+    fill(trades, 10)
+    rows = trades.last(4)  # flushes what the writer thread has not committed yet
+    assert [r["note"] for r in rows] == ["6", "7", "8", "9"]
+    assert rows[0]["ts"] == "2023-11-14T22:13:26Z" and trades.count() == 10
+
+def test_concurrent_appends_are_all_committed(tmp_path):
+    st = TradeStore(tmp_path/"t.db", batch=50, flush_interval=0.0)
+    def writer(k):
+        for i in range(200): st.append(ts=T0 + i, symbol="X", side="BUY", price=1.0, qty=1.0, plugin=f"p{k}")
+    ts = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    try:
+        assert st.count() == 800
+        assert all(len(st.by_plugin(f"p{k}", 1000)) == 200 for k in range(4))
+    finally:
+        st.close()
+    assert TradeStore(tmp_path/"t.db").count() == 800  # durable across reopen
+
+def test_indexed_reads(trades):
+    fill(trades, 30)
+    assert [r["note"] for r in trades.by_plugin("ai", 3)] == ["23", "26", "29"]
+    assert {r["symbol"] for r in trades.by_symbol("ETHUSDT", 100)} == {"ETHUSDT"} and len(trades.by_symbol("ETHUSDT", 100)) == 15
+    assert [r["note"] for r in trades.between(T0 + 5, T0 + 8)] == ["5", "6", "7"]
+
+def test_cursor_pages_through_new_rows_only(trades):
+    fill(trades, 5)
+    page = logview.trades_page(3)
+    assert [r["note"] for r in page["trades"]] == ["2", "3", "4"] and page["cursor"] == 5
+    again = logview.trades_page(3, after=page["cursor"])
+    assert again == {"trades": [], "cursor": 5}  # nothing new: same cursor back
+    fill(trades, 4, t0=T0 + 100)
+    seen = []; cur = page["cursor"]
+    while True:
+        p = logview.trades_page(3, after=cur)
+        if not p["trades"]: break
+        seen += [r["id"] for r in p["trades"]]; cur = p["cursor"]
+    assert seen == [6, 7, 8, 9] and cur == 9
+
+LEGACY = ("ts,symbol,plugin,side,price,qty,cash_delta,balance_after,pos_qty_after,avg_price_after\n"
+          "2024-01-01T00:00:00Z,BTCUSDT,ema,BUY,100,0.5,-50,950,0.5,100\n"
+          "2024-01-01T00:00:01Z,buy,101,1,899,1,101,101,0,0\n"
+          "2024-01-01T00:00:02Z,ETHUSDT,SELL,0.2,2000,400,tp\n"
+          "garbage\n")
+
+def test_legacy_csv_is_tailed_without_a_cursor_then_migrated(trades, tmp_path, monkeypatch):
+    csv_path = tmp_path/"trade_log.csv"; csv_path.write_text(LEGACY)
+    monkeypatch.setattr(logview, "LEGACY_LOG", csv_path)
+    page = logview.trades_page(2)
+    assert page["cursor"] is None and len(page["trades"]) == 2  # raw CSV rows, no ids
+    assert migrate(csv_path, trades) == 3
+    assert not csv_path.exists() and (tmp_path/"trade_log.csv.migrated").exists()
+    rows = trades.last(10)
+    assert [r["source"] for r in rows] == ["executor", "account", "trader"]
+    assert rows[1]["side"] == "BUY" and rows[2]["stake"] == 400.0 and rows[2]["note"] == "tp"
+    page = logview.trades_page(2)
+    assert page["cursor"] == 3 and migrate(csv_path, trades) == 0
@@ -0,0 +1,56 @@
+from engine import orders, risk
+from engine.triggers import ABOVE, BELOW, TriggerBook
+
+def test_only_the_levels_the_price_reaches_fire_and_only_once():
+    tb = TriggerBook()
+    for lv in (101.0, 103.0, 105.0): tb.add("X", lv, ABOVE, f"up{lv:g}")
+    for lv in (99.0, 97.0): tb.add("X", lv, BELOW, f"down{lv:g}")
+    assert tb.cross("X", 100.0) == []
+    assert sorted(tb.cross("X", 103.0)) == ["up101", "up103"]
+    assert tb.cross("X", 103.0) == [] and len(tb) == 3
+    assert tb.cross("X", 97.0) == ["down99", "down97"]  # nearest level first
+    assert tb.pending("X") == 1
+
+def test_cancelled_and_other_symbols_triggers_do_not_fire():
+    tb = TriggerBook()
+    a = tb.add("X", 101.0, ABOVE, "a"); tb.add("Y", 90.0, ABOVE, "y")
+    assert tb.level(a) == 101.0 and tb.cancel(a) and not tb.cancel(a)
+    assert tb.level(a) is None and tb.cross("X", 200.0) == []
+    assert tb.pending() == 1 and tb.pending("Y") == 1
+
+def test_resting_orders_fire_at_market_when_crossed(store, trades):
+    with store.mutate() as st: st["risk"] = {**risk.DEFAULTS, "min_cash_reserve_pct": 0.0}
+    buy = orders.place_resting("LIMIT", "BUY", 95.0, 0.5, symbol="BTCUSDT")
+    stop = orders.place_resting("STOP", "SELL", 80.0, 1.0, symbol="BTCUSDT")
+    assert buy["ok"] and stop["ok"] and orders.pending() == 2
+    assert orders.on_price("BTCUSDT", 96.0) == []
+    fired = orders.on_price("BTCUSDT", 94.0)
+    assert [(f["order"]["id"], f["ok"], f["side"]) for f in fired] == [(buy["id"], True, "BUY")]
+    assert store.read()["positions"]["BTCUSDT"]["qty"] > 0 and orders.pending() == 1
+    fired = orders.on_price("BTCUSDT", 79.0)
+    assert fired[0]["order"]["id"] == stop["id"] and fired[0]["side"] == "SELL"
+    assert store.read()["positions"]["BTCUSDT"]["qty"] == 0 and store.read()["orders"] == {}
+    assert [r["plugin"] for r in trades.last(10)] == ["manual:limit", "manual:stop"]
+
+def test_bad_orders_are_rejected_and_cancel_removes_the_trigger(store):
+    assert orders.place_resting("LIMIT", "HOLD", 1.0, 0.1)["reason"] == "bad_kind_or_side"
+    assert orders.place_resting("LIMIT", "BUY", 1.0, 0.1, symbol="NOPEUSDT")["reason"] == "unsupported_symbol"
+    o = orders.place_resting("TAKE_PROFIT", "SELL", 120.0, 1.0, symbol="BTCUSDT")
+    assert orders.cancel_resting(o["id"]) and not orders.cancel_resting(o["id"])
+    assert orders.on_price("BTCUSDT", 130.0) == [] and orders.list_resting() == []
+
+def test_trigger_book_is_rebuilt_from_persisted_orders(store):
+    o = orders.place_resting("STOP", "BUY", 110.0, 0.1, symbol="BTCUSDT")
+    saved = store.snapshot()
+    store.replace({"balance": 1000.0, "positions": {}})
+    assert orders.pending() == 0
+    store.replace(saved)  # e.g. a restart: the book is rebuilt from state["orders"]
+    assert orders.pending() == 1 and orders.symbols() == {"BTCUSDT"}
+    assert orders.list_resting("btcusdt")[0]["id"] == o["id"]
+
+def test_a_buy_the_risk_gate_refuses_is_reported_not_filled(store):
+    with store.mutate() as st: st["risk"] = {**risk.DEFAULTS, "min_cash_reserve_pct": 99.0}
+    orders.place_resting("LIMIT", "BUY", 95.0, 0.5, symbol="BTCUSDT")
+    fired = orders.on_price("BTCUSDT", 90.0)
+    assert fired[0]["ok"] is False and fired[0]["reason"] == "min_cash_reserve"
+    assert store.read().get("positions", {}).get("BTCUSDT", {}).get("qty", 0.0) == 0.0
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from engine import voting
+from engine.types import StrategyVote
+from engine.voting import ACTIONS, combine_arrays, combine_votes
+
+@pytest.mark.parametrize("threshold", [0.05, voting.THRESHOLD, 0.4])
+def test_list_and_array_paths_decide_alike(threshold):
+    rng = np.random.default_rng(3)
+    bias, conf = rng.uniform(-1, 1, (3, 200)), rng.uniform(0, 1, (3, 200))
+    code, _, _ = combine_arrays(bias, conf, threshold=threshold)
+    for j in range(200):
+        votes = [StrategyVote(name=str(i), bias=bias[i, j], confidence=conf[i, j]) for i in range(3)]
+        assert combine_votes(votes, threshold).action == ACTIONS[code[j] + 1]
+
+def test_threshold_is_passed_through():
+    votes = [StrategyVote(name="a", bias=0.2, confidence=1.0)]
+    assert voting.THRESHOLD < 0.2 and combine_votes(votes).action == "BUY"
+    assert combine_votes(votes, 0.5).action == "HOLD"
@@ -1,4 +1,4 @@
-/* Aurora UI — staggered polling + local time tables */
+/* Aurora UI — server-push feed + local time tables */
 
 const $ = q => document.querySelector(q);
 const setJSON = (sel, val) => { $(sel).textContent = typeof val === 'string' ? val : JSON.stringify(val, null, 2); };
@@ -46,24 +46,36 @@ function renderPositionsTable(obj) {
   body.innerHTML = rows.map(r => `<tr><td>${r.symbol}</td><td>${r.qty}</td><td>${r.avg_price}</td></tr>`).join('');
 }
 
-/* ------ One-per-panel loaders ------ */
-async function loadHealth()    { const d = await api('/health');      setJSON('#health', d); }
-async function loadPositions() { const d = await api('/positions');   setJSON('#positions', d); renderPositionsTable(d); }
-async function loadAIStatus()  { const d = await api('/ai/status');   setJSON('#ai', d); }
-async function loadTickAuto()  { const d = await api('/tick/auto');   setJSON('#tickcfg', d); }
-async function loadRisk()      { const d = await api('/risk');        setJSON('#risk', d); }
-async function loadTrades()    { const d = await api('/logs/trades?n=200'); renderTrades(d.trades || []); }
+/* ------ Panels (fed by /stream) ------ */
+const TRADES_KEEP = 200;
+let tradeRows = [];
+const panels = {
+  health:    d => setJSON('#health', d),
+  positions: d => { setJSON('#positions', d); renderPositionsTable(d); },
+  ai:        d => { setJSON('#ai', d); window.dispatchEvent(new CustomEvent('aurora:ai', { detail: d })); },
+  tick:      d => setJSON('#tickcfg', d),
+  risk:      d => setJSON('#risk', d),
+  /* snapshot carries the full tail (rows); deltas carry only rows after the previous cursor (append) */
+  trades:    d => {
+    tradeRows = (d.rows ? d.rows : tradeRows.concat(d.append || [])).slice(-TRADES_KEEP);
+    renderTrades(tradeRows.map(r => ({...r})));
+  }
+};
+function applyPanels(msg) {
+  for (const [k, v] of Object.entries(msg)) if (panels[k]) panels[k](v);
+  updateStatus();
+}
 
 /* ------ Controls ------ */
-async function startLoop(){ const v=parseFloat($('#interval').value||'0.5'); await api(`/tick/auto?enabled=true&interval=${v}`, {method:'POST'}); await loadTickAuto(); }
-async function stopLoop(){ await api(`/tick/auto?enabled=false`, {method:'POST'}); await loadTickAuto(); }
-async function tickOnce(){ await api('/tick'); await Promise.all([loadHealth(), loadPositions()]); }
+async function startLoop(){ const v=parseFloat($('#interval').value||'0.5'); await api(`/tick/auto?enabled=true&interval=${v}`, {method:'POST'}); }
+async function stopLoop(){ await api(`/tick/auto?enabled=false`, {method:'POST'}); }
+async function tickOnce(){ await api('/tick'); }
 
-async function setEps(){ const v=parseFloat($('#eps').value||'0.1'); await api(`/ai/eps?eps=${v}`, {method:'POST'}); await loadAIStatus(); }
-async function setStake(){ const v=parseFloat($('#stake').value||'0.1'); await api(`/ai/stake?stake=${v}`, {method:'POST'}); await loadAIStatus(); }
+async function setEps(){ const v=parseFloat($('#eps').value||'0.1'); await api(`/ai/eps?eps=${v}`, {method:'POST'}); }
+async function setStake(){ const v=parseFloat($('#stake').value||'0.1'); await api(`/ai/stake?stake=${v}`, {method:'POST'}); }
 
 async function orderPreview(){ const side=$('#side').value, f=parseFloat($('#fraction').value||'0.1'); setJSON('#orderOut', await api(`/orders/preview?side=${encodeURIComponent(side)}&fraction=${f}`)); }
-async function orderSubmit(){ const side=$('#side').value, f=parseFloat($('#fraction').value||'0.1'); setJSON('#orderOut', await api(`/orders?side=${encodeURIComponent(side)}&fraction=${f}&plugin=dashboard`, {method:'POST'})); await Promise.all([loadHealth(), loadPositions(), loadTrades()]); }
+async function orderSubmit(){ const side=$('#side').value, f=parseFloat($('#fraction').value||'0.1'); setJSON('#orderOut', await api(`/orders?side=${encodeURIComponent(side)}&fraction=${f}&plugin=dashboard`, {method:'POST'})); }
 
 async function applyRisk(){ const stakeCap=parseFloat($('#risk_stake_cap').value||'10'); setJSON('#risk', await api(`/risk?stake_cap_pct=${stakeCap}`, {method:'POST'})); }
 
@@ -79,34 +91,14 @@ window.addEventListener('DOMContentLoaded', () => {
   $('#btnRisk').onclick = applyRisk;
 });
 
-/* ------ Staggered polling engine ------ */
-const tasks = [
-  { name:'health',    fn: wrap(loadHealth,    '#health'),    offset:   0 },
-  { name:'positions', fn: wrap(loadPositions, '#positions'), offset: 500 },
-  { name:'ai',        fn: wrap(loadAIStatus,  '#ai'),        offset:1000 },
-  { name:'tick',      fn: wrap(loadTickAuto,  '#tickcfg'),   offset:1500 },
-  { name:'risk',      fn: wrap(loadRisk,      '#risk'),      offset:2000 },
-  { name:'trades',    fn: wrap(loadTrades,    '#trades'),    offset:2500 }
-];
-
-function wrap(fn, panelSel){
-  let running = false;
-  return async () => {
-    if (running) return;
-    running = true;
-    try { await fn(); updateStatus(); }
-    catch (e) {
-      if (panelSel === '#trades') renderTrades([]);
-      setJSON(panelSel, String(e.message || e)); updateStatus();
-    }
-    finally { running = false; }
-  };
-}
-
+/* ------ Server push: one snapshot on connect, then deltas only when something changed ------ */
 function updateStatus(){ statusEl().textContent = 'OK'; }
 
-function startPolling(){
-  const period = 6000; // each panel refreshes every 6s
-  tasks.forEach(t => { setTimeout(t.fn, t.offset); setInterval(t.fn, period); });
+function connect(){
+  const es = new EventSource('/stream', { withCredentials: true });
+  es.addEventListener('snapshot', e => applyPanels(JSON.parse(e.data)));
+  es.addEventListener('delta',    e => applyPanels(JSON.parse(e.data)));
+  // EventSource reconnects on its own; the server sends a fresh snapshot each time
+  es.onerror = () => { statusEl().textContent = 'reconnecting…'; };
 }
-startPolling();
+connect();
@@ -25,20 +25,14 @@ function injectSignalCard(){
   }
 }
 
-// Fetch & render readiness
-async function loadReadiness(){
-  try{
-    const r = await fetch('/ai/readiness');
-    if(!r.ok) throw new Error(r.statusText);
-    const d = await r.json();
-    const t = document.getElementById('signal_text');
-    const b = document.getElementById('signal_bar');
-    if (t) t.textContent = `${d.awaiting ? 'Awaiting entry' : 'Signal active'} · action=${d.action} · readiness=${d.readiness}%`;
-    if (b) b.style.width = `${d.readiness}%`;
-  }catch(e){
-    const t = document.getElementById('signal_text');
-    if (t) t.textContent = 'Signal unavailable';
-  }
+// Render readiness from the AI panel pushed over /stream (see app.js)
+function renderReadiness(ai){
+  const t = document.getElementById('signal_text');
+  const b = document.getElementById('signal_bar');
+  if (!ai || !ai.last){ if (t) t.textContent = 'Signal unavailable'; return; }
+  const action = ai.last.action, readiness = Math.round(Math.max(0, Math.min(1, ai.last.conf || 0)) * 100);
+  if (t) t.textContent = `${action === 'HOLD' ? 'Awaiting entry' : 'Signal active'} · action=${action} · readiness=${readiness}%`;
+  if (b) b.style.width = `${readiness}%`;
 }
 
 // Override renderTrades to (a) cap at 50, (b) localize time, (c) keep columns
@@ -73,8 +67,7 @@ async function loadReadiness(){
 })();
 
 // Boot
+window.addEventListener('aurora:ai', e => renderReadiness(e.detail));
 window.addEventListener('DOMContentLoaded', () => {
   injectSignalCard();
-  loadReadiness().catch(()=>{});
-  setInterval(() => loadReadiness().catch(()=>{}), 7000);
 });